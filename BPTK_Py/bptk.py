@@ -23,8 +23,11 @@ from .logger import log
 from .scenariomanager import ScenarioManagerFactory
 from .scenariomanager import ScenarioManagerSd
 from .scenariomanager import ScenarioManagerHybrid
+from .scenariomanager import SimulationScenario
 from .scenariorunners import HybridRunner
 from .scenariorunners import SdRunner
+from .sdsimulation import run_ensemble
+from .modeling import Model
 from .util.didyoumean import didyoumean
 from .visualizations import visualizer
 from copy import deepcopy
@@ -829,6 +832,31 @@ class bptk():
 
         return df
 
+    def run_ensemble(self, scenario_manager, scenario, parameter_table, equations):
+        """Run an ensemble of parameter sets of a System Dynamics scenario.
+
+        The constants given in the parameter table are evaluated as vectors, so all members of the ensemble are computed in a single run of the model. The scenario itself is not changed.
+
+        Args:
+            scenario_manager: String.
+                Name of the scenario manager.
+            scenario: String.
+                Name of the scenario.
+            parameter_table: DataFrame or Dict.
+                One column per constant and one row per member of the ensemble.
+            equations: List.
+                Names of the equations to return.
+
+        Returns:
+            NumPy array of shape (members x timesteps x equations). The timesteps range from the starttime to the stoptime of the scenario, members and equations are in the order given.
+        """
+        equations = equations if isinstance(equations, list) else equations.split(",")
+
+        scenario = self.scenario_manager_factory.get_scenario(scenario_manager=scenario_manager, scenario=scenario)
+        model = scenario if isinstance(scenario, Model) else scenario.model
+
+        return run_ensemble(model, parameter_table, equations)
+
 
     def plot_scenarios(self, scenarios, scenario_managers, agents=[], agent_states=[], agent_properties=[],
                        agent_property_types=[], equations=[],
@@ -1022,19 +1050,29 @@ class bptk():
         log("[INFO] BPTK API: Got destroy signal. Stopping all threads that are running in background")
         self.scenario_manager_factory.destroy()
 
-    def reset_scenario_cache(self, scenario_manager="", scenario=""):
+    def reset_scenario_cache(self, scenario_manager="", scenario="", constants=None, points=None):
         """Resets only the interal cache (equation results) of a scenario, does not re-read from storage
 
+        If constants or points are given, only the results of SD scenarios that depend on these constants or graphical functions are invalidated, all other results are kept.
+
         Args:
             scenario_manager: String
                 Name of scenario manager for lookup.
             scenario: String.
                 Name of scenario.
+            constants: List (Default=None).
+                Names of the constants that changed.
+            points: List (Default=None).
+                Names of the graphical functions that changed.
         """
         #TODO: most of this code should be part of the scenario itself
 
         scenario = self.scenario_manager_factory.get_scenario(scenario_manager=scenario_manager, scenario=scenario)
-        scenario.reset_cache()
+
+        if (constants is None and points is None) or not isinstance(scenario, SimulationScenario):
+            scenario.reset_cache()
+        else:
+            scenario.invalidate_cache(constants=constants or [], points=points or [])
 
     def _set_scenario_cache(self, scenario_manager="", scenario="", cache=None):
         scenario = self.scenario_manager_factory.get_scenario(scenario_manager=scenario_manager, scenario=scenario)
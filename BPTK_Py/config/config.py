@@ -83,6 +83,12 @@ configuration = {
 
     "set_scenario_monitor": True,
     "set_model_monitor": True,
+
+    # Directory of the compile cache for XMILE models, None disables the cache
+    "sd_compile_cache": os.environ.get("BPTK_SD_COMPILE_CACHE", os.path.join(os.path.expanduser("~"), ".cache", "bptk_py", "sdcompiler")),
+
+    # Number of processes for compiling XMILE models when loading scenarios, None uses all CPUs
+    "sd_compile_processes": None,
 }
 
 
@@ -7,4 +7,5 @@ from .model import Model
 from .scheduler import Scheduler
 from .simultaneousScheduler import SimultaneousScheduler
 from .event import DelayedEvent
+from .event import MulticastEvent
 
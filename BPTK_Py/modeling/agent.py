@@ -59,6 +59,62 @@ class Agent:
         self.properties = copy.deepcopy(properties)
         self.eventHandlers = {}
 
+    @property
+    def state(self):
+        """State of the agent.
+
+        Assigning a state updates the index of agents by type and state of the model the agent belongs to (see AgentStore).
+        """
+        return self.__dict__.get("_state")
+
+    @state.setter
+    def state(self, state):
+        previous_state = self.__dict__.get("_state")
+        self.__dict__["_state"] = state
+
+        model = self.__dict__.get("model")
+        agents = model.__dict__.get("agents") if model is not None else None
+        if agents is not None and previous_state != state:
+            agents.state_changed(self, previous_state)
+
+    def clone(self, agent_id):
+        """Create a copy of the agent with another ID.
+
+        Used to create agents in bulk from a prototype (see Model.create_agents_bulk). The copy gets its own properties, events and event handlers and its own copies of the lists, dictionaries and sets of the agent. Event handlers that are methods of the agent are bound to the copy. All other attributes are shared with the agent.
+
+        Args:
+            agent_id: Integer.
+                ID of the copy
+
+        Returns:
+            The copy
+        """
+        agent = object.__new__(type(self))
+        agent.__dict__.update(self.__dict__)
+
+        for name, value in self.__dict__.items():
+            if isinstance(value, (list, dict, set)):
+                agent.__dict__[name] = copy.copy(value)
+
+        def copy_value(value):
+            return value if isinstance(value, (int, float, str, bool, type(None))) else copy.deepcopy(value)
+
+        def bind(handler):
+            return handler.__func__.__get__(agent) if getattr(handler, "__self__", None) is self else handler
+
+        agent.__dict__["id"] = agent_id
+        agent.__dict__["events"] = []
+        agent.__dict__["properties"] = {
+            name: {key: copy_value(value) for key, value in spec.items()} if isinstance(spec, dict) else copy.deepcopy(spec)
+            for name, spec in self.properties.items()
+        }
+        agent.__dict__["eventHandlers"] = {
+            state: {event: bind(handler) for event, handler in handlers.items()}
+            for state, handlers in self.eventHandlers.items()
+        }
+
+        return agent
+
     def serialize(self):
         """Serialize the agent.
 
@@ -0,0 +1,298 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+from heapq import heapify, heappop, heappush
+
+
+class _OrderedIndex:
+    """Items in the order they were added, indexed by key.
+
+    Adding, removing and looking up an item by key is O(1). Iteration and positional access use a list of the items, which is extended when items are added and rebuilt after items were removed. Iterating while items are added or removed behaves like iterating over a list that is replaced on removal: added items are visited, removed items are still visited.
+    """
+
+    def __init__(self, items=()):
+        self._items = {}
+        self._list = []
+        self.extend(items)
+
+    def _key(self, item):
+        raise NotImplementedError
+
+    def _as_list(self):
+        if self._list is None:
+            self._list = list(self._items.values())
+        return self._list
+
+    def append(self, item):
+        key = self._key(item)
+        if key in self._items:
+            self._list = None
+        elif self._list is not None:
+            self._list.append(item)
+        self._items[key] = item
+
+    def extend(self, items):
+        for item in items:
+            self.append(item)
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def pop(self, key, *default):
+        """Remove the item with the given key.
+
+        Args:
+            key: Key of the item.
+            default: Returned if there is no such item. Raises a KeyError if no default is given.
+
+        Returns:
+            The removed item.
+        """
+        if key not in self._items:
+            if default:
+                return default[0]
+            raise KeyError(key)
+        self._list = None
+        return self._items.pop(key)
+
+    def clear(self):
+        self._items.clear()
+        self._list = None
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._as_list())
+
+    def __getitem__(self, index):
+        return self._as_list()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (_OrderedIndex, list, tuple)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._as_list())
+
+
+class AgentIds(_OrderedIndex):
+    """Ids of the agents of one type, in the order the agents were added.
+
+    Behaves like the list of ids it replaces, but adding, removing and looking up an id is O(1). Each id is contained once.
+    """
+
+    def _key(self, agent_id):
+        return agent_id
+
+    def __contains__(self, agent_id):
+        return agent_id in self._items
+
+    def remove(self, agent_id):
+        """Remove an id, raises a ValueError if the id is not contained (like list.remove)."""
+        if agent_id not in self._items:
+            raise ValueError("{} is not in the agent ids".format(agent_id))
+        self.pop(agent_id)
+
+    def discard(self, agent_id):
+        """Remove an id if it is contained."""
+        self.pop(agent_id, None)
+
+
+class AgentTypeMap(dict):
+    """Agent ids per agent type, a dictionary {agent_type: AgentIds}. Lists of ids that are assigned are converted to AgentIds."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self.update(*args, **kwargs)
+
+    def __setitem__(self, agent_type, agent_ids):
+        if not isinstance(agent_ids, AgentIds):
+            agent_ids = AgentIds(agent_ids)
+        super().__setitem__(agent_type, agent_ids)
+
+    def setdefault(self, agent_type, agent_ids=()):
+        if agent_type not in self:
+            self[agent_type] = agent_ids
+        return self[agent_type]
+
+    def update(self, *args, **kwargs):
+        for agent_type, agent_ids in dict(*args, **kwargs).items():
+            self[agent_type] = agent_ids
+
+
+class _StateIndex:
+    """Agents of one type that are in one state.
+
+    A dictionary {agent_id: agent} and a heap of (sequence, agent_id), where the sequence is the position of the agent in the store. The heap finds the agent that was added to the store first, its stale entries are dropped lazily.
+    """
+
+    def __init__(self):
+        self.agents = {}
+        self.heap = []
+
+    def add(self, agent, sequences):
+        self.agents[agent.id] = agent
+        heappush(self.heap, (sequences[agent.id], agent.id))
+
+        if len(self.heap) > 2 * len(self.agents) + 32:
+            self.heap = [(sequences[agent_id], agent_id) for agent_id in self.agents]
+            heapify(self.heap)
+
+    def discard(self, agent_id):
+        self.agents.pop(agent_id, None)
+
+    def first(self, sequences):
+        while self.heap:
+            sequence, agent_id = self.heap[0]
+            if agent_id in self.agents and sequences.get(agent_id) == sequence:
+                return self.agents[agent_id]
+            heappop(self.heap)
+        return None
+
+
+class AgentStore(_OrderedIndex):
+    """Agents of a model, in the order they were added.
+
+    Behaves like the list of agents it replaces, but the agents are indexed by id, so that looking up, adding and removing an agent is O(1). Each id is contained once, adding an agent with the id of a contained agent replaces that agent. The store also remembers the type each agent was registered with in the agent type map of the model.
+
+    The agents are also indexed by type and state. Agents report changes of their state to the store of their model (see Agent.state), so the agents in a state and their number are known without looking at all agents.
+    """
+
+    def __init__(self, agents=()):
+        self.agent_types = {}
+        self.sequences = {}
+        self.state_index = {}
+        self._sequence = 0
+        super().__init__(agents)
+
+    def _key(self, agent):
+        return agent.id
+
+    def _index(self, agent_type, state):
+        states = self.state_index.setdefault(agent_type, {})
+        if state not in states:
+            states[state] = _StateIndex()
+        return states[state]
+
+    def _unindex(self, agent_id):
+        agent = self._items.get(agent_id)
+        if agent is not None:
+            index = self.state_index.get(self.agent_types[agent_id], {}).get(agent.state)
+            if index is not None:
+                index.discard(agent_id)
+
+    def append(self, agent, agent_type=None):
+        """Add an agent.
+
+        Args:
+            agent: Agent.
+                The agent
+            agent_type: String.
+                Type the agent is registered with in the agent type map, defaults to the type of the agent.
+        """
+        self._unindex(agent.id)
+        super().append(agent)
+
+        agent_type = agent.agent_type if agent_type is None else agent_type
+        self.agent_types[agent.id] = agent_type
+        self.sequences[agent.id] = self._sequence
+        self._sequence += 1
+        self._index(agent_type, agent.state).add(agent, self.sequences)
+
+    def pop(self, agent_id, *default):
+        self._unindex(agent_id)
+        self.agent_types.pop(agent_id, None)
+        self.sequences.pop(agent_id, None)
+        return super().pop(agent_id, *default)
+
+    def clear(self):
+        super().clear()
+        self.agent_types.clear()
+        self.sequences.clear()
+        self.state_index.clear()
+
+    def state_changed(self, agent, previous_state):
+        """Move an agent of the store from the index of its previous state to the index of its current state. Called by the agent when its state changes.
+
+        Args:
+            agent: Agent.
+                The agent
+            previous_state: String.
+                State of the agent before the change
+        """
+        if self._items.get(agent.id) is not agent:
+            return
+
+        agent_type = self.agent_types[agent.id]
+        index = self.state_index.get(agent_type, {}).get(previous_state)
+        if index is not None:
+            index.discard(agent.id)
+        self._index(agent_type, agent.state).add(agent, self.sequences)
+
+    def first(self, agent_type, state):
+        """Get the agent of the given type and state that was added first.
+
+        Args:
+            agent_type: String.
+                Agent type
+            state: String.
+                State of the agent
+
+        Returns:
+            Agent object, None if there is no such agent
+        """
+        index = self.state_index.get(agent_type, {}).get(state)
+        return index.first(self.sequences) if index is not None else None
+
+    def in_state(self, agent_type, state):
+        """Get the agents of the given type and state, in no particular order.
+
+        Returns:
+            List of agents
+        """
+        index = self.state_index.get(agent_type, {}).get(state)
+        return list(index.agents.values()) if index is not None else []
+
+    def count(self, agent_type, state):
+        """Get the number of agents of the given type and state."""
+        index = self.state_index.get(agent_type, {}).get(state)
+        return len(index.agents) if index is not None else 0
+
+    def state_counts(self, agent_type):
+        """Get the number of agents of the given type per state.
+
+        Returns:
+            Dictionary {state: count}, states without agents are left out
+        """
+        return {state: len(index.agents) for state, index in self.state_index.get(agent_type, {}).items() if index.agents}
+
+    def get(self, agent_id, default=None):
+        """Get an agent by id.
+
+        Args:
+            agent_id: Integer.
+                ID of the agent
+            default: Returned if there is no such agent.
+
+        Returns:
+            Agent object
+        """
+        return self._items.get(agent_id, default)
+
+    def ids(self):
+        """Ids of all agents."""
+        return self._items.keys()
+
+    def __contains__(self, agent):
+        return self._items.get(getattr(agent, "id", None)) is agent
@@ -28,7 +28,7 @@ class DataCollector:
         self.agent_statistics = {}
         self.event_statistics = {}
 
-    def record_event(self, time, event):
+    def record_event(self, time, event, count=1):
         """
         Record an event
 
@@ -37,6 +37,8 @@ class DataCollector:
                 The time at which to record the event.
             event: event instance
                 The event to record.
+            count: Integer.
+                Number of deliveries of the event (the number of receivers of a MulticastEvent).
         """
         if time not in self.event_statistics:
             self.event_statistics[time] = {}
@@ -44,7 +46,7 @@ class DataCollector:
         if event.name not in self.event_statistics[time]:
             self.event_statistics[time][event.name] = 0
 
-        self.event_statistics[time][event.name] += 1
+        self.event_statistics[time][event.name] += count
 
     def collect_agent_statistics(self, time, agents):
         """
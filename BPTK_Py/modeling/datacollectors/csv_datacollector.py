@@ -48,11 +48,12 @@ class CSVDataCollector:
         self.column_names = None
 
 
-    def record_event(self, time, event):
+    def record_event(self, time, event, count=1):
         """
         Record an event
         :param time: t (int)
         :param event: event instance
+        :param count: number of deliveries of the event (the number of receivers of a MulticastEvent)
         :return: None
         """
         if time not in self.event_statistics:
@@ -61,7 +62,7 @@ class CSVDataCollector:
         if event.name not in self.event_statistics[time]:
             self.event_statistics[time][event.name] = 0
 
-        self.event_statistics[time][event.name] += 1
+        self.event_statistics[time][event.name] += count
 
     def reset(self):
         self.agent_statistics = {}
@@ -0,0 +1,567 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import ast
+import re
+
+
+# Kinds of equations, from least to most dependent on the run (see DependencyGraph.classify)
+TIME_INVARIANT = "time_invariant"
+TIME_ONLY = "time_only"
+STATE = "state"
+
+_kind_ranks = {TIME_INVARIANT: 0, TIME_ONLY: 1, STATE: 2}
+
+# attributes of the model a function string can read without depending on the state of the run
+_model_attributes = {"memoize", "_lookup", "dt", "starttime", "stoptime"}
+
+# function strings of plain numbers, e.g. those of constants
+_literal = re.compile(r"lambda\s+model\s*,\s*t\s*:[\s\d.eE+\-*/()]*$")
+
+
+def _scan(function_string):
+    """Find the equations and graphical functions a SD DSL function string reads and classify it.
+
+    Element functions read other equations via model.memoize('name', time) and the points of graphical functions via model._lookup(x, 'name').
+
+    The kind of the function string itself is STATE if it reads an equation at another timestep (e.g. t-model.dt), draws random numbers or reads the model in any other way, TIME_ONLY if it uses t outside of reads at the same timestep and TIME_INVARIANT otherwise. The kinds of the equations it reads are not taken into account (see DependencyGraph.classify).
+
+    Args:
+        function_string: String.
+            The function string of an element, e.g. "lambda model, t: model.memoize('a',t) + 1.0"
+
+    Returns:
+        Tuple (references, points, kind). references is a list of tuples (name, same_step) in order of appearance, same_step is True for reads at time "t" and False for reads at any other time (e.g. t-model.dt). points is the list of the names of the points.
+    """
+    # most elements (e.g. constants) read nothing, no need to parse them
+    if "memoize" not in function_string and "_lookup" not in function_string and _literal.match(function_string):
+        return [], [], TIME_INVARIANT
+
+    try:
+        tree = ast.parse(function_string, mode="eval")
+    except (SyntaxError, ValueError):
+        return [], [], STATE
+
+    references = []
+    points = []
+    same_step_times = set()
+    for node in ast.walk(tree):
+        if not (isinstance(node, ast.Call) and isinstance(node.func, ast.Attribute) and len(node.args) == 2):
+            continue
+        if node.func.attr == "memoize" and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str):
+            same_step = isinstance(node.args[1], ast.Name) and node.args[1].id == "t"
+            references.append((node.args[0].value, same_step))
+            if same_step:
+                same_step_times.add(node.args[1])
+        elif node.func.attr == "_lookup" and isinstance(node.args[1], ast.Constant) and isinstance(node.args[1].value, str):
+            points.append(node.args[1].value)
+
+    kind = STATE if not all(same_step for _, same_step in references) else TIME_INVARIANT
+    for node in ast.walk(tree):
+        if kind == STATE:
+            break
+        if isinstance(node, ast.Name):
+            if node.id == "random":
+                kind = STATE
+            elif node.id == "t" and node not in same_step_times:
+                kind = TIME_ONLY
+        elif isinstance(node, ast.Attribute):
+            if node.attr == "random" or (isinstance(node.value, ast.Name) and node.value.id == "model" and node.attr not in _model_attributes):
+                kind = STATE
+
+    return references, points, kind
+
+
+def _references(function_string):
+    """Find the equations a SD DSL function string reads.
+
+    Args:
+        function_string: String.
+            The function string of an element.
+
+    Returns:
+        List of tuples (name, same_step), in order of appearance (see _scan).
+    """
+    return _scan(function_string)[0]
+
+
+def _same_step_dependencies(function_string):
+    """Find the equations a SD DSL function string reads at the same timestep.
+
+    Reads at time "t" have to be evaluated before the element within the same step, reads at any other time (e.g. t-model.dt) refer to steps that were computed earlier.
+
+    Args:
+        function_string: String.
+            The function string of an element.
+
+    Returns:
+        List of equation names, in order of appearance.
+    """
+    return [name for name, same_step in _references(function_string) if same_step]
+
+
+class EquationStore(dict):
+    """Equations of a model, a dictionary {equation: function} that records which equations were written.
+
+    The dependency graph of a model only updates the entries of the recorded equations instead of comparing all equations.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.changed = set(self.keys())
+
+    def __setitem__(self, equation, function):
+        super().__setitem__(equation, function)
+        self.changed.add(equation)
+
+    def __delitem__(self, equation):
+        super().__delitem__(equation)
+        self.changed.add(equation)
+
+    def setdefault(self, equation, function=None):
+        if equation not in self:
+            self[equation] = function
+        return self[equation]
+
+    def update(self, *args, **kwargs):
+        for equation, function in dict(*args, **kwargs).items():
+            self[equation] = function
+
+    def pop(self, equation, *default):
+        self.changed.add(equation)
+        return super().pop(equation, *default)
+
+    def popitem(self):
+        equation, function = super().popitem()
+        self.changed.add(equation)
+        return equation, function
+
+    def clear(self):
+        self.changed.update(self.keys())
+        super().clear()
+
+    def take_changes(self):
+        """Get the names of the equations written since the last call and forget them.
+
+        Returns:
+            Set of equation names.
+        """
+        changed = self.changed
+        self.changed = set()
+        return changed
+
+
+class DependencyGraph:
+    """Dependency graph of the equations of a SD model.
+
+    Edges point from an equation to the equations it reads. Same-step edges are the reads at the same timestep, they determine the order in which the equations of one timestep can be evaluated. Reads of earlier timesteps (e.g. a stock reading its flows at t-dt) are dependencies, but not same-step dependencies.
+
+    Equations whose dependencies are not known (e.g. equations that are plain Python functions) have no edges. They can be marked as opaque, opaque equations are assumed to depend on every change when computing the equations affected by a change.
+
+    Each equation also has a kind, which describes what its value depends on apart from the equations it reads: TIME_INVARIANT, TIME_ONLY or STATE (see classify).
+
+    Args:
+        dependencies: Dict.
+            For each equation the names of all equations it reads.
+        same_step_dependencies: Dict (Default=None).
+            For each equation the names of the equations it reads at the same timestep. Defaults to all dependencies.
+        points: Dict (Default=None).
+            For each equation the names of the graphical functions (points) it reads. Equations without an entry read the points named like themselves, as graphical functions of XMILE models do.
+        opaque: Iterable (Default=None).
+            Names of the equations whose dependencies are not known.
+        kinds: Dict (Default=None).
+            For each equation its kind. Equations without an entry are of kind STATE.
+    """
+
+    def __init__(self, dependencies, same_step_dependencies=None, points=None, opaque=None, kinds=None):
+        self.dependencies = {name: list(dict.fromkeys(names)) for name, names in dependencies.items()}
+        if same_step_dependencies is None:
+            same_step_dependencies = dependencies
+        self.same_step_dependencies = {name: list(dict.fromkeys(same_step_dependencies.get(name, []))) for name in self.dependencies}
+        self.points = {name: list(names) for name, names in (points or {}).items()}
+        self.opaque = set(opaque or []) & set(self.dependencies)
+        self.kinds = {name: (kinds or {}).get(name, STATE) for name in self.dependencies}
+
+        # reverse edges, kept up to date by update and remove
+        self._dependents = {}
+        for name, names in self.dependencies.items():
+            for dependency in names:
+                self._dependents.setdefault(dependency, set()).add(name)
+
+    @classmethod
+    def from_function_strings(cls, function_strings, equations, constants=None, kinds=None):
+        """Build the graph of SD DSL equations from their function strings.
+
+        Args:
+            function_strings: Dict.
+                Function strings by equation name.
+            equations: Iterable.
+                Names of all equations of the model.
+            constants: Iterable (Default=None).
+                Names of the constants. Constants without a function string (e.g. set to a number by a scenario) have no dependencies, all other equations without a function string are opaque.
+            kinds: Dict (Default=None).
+                Kinds of the equations without a function string, defaults to STATE.
+
+        Returns:
+            DependencyGraph.
+        """
+        graph = cls({})
+        constants = set(constants or [])
+        kinds = kinds or {}
+
+        for name in equations:
+            graph.set_function_string(name, function_strings.get(name), name in constants, kinds.get(name, STATE))
+
+        return graph
+
+    @classmethod
+    def from_model(cls, model):
+        """Build the graph of a model.
+
+        SD DSL models provide the graph via Model.dependency_graph, XMILE models carry the dependencies extracted by the compiler in their dependencies and same_step_dependencies attributes. Models compiled without dependency information get a graph without edges.
+
+        Args:
+            model: Model or XMILE simulation_model.
+
+        Returns:
+            DependencyGraph.
+        """
+        if callable(getattr(model, "dependency_graph", None)):
+            return model.dependency_graph()
+
+        dependencies = getattr(model, "dependencies", {})
+        same_step_dependencies = getattr(model, "same_step_dependencies", dependencies)
+
+        return cls(
+            {name: [dependency for dependency in dependencies.get(name, []) if dependency in model.equations] for name in model.equations},
+            {name: [dependency for dependency in same_step_dependencies.get(name, []) if dependency in model.equations] for name in model.equations},
+            opaque=[name for name in model.equations if name not in dependencies]
+        )
+
+    def update(self, name, dependencies=(), same_step_dependencies=(), points=(), opaque=False, kind=STATE):
+        """Add or replace the entry of one equation.
+
+        Args:
+            name: String.
+                Name of the equation.
+            dependencies: Iterable (Default=()).
+                Names of all equations it reads.
+            same_step_dependencies: Iterable (Default=()).
+                Names of the equations it reads at the same timestep.
+            points: Iterable (Default=()).
+                Names of the graphical functions it reads.
+            opaque: Boolean (Default=False).
+                True if the dependencies of the equation are not known.
+            kind: String (Default=STATE).
+                The kind of the equation itself, not taking the equations it reads into account.
+        """
+        self.remove(name)
+        self.dependencies[name] = list(dict.fromkeys(dependencies))
+        self.same_step_dependencies[name] = list(dict.fromkeys(same_step_dependencies))
+        self.points[name] = list(points)
+        self.kinds[name] = kind
+        if opaque:
+            self.opaque.add(name)
+
+        for dependency in self.dependencies[name]:
+            self._dependents.setdefault(dependency, set()).add(name)
+
+    def set_function_string(self, name, function_string, constant=False, kind=STATE):
+        """Add or replace the entry of a SD DSL equation based on its function string.
+
+        Args:
+            name: String.
+                Name of the equation.
+            function_string: String.
+                The function string of the element, None if the equation is not described by a function string.
+            constant: Boolean (Default=False).
+                True for constants, which never have dependencies. All other equations without function string are opaque.
+            kind: String (Default=STATE).
+                The kind of the equation if it has no function string, otherwise the kind is derived from the function string.
+        """
+        if function_string is None:
+            self.update(name, opaque=not constant, kind=kind)
+            return
+
+        references, points, kind = _scan(function_string)
+        self.update(
+            name,
+            [reference for reference, _ in references],
+            [reference for reference, same_step in references if same_step],
+            points,
+            kind=kind
+        )
+
+    def remove(self, name):
+        """Remove the entry of an equation.
+
+        Args:
+            name: String.
+                Name of the equation.
+        """
+        for dependency in self.dependencies.pop(name, []):
+            self._dependents[dependency].discard(name)
+        self.same_step_dependencies.pop(name, None)
+        self.points.pop(name, None)
+        self.kinds.pop(name, None)
+        self.opaque.discard(name)
+
+    def __contains__(self, equation):
+        return equation in self.dependencies
+
+    def __len__(self):
+        return len(self.dependencies)
+
+    def required(self, equations):
+        """Get the equations needed to compute the given equations.
+
+        Args:
+            equations: Iterable.
+                Names of the requested equations.
+
+        Returns:
+            Set of the requested equations and all their transitive dependencies.
+        """
+        required = set()
+        stack = [equation for equation in equations if equation in self.dependencies]
+
+        while stack:
+            name = stack.pop()
+            if name in required:
+                continue
+            required.add(name)
+            stack.extend(dependency for dependency in self.dependencies[name] if dependency in self.dependencies and dependency not in required)
+
+        return required
+
+    def dependents(self, equations):
+        """Get the equations whose values depend on the given equations.
+
+        Args:
+            equations: Iterable.
+                Names of the changed equations.
+
+        Returns:
+            Set of the given equations and all equations that read them, transitively. Reads of earlier timesteps count as well.
+        """
+        dependents = set()
+        stack = [equation for equation in equations if equation in self.dependencies]
+
+        while stack:
+            name = stack.pop()
+            if name in dependents:
+                continue
+            dependents.add(name)
+            stack.extend(dependent for dependent in self._dependents.get(name, ()) if dependent not in dependents)
+
+        return dependents
+
+    def readers(self, points):
+        """Get the equations that read the given graphical functions.
+
+        Args:
+            points: Iterable.
+                Names of the points.
+
+        Returns:
+            List of equation names.
+        """
+        points = set(points)
+        readers = []
+
+        if not points:
+            return readers
+
+        for name in self.dependencies:
+            if name in self.points:
+                reads = bool(points.intersection(self.points[name]))
+            else:
+                reads = name.split("[")[0] in points
+            if reads:
+                readers.append(name)
+
+        return readers
+
+    def affected(self, equations=(), points=()):
+        """Get the equations whose cached values become invalid when equations or graphical functions change.
+
+        Opaque equations might read anything, so they and their dependents are affected by every change.
+
+        Args:
+            equations: Iterable (Default=()).
+                Names of the changed equations, e.g. constants.
+            points: Iterable (Default=()).
+                Names of the changed graphical functions.
+
+        Returns:
+            Set of equation names.
+        """
+        changed = set(equation for equation in equations if equation in self.dependencies).union(self.readers(points))
+        if not changed:
+            return set()
+
+        return self.dependents(changed | self.opaque)
+
+    def classify(self, equations=None):
+        """Classify equations by what their values depend on.
+
+        TIME_INVARIANT equations have the same value at every timestep of a run (e.g. constants and converters that only read constants), TIME_ONLY equations depend on the time only (e.g. step, pulse or sinwave of constants) and STATE equations depend on the state of the run (e.g. stocks and everything that reads them). An equation is of the highest kind of its own kind and the kinds of the equations it reads. Opaque equations, equations reading unknown equations and cycles are of kind STATE.
+
+        Args:
+            equations: Iterable (Default=None).
+                Only classify these equations (and the equations they read). Defaults to all equations.
+
+        Returns:
+            Dict {equation: kind}.
+        """
+        names = list(self.dependencies) if equations is None else [name for name in equations if name in self.dependencies]
+        ranks = {}
+
+        for root in names:
+            if root in ranks:
+                continue
+
+            stack = [(root, iter(self.dependencies[root]))]
+            visiting = {root: 2 if root in self.opaque else _kind_ranks[self.kinds[root]]}
+
+            while stack:
+                name, remaining = stack[-1]
+                dependency = next(remaining, None)
+
+                if dependency is None:
+                    stack.pop()
+                    ranks[name] = visiting.pop(name)
+                    if stack:
+                        parent = stack[-1][0]
+                        visiting[parent] = max(visiting[parent], ranks[name])
+                elif dependency in ranks:
+                    visiting[name] = max(visiting[name], ranks[dependency])
+                elif dependency in visiting or dependency not in self.dependencies:
+                    visiting[name] = 2
+                else:
+                    visiting[dependency] = 2 if dependency in self.opaque else _kind_ranks[self.kinds[dependency]]
+                    stack.append((dependency, iter(self.dependencies[dependency])))
+
+        kinds = {rank: kind for kind, rank in _kind_ranks.items()}
+        return {name: kinds[rank] for name, rank in ranks.items()}
+
+    def cycles(self, equations=None):
+        """Find cycles of same-step dependencies.
+
+        Equations that depend on each other at the same timestep cannot be ordered, such cycles are errors in the model.
+
+        Args:
+            equations: Iterable (Default=None).
+                Only consider these equations. Defaults to all equations.
+
+        Returns:
+            List of cycles, each a sorted list of equation names.
+        """
+        names = set(self.dependencies) if equations is None else set(equations) & set(self.dependencies)
+
+        # Tarjan's algorithm for strongly connected components, iteratively
+        index = {}
+        lowlink = {}
+        stack = []
+        on_stack = set()
+        cycles = []
+        counter = 0
+
+        for root in sorted(names):
+            if root in index:
+                continue
+
+            work = [(root, iter(self.same_step_dependencies[root]))]
+            index[root] = lowlink[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack.add(root)
+
+            while work:
+                name, remaining = work[-1]
+                dependency = next(remaining, None)
+
+                if dependency is not None:
+                    if dependency not in names:
+                        continue
+                    if dependency not in index:
+                        index[dependency] = lowlink[dependency] = counter
+                        counter += 1
+                        stack.append(dependency)
+                        on_stack.add(dependency)
+                        work.append((dependency, iter(self.same_step_dependencies[dependency])))
+                    elif dependency in on_stack:
+                        lowlink[name] = min(lowlink[name], index[dependency])
+                    continue
+
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[name])
+
+                if lowlink[name] == index[name]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == name:
+                            break
+                    if len(component) > 1 or name in self.same_step_dependencies[name]:
+                        cycles.append(sorted(component))
+
+        return cycles
+
+    def order(self, equations=None):
+        """Order equations topologically by their same-step dependencies.
+
+        Every equation comes after the equations it reads at the same timestep. Equations keep their relative position otherwise. Cycles are broken at the edge that closes them.
+
+        Args:
+            equations: Iterable (Default=None).
+                The equations to order. Defaults to all equations.
+
+        Returns:
+            List of equation names.
+        """
+        if equations is None:
+            names = list(self.dependencies)
+        else:
+            equations = set(equations)
+            names = [name for name in self.dependencies if name in equations]
+        selected = set(names)
+
+        order = []
+        visited = set()
+        visiting = set()
+
+        for root in names:
+            if root in visited:
+                continue
+
+            stack = [(root, iter(self.same_step_dependencies[root]))]
+            visiting.add(root)
+
+            while stack:
+                name, remaining = stack[-1]
+                dependency = next(remaining, None)
+
+                if dependency is None:
+                    stack.pop()
+                    visiting.discard(name)
+                    visited.add(name)
+                    order.append(name)
+                elif dependency not in visited and dependency not in visiting and dependency in selected:
+                    visiting.add(dependency)
+                    stack.append((dependency, iter(self.same_step_dependencies[dependency])))
+
+        return order
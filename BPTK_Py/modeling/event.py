@@ -43,3 +43,30 @@ class DelayedEvent(Event):
         if not type(delay) in [int,float]:
             raise ValueError("{} did not receive a correct type for delay. Allowed types: int and float".format(type(self)))
         self.delay = delay
+
+
+class MulticastEvent(Event):
+    """
+    The MulticastEvent class is used to send one event to a set of agents: the agents with the given ids, or all agents of an agent type, optionally only those in a given state. The receivers are determined when the event is delivered.
+
+    All receivers get the same event object, so the event cannot be changed once it is created and receivers must not modify its data. The receiver_id of the event is None, receivers use their own id instead.
+    """
+
+    def __init__(self, name, sender_id, data=None, agent_type=None, state=None, receiver_ids=None):
+        super().__init__(name, sender_id, None, data)
+
+        if (agent_type is None) == (receiver_ids is None):
+            raise ValueError("{} needs either an agent_type or receiver_ids".format(type(self)))
+
+        if state is not None and agent_type is None:
+            raise ValueError("{} can only select receivers by state together with an agent_type".format(type(self)))
+
+        self.agent_type = agent_type
+        self.state = state
+        self.receiver_ids = tuple(receiver_ids) if receiver_ids is not None else None
+        self._frozen = True
+
+    def __setattr__(self, name, value):
+        if self.__dict__.get("_frozen"):
+            raise AttributeError("{} is shared by its receivers and cannot be changed".format(type(self)))
+        super().__setattr__(name, value)
@@ -0,0 +1,136 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+import math
+from heapq import heappop, heappush
+
+from .event import DelayedEvent, MulticastEvent
+
+
+def delay_steps(delay, dt):
+    """Number of steps a delayed event waits before it is delivered.
+
+    The delay is counted down by dt once per step and the event is delivered in the step in which the delay is no longer positive.
+
+    Args:
+        delay: Float.
+            Delay of the event
+        dt: Float.
+            Step size of the model
+
+    Returns:
+        Number of steps, 0 if the event is due immediately
+    """
+    if delay <= 0:
+        return 0
+    # rounding absorbs the error of the floating point division (e.g. 0.3 / 0.1)
+    return math.ceil(round(delay / dt, 9))
+
+
+class EventBus:
+    """Events of a model that have not been delivered yet.
+
+    Events are kept in one bucket per receiver, multicast events once in a list of their own. Delayed events are kept in a heap keyed by the step they are due in: the step in which a delayed event is first seen by the scheduler is the step its delay starts counting down in, so the event is added to the heap then and taken out once, when it is due. Taking the due events is proportional to the number of due events, not to the number of pending events.
+
+    Behaves like the list of events it replaces for enqueuing and inspecting events (append, +=, len, iteration, positional access).
+    """
+
+    def __init__(self, events=()):
+        self.buckets = {}
+        self.multicasts = []
+        self.arrivals = []
+        self.heap = []
+        self.step = 0
+        self._sequence = 0
+        self._pending = 0
+        self.extend(events)
+
+    def append(self, event):
+        if isinstance(event, MulticastEvent):
+            self.multicasts.append(event)
+        elif isinstance(event, DelayedEvent):
+            self.arrivals.append(event)
+        else:
+            self.buckets.setdefault(event.receiver_id, []).append(event)
+        self._pending += 1
+
+    def extend(self, events):
+        for event in events:
+            self.append(event)
+
+    def __iadd__(self, events):
+        self.extend(events)
+        return self
+
+    def due(self, dt):
+        """Take the events that are due in the current step and move on to the next step.
+
+        Args:
+            dt: Float.
+                Step size of the model, used to count down the delay of delayed events
+
+        Returns:
+            Dictionary {receiver_id: [events]}, the events of each receiver in the order they were enqueued in, events that were delayed last
+        """
+        for event in self.arrivals:
+            heappush(self.heap, (self.step + delay_steps(event.delay, dt), self._sequence, event))
+            self._sequence += 1
+        self.arrivals = []
+
+        due, self.buckets = self.buckets, {}
+        while self.heap and self.heap[0][0] <= self.step:
+            event = heappop(self.heap)[2]
+            due.setdefault(event.receiver_id, []).append(event)
+
+        self.step += 1
+        self._pending -= sum(len(events) for events in due.values())
+        return due
+
+    def due_multicasts(self):
+        """Take the multicast events, which are due in the current step.
+
+        Returns:
+            List of multicast events, in the order they were enqueued in
+        """
+        due, self.multicasts = self.multicasts, []
+        self._pending -= len(due)
+        return due
+
+    def clear(self):
+        self.buckets = {}
+        self.multicasts = []
+        self.arrivals = []
+        self.heap = []
+        self._pending = 0
+
+    def _as_list(self):
+        events = [event for bucket in self.buckets.values() for event in bucket]
+        events += self.multicasts
+        events += self.arrivals
+        events += [entry[2] for entry in sorted(self.heap)]
+        return events
+
+    def __len__(self):
+        return self._pending
+
+    def __iter__(self):
+        return iter(self._as_list())
+
+    def __getitem__(self, index):
+        return self._as_list()[index]
+
+    def __eq__(self, other):
+        if isinstance(other, (EventBus, list, tuple)):
+            return self._as_list() == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return repr(self._as_list())
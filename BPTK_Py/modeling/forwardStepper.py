@@ -0,0 +1,217 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import numpy as np
+import pandas as pd
+
+from ..logger import log
+from .stepCompiler import compile_step
+
+
+class ForwardStepper:
+    """Forward-stepping evaluator for the SD equations of a Model.
+
+    The default engine evaluates an equation by recursing backwards through time via Model.memoize. The forward stepper instead orders the equations once, so that every equation comes after the equations it reads at the same timestep, and then advances all equations together, one timestep at a time. All values a step depends on are known when the step is evaluated, so there is no recursion through time and no recursion depth limit.
+
+    Results are stored in a float64 matrix with one row per equation and one column per timestep. They are also written to the model's memo, so Model.memoize keeps returning the same values as the recursive engine. Equations whose values are not numbers, e.g. the NumPy arrays of arrayed elements or of ensemble members, have no values in the matrix: their rows stay NaN, they are listed in non_scalar and their values are read via Model.memoize.
+
+    With compiled=True all equations are compiled into a single step function (see stepCompiler.compile_step), which evaluates one timestep without a function call per equation. The generated source is available via the source attribute.
+
+    Args:
+        model: Model.
+            The model whose equations are evaluated.
+        compiled: Boolean (Default=False).
+            Evaluate the equations via a compiled step function.
+        namespace: Dict (Default=None).
+            Additional global names for the compiled step function.
+        equations: List (Default=None).
+            Only evaluate these equations and the equations they depend on. Defaults to all equations of the model.
+    """
+
+    def __init__(self, model, compiled=False, namespace=None, equations=None):
+        self.model = model
+        self.compiled = compiled
+        self.namespace = namespace
+        self.equation_count = len(model.equations)
+        self.function_strings = model._function_strings()
+        self.graph = model.dependency_graph()
+        self.order = self.sort_equations(equations)
+        self.rows = {name: row for row, name in enumerate(self.order)}
+        self.functions = [model.equations[name] for name in self.order]
+
+        # the columns of the value matrix are the steps of the memo's time grid
+        self.grid = model.memo.grid
+        self.starttime = self.grid.starttime
+        self.stoptime = self.grid.stoptime
+        self.dt = self.grid.dt
+        self.times = self.grid.times
+        self.columns = {t: column for column, t in enumerate(self.times)}
+
+        self.values = np.full((len(self.order), len(self.times)), np.nan, dtype=np.float64)
+        self.non_scalar = []
+
+        self.source = None
+        self.memos = []
+        self.invariant = []
+        self.step = None
+
+    def compile(self):
+        """Compile the step function for the current memos of the model."""
+        memo = self.model.memo
+        self.memos = [memo.setdefault(name, {}) for name in self.order]
+        self.invariant = [mymemo.invariant for mymemo in self.memos]
+        for mymemo in self.memos:
+            mymemo.allocate()
+
+        invariant = [name for name, mymemo in zip(self.order, self.memos) if mymemo.invariant]
+        self.source, make_step = compile_step(self.model, self.order, self.function_strings, namespace=self.namespace, invariant=invariant)
+        self.step = make_step(self.model, self.model.equations, self.memos)
+
+    def matches_equations(self):
+        """Check whether the model still has the equations the stepper was built for."""
+        equations = self.model.equations
+        if len(equations) != self.equation_count:
+            return False
+
+        return all(equations.get(name) is function for name, function in zip(self.order, self.functions))
+
+    def matches_runspecs(self):
+        """Check whether the time grid of the stepper still matches the runspecs of the model."""
+        return self.grid is self.model.memo.grid
+
+    def sort_equations(self, equations=None):
+        """Order the equations of the model topologically.
+
+        Dependencies are taken from the function strings of the model's elements. Equations that were added directly as lambda functions have no known dependencies and keep their position. Cyclic same-step dependencies are logged and resolved on demand via Model.memoize during the run, just as the recursive engine would.
+
+        Args:
+            equations: List (Default=None).
+                Only order these equations and the equations they depend on. Defaults to all equations.
+
+        Returns:
+            List of equation names in evaluation order.
+        """
+        names = None if equations is None else self.graph.required(equations)
+
+        for cycle in self.graph.cycles(names):
+            log("[WARN] Model {}: Equations {} depend on each other at the same timestep.".format(self.model.name, ", ".join(cycle)))
+
+        return self.graph.order(names)
+
+    def run(self, until=None):
+        """Advance all equations from the model's starttime until the given time.
+
+        Values that are already memoized are reused, so calling run repeatedly with increasing until only evaluates the new timesteps.
+
+        Args:
+            until: Float (Default=None).
+                The last timestep to evaluate. Defaults to the stoptime of the model.
+
+        Returns:
+            The float64 matrix of values (equations x timesteps).
+        """
+        until = self.stoptime if until is None else until
+        last_column = len(self.times) - 1
+        while last_column >= 0 and self.times[last_column] > until:
+            last_column -= 1
+
+        equations = self.model.equations
+        memo = self.model.memo
+        memos = [memo.setdefault(name, {}) for name in self.order]
+        generation = memo.generation
+
+        # time-invariant equations are evaluated once, before the first step, and used for all steps of the run
+        if last_column >= 0:
+            for name, mymemo in zip(self.order, memos):
+                if mymemo.invariant:
+                    if not mymemo.has_value(0):
+                        mymemo.set_value(0, equations[name](self.times[0]))
+                    mymemo.get_value(last_column)
+
+        if self.compiled:
+            # the step function is bound to the memos, recompile if a memo was replaced or changed its number of slots
+            if len(memos) != len(self.memos) or any(mymemo is not bound or mymemo.invariant != invariant for mymemo, bound, invariant in zip(memos, self.memos, self.invariant)):
+                self.compile()
+
+            step = self.step
+            for column in range(last_column + 1):
+                step(self.times[column], column, generation)
+        else:
+            rows = [(equations[name], mymemo) for name, mymemo in zip(self.order, memos) if not mymemo.invariant]
+            for column in range(last_column + 1):
+                t = self.times[column]
+                for function, mymemo in rows:
+                    if not (column < len(mymemo.stamps) and mymemo.stamps[column] == generation):
+                        mymemo.set_value(column, function(t))
+
+        self.fill_values(memos, last_column)
+
+        return self.values
+
+    def fill_values(self, memos, last_column):
+        """Copy the values of the memos into the value matrix.
+
+        Rows of equations whose values are not numbers are skipped and stay NaN. These equations are added to non_scalar and logged once.
+        """
+        values = self.values
+        non_scalar = []
+        for row, mymemo in enumerate(memos):
+            row_values = [mymemo.slot] * (last_column + 1) if mymemo.invariant else mymemo.values[:last_column + 1]
+            try:
+                values[row, :last_column + 1] = np.array(row_values, dtype=np.float64)
+            except (TypeError, ValueError):
+                values[row, :last_column + 1] = np.nan
+                if not self.order[row] in self.non_scalar:
+                    non_scalar.append(self.order[row])
+
+        if non_scalar:
+            log("[WARN] Model {}: Equations {} do not have scalar values, read their values via Model.memoize.".format(self.model.name, ", ".join(non_scalar)))
+            self.non_scalar += non_scalar
+
+    def value(self, equation, t):
+        """Get the value of an equation at time t from the value matrix.
+
+        Args:
+            equation: String.
+                Name of the equation.
+            t: Float.
+                A timestep of the time grid.
+
+        Returns:
+            Float.
+        """
+        return self.values[self.rows[equation], self.columns[t]]
+
+    def frame(self, equations, start=None, until=None):
+        """Build a DataFrame with one column per equation, indexed by time.
+
+        Args:
+            equations: List.
+                Names of the equations to include.
+            start: Float (Default=None).
+                First timestep to include. Defaults to the starttime.
+            until: Float (Default=None).
+                Last timestep to include. Defaults to the stoptime.
+
+        Returns:
+            A pandas DataFrame.
+        """
+        start = self.starttime if start is None else start
+        until = self.stoptime if until is None else until
+        columns = [column for column, t in enumerate(self.times) if start <= t <= until]
+
+        df = pd.DataFrame(
+            {equation: self.values[self.rows[equation], columns] for equation in equations},
+            index=[self.times[column] for column in columns]
+        )
+        df.index.name = "t"
+        return df
@@ -11,17 +11,22 @@
 
 
 import random
+from contextlib import contextmanager
 
 import ipywidgets as widgets
 import numpy as np
 import math
 from IPython.display import display
-from scipy.interpolate import interp1d
 
-from ..util import floating_point as fp
+from ..util import ConstantOverride, LookupTable, MemoStore, PointsStore
 
 from .agent import Agent
-from .event import Event
+from .agentStore import AgentIds, AgentStore, AgentTypeMap
+from .event import Event, MulticastEvent
+from .eventBus import EventBus
+from .dependencyGraph import DependencyGraph, EquationStore, STATE, TIME_INVARIANT, TIME_ONLY
+from .forwardStepper import ForwardStepper
+from .stepCompiler import evaluate_time_functions
 from ..logger import log
 from ..sddsl import Constant, Converter, Flow, Biflow, NaryOperator, Stock
 
@@ -38,23 +43,35 @@ class Model:
             Scheduler object (e.g. simultaneousScheduler). This is configurable, so that you can add your own scheduling algorithms.
         data_collector: DataCollector
             Instance of DataCollector. This is configurable, so that you can add your own data collection algorithms.
+        engine: String (Default="memo").
+            Engine used to evaluate SD equations in simulations. "memo" evaluates equations on demand by recursing backwards through time, "forward" steps all equations forward through time (see ForwardStepper), "compiled" does the same using a single compiled step function for all equations.
 
     """
 
 
-    def __init__(self, starttime=0.0, stoptime=0.0, dt=1.0,name="", scheduler=None,data_collector=None):
+    def __init__(self, starttime=0.0, stoptime=0.0, dt=1.0,name="", scheduler=None,data_collector=None, engine="memo"):
+
+        if engine not in ["memo", "forward", "compiled"]:
+            raise ValueError("Engine needs to be either \"memo\", \"forward\" or \"compiled\", got {}".format(engine))
 
         self._caching_on = False
+        self.engine = engine
+        self._forward_stepper = None
+        self._dependency_graph = None
+        self._equation_kinds = None  # kinds of the equations, recomputed when the dependency graph changes
+        self._deferred = None  # elements whose functions are generated when the model is frozen, None unless the model is being built
+        self._array_values = False  # set once an equation introduces NumPy array values, before that all elements have scalar values (see Element.shape)
+        self._shapes = {}  # shapes of the values of elements, resolved on demand and cleared whenever an equation changes
 
         # for ABM models
         self.properties = {}
-        self.agents = []
+        self.agents = AgentStore()
         self.next_agent_id=0
         self.name = name
-        self.agent_type_map = {}
+        self.agent_type_map = AgentTypeMap()
         self.data_collector = data_collector
         self.scheduler = scheduler
-        self.events = []
+        self.events = EventBus()
 
         # Global Model variables (for SD as well as ABM)
         self.starttime = starttime*1.0
@@ -119,7 +136,7 @@ class Model:
 
 
         self.agent_factories[agent_type] = agent_factory
-        self.agent_type_map[agent_type] = []
+        self.agent_type_map[agent_type] = AgentIds()
 
 
     def reset(self):
@@ -127,9 +144,9 @@ class Model:
         Cleara out all agents, agent and event statistics and resets the cache of SD equations. Keeps the agent factories though, so you could directly reconfigure the model using the configure method.
         """
         for agent_type in self.agent_type_map:
-            self.agent_type_map[agent_type] = []
+            self.agent_type_map[agent_type] = AgentIds()
 
-        self.agents = []
+        self.agents = AgentStore()
 
         self.reset_cache()
 
@@ -158,14 +175,10 @@ class Model:
                 ID of agent that is to be retrieved.
         
         Returns:
-            Agent object
+            Agent object, None if there is no agent with this ID
         """
-        for agent in self.agents:
-            if agent.id==agent_id:
-                return agent
+        return self.agents.get(agent_id)
 
-        return None
-    
 
     def create_agents(self, agent_spec):
         """Create agents according to the agent specification.
@@ -193,6 +206,44 @@ class Model:
                 The properties to initialize the agent with.
         """
 
+        agent = self._instantiate_agent(agent_type, agent_properties)
+        self._register_agent(agent, agent_type)
+        return agent
+
+    def create_agents_bulk(self, agent_type, count, properties_template=None):
+        """Create many agents of the given type and with the given properties.
+
+        The agent factory is called once to create a prototype, all other agents are clones of the prototype (see Agent.clone), so the constructor of the agents runs only once. initialize is called for every agent. Use create_agents if the factory or the constructor need to run for each agent, e.g. because they draw random property values.
+
+        Args:
+            agent_type: String.
+                Type of agent
+            count: Integer.
+                Number of agents to create
+            properties_template: Dict.
+                The properties to initialize the agents with. Each agent gets its own copy.
+
+        Returns:
+            List of the created agents
+        """
+        if count <= 0:
+            return []
+
+        log("[INFO] Creating {} agents of type {} in bulk".format(count, agent_type))
+
+        prototype = self._instantiate_agent(agent_type, properties_template)
+
+        agents = [prototype]
+        for _ in range(count - 1):
+            agents.append(prototype.clone(self.next_agent_id))
+            self.next_agent_id += 1
+
+        for agent in agents:
+            self._register_agent(agent, agent_type)
+
+        return agents
+
+    def _instantiate_agent(self, agent_type, agent_properties):
         class NotAnAgentException(Exception):
             pass
 
@@ -203,34 +254,59 @@ class Model:
         if not isinstance(agent,Agent):
             raise NotAnAgentException("{} is not an instance of BPTK_Py.Agent. Please only use subclasses of Agent".format(agent))
 
+        return agent
+
+    def _register_agent(self, agent, agent_type):
         agent.initialize()
-        self.agents.append(agent)
+        self.agents.append(agent, agent_type)
         self.agent_type_map[agent_type].append(agent.id)
-        return agent
 
     def delete_agent(self,agent_id):
+        """Delete an agent.
+
+        Args:
+            agent_id: Integer.
+                ID of the agent that is to be deleted.
+        """
         self.delete_agents([agent_id])
 
     def delete_agents(self,agent_ids):
-        temp_agents=[]
-        agent_types=[]
+        """Delete agents.
 
-        for agent in self.agents:
-            if agent.id not in agent_ids:
-                temp_agents.append(agent)
-            else:
-                agent_types.append(agent.agent_type)
+        Removes the agents from the agent store and from the agent type map. IDs of agents that do not exist are ignored.
 
-        self.agents=temp_agents
+        Args:
+            agent_ids: List.
+                IDs of the agents that are to be deleted.
+        """
+        for agent_id in agent_ids:
+            agent_type = self.agents.agent_types.get(agent_id)
+
+            if self.agents.pop(agent_id, None) is None:
+                continue
+
+            type_ids = self.agent_type_map.get(agent_type)
+            if type_ids is not None and agent_id in type_ids:
+                type_ids.remove(agent_id)
+
+    def delete_agents_in_state(self, agent_type, state):
+        """Delete all agents of a type that are in a given state.
+
+        The agents are taken from the index of agents by type and state, so only the deleted agents are visited.
+
+        Args:
+            agent_type: String.
+                Agent type
+            state: String.
+                State of the agents that are to be deleted.
+
+        Returns:
+            List of the IDs of the deleted agents
+        """
+        agent_ids = [agent.id for agent in self.agents.in_state(agent_type, state)]
+        self.delete_agents(agent_ids)
+        return agent_ids
 
-        for agent_type in agent_types:
-            self.agent_type_map[agent_type]=[]
-            for agent in self.agents:
-                if agent.agent_type == agent_type:
-                    self.agent_type_map[agent_type].append(agent.id)
-            
-        
-                    
 
     def set_property(self, name, property_spec):
         """Configure a property of the model itself, as opposed to the properties of individual agents.
@@ -320,9 +396,36 @@ class Model:
             if self.properties[name]["type"] == "Lookup":
                 self.points[name] = value
 
+        # equations are kept in an EquationStore, which records changes for the dependency graph
+        if name == "equations" and not isinstance(value, EquationStore):
+            value = EquationStore(value)
+
+        # agents are kept in an AgentStore and their ids in an AgentTypeMap, which index the agents by id
+        if name == "agents" and not isinstance(value, AgentStore):
+            value = AgentStore(value)
+
+        if name == "agent_type_map" and not isinstance(value, AgentTypeMap):
+            value = AgentTypeMap(value)
+
+        # events are kept in an EventBus, which buckets them per receiver and keeps delayed events until they are due
+        if name == "events" and not isinstance(value, EventBus):
+            value = EventBus(value)
+
+        # points are kept in a PointsStore, which compiles lookup tables
+        if name == "points" and isinstance(value, dict) and not isinstance(value, PointsStore):
+            value = PointsStore(value)
+
+        # the memo is always a MemoStore on the time grid of the model, plain dictionaries (e.g. cached memos of a scenario) are converted
+        if name == "memo" and not isinstance(value, MemoStore):
+            memo = MemoStore(self.starttime, self.stoptime, self.dt)
+            memo.update(value)
+            value = memo
 
         super.__setattr__(self, name, value)
 
+        if name in ["starttime", "stoptime", "dt", "memo"] and "memo" in self.__dict__:
+            self.memo.set_grid(self.starttime, self.stoptime, self.dt)
+
     def run_specs(self, starttime, stoptime, dt):
         """Configure the runspecs of the model.
 
@@ -480,7 +583,7 @@ class Model:
     def next_agent(self, agent_type, state):
         """Get the next agent by type and state.
 
-        Runs through the internal agent store and retrieves the first agent that matches in type and state.
+        Retrieves the first agent (in the order the agents were created in) that matches in type and state from the index of agents by type and state of the agent store.
 
         Args:
             agent_type: String.
@@ -492,12 +595,7 @@ class Model:
             The first agent object that matches the criterian None otherwise.
         """
 
-        for agent in self.agents:
-
-            if agent.agent_type == agent_type and agent.state == state:
-                return agent
-
-        return None
+        return self.agents.first(agent_type, state)
 
     def random_agents(self, agent_type, num_agents):
         """Retrieve a number of random agents
@@ -533,32 +631,70 @@ class Model:
                 Agent type that is to receive the event
             num_agents: Integer.
                 Number of random agents that should receive the event
-            event_factory: Function.
+            event_factory: Function or Event.
                 The factory (typicalla a lambda function) that generates the desired event for a given target agent type. The function receives the agent_id as its parameter.
+                Alternatively an event that all receivers share, which is sent once as a MulticastEvent to the ids of the random agents.
         """
         agent_ids = self.random_agents(agent_type, num_agents)
 
+        if isinstance(event_factory, Event):
+            self.enqueue_event(MulticastEvent(event_factory.name, event_factory.sender_id, event_factory.data, receiver_ids=agent_ids))
+            return
+
         for agent_id in agent_ids:
             self.enqueue_event(event_factory(agent_id))
 
-    def broadcast_event(self, agent_type, event_factory):
+    def broadcast_event(self, agent_type, event_factory, state=None):
         """
         Broadcast an event to all agents of a particular agent_type
 
         Args:
             agent_type: String.
                 Agent type that is to receive the event
-            event_factory: Function.
+            event_factory: Function or Event.
                 The factory (typicalla a lambda function) that generates the desired event for a given target agent type. The function receives the agent_id as its parameter.
+                Alternatively an event that all receivers share, which is sent once as a MulticastEvent. Its receivers are the agents of the type (and state) when the event is delivered.
+            state: String (default=None).
+                If set, only agents in this state receive the event
         """
 
         if not type(agent_type) == str:
             from BPTK_Py.exceptions import  WrongTypeException
             raise WrongTypeException("param {} for agent_type is not of type str".format(agent_type))
 
-        for agent_id in self.agent_type_map[agent_type]:
+        agent_ids = self.agent_type_map[agent_type]
+
+        if isinstance(event_factory, Event):
+            self.enqueue_event(MulticastEvent(event_factory.name, event_factory.sender_id, event_factory.data, agent_type=agent_type, state=state))
+            return
+
+        if state is not None:
+            agent_ids = [agent.id for agent in self.agents.in_state(agent_type, state)]
+            agent_ids.sort(key=self.agents.sequences.get)
+
+        for agent_id in agent_ids:
             self.enqueue_event(event_factory(agent_id))
 
+    def multicast_receivers(self, event):
+        """
+        Get the agents that receive a multicast event.
+
+        Args:
+            event: MulticastEvent.
+                The event
+
+        Returns:
+            List of agents. Agents that were deleted are left out, agents are contained once per occurrence of their id in the receiver ids of the event.
+        """
+        if event.receiver_ids is not None:
+            receivers = [self.agent(agent_id) for agent_id in event.receiver_ids]
+            return [agent for agent in receivers if agent is not None]
+
+        if event.state is not None:
+            return self.agents.in_state(event.agent_type, event.state)
+
+        return [self.agent(agent_id) for agent_id in self.agent_type_map.get(event.agent_type, [])]
+
     def configure_properties(self,properties):
         """
         Called to configure model proerties using a dictionary. 
@@ -585,10 +721,10 @@ class Model:
         """
 
         for agent_type in self.agent_type_map:
-            self.agent_type_map[agent_type] = []
+            self.agent_type_map[agent_type] = AgentIds()
+
+        self.agents = AgentStore()
 
-        self.agents = []
-        
         for agent in config:
             self.create_agents(agent)
         
@@ -639,14 +775,20 @@ class Model:
             Integer.
 
         """
-        agent_count = 0
-        agent_ids = self.agent_type_map[agent_type]
+        return self.agents.count(agent_type, state)
 
-        for agent_id in agent_ids:
-            if self.agents[agent_id].state == state:
-                agent_count += 1
+    def agent_state_counts(self, agent_type):
+        """
+        Get the number of agents of a given type per state
+
+        Args:
+            agent_type: String.
+                Agent type to get counts for
 
-        return agent_count
+        Returns:
+            Dictionary {state: count}. States without agents are left out.
+        """
+        return self.agents.state_counts(agent_type)
 
     def statistics(self):
         """Get statistics from DataCollector
@@ -685,32 +827,35 @@ class Model:
         Function that interpolate between set of points. This is used by the SD DSL lookup function.
         
         Args:
-            x: Value.
-                x-value to find the y value for
-            points: List.
-                List of coordinates.
+            x: Value or NumPy array.
+                x-value(s) to find the y value for
+            points: String or List.
+                Name of the points of a graphical function or list of coordinates.
         
         Returns: Float.
-            Returns the value that has been looked up.
+            Returns the value that has been looked up, a NumPy array for arrays of x-values.
         """
 
         #This is used internally by SD DSL lookup function / the Lookup operator.
 
         if type(points) is str:
-            points = self.points[points]
+            return self.points.table(points)(x)
 
+        return LookupTable(points)(x)
 
-        x_vals = np.array([x[0] for x in points])
-        y_vals = np.array([x[1] for x in points])
+    def lookup_table(self, name):
+        """Get the compiled lookup table of a graphical function.
 
-        if x <= x_vals[0]:
-            return y_vals[0]
+        The table is compiled when it is first used and recompiled after the points were changed. It can be called with single x-values or NumPy arrays of x-values for batched lookups.
 
-        if x >= x_vals[len(x_vals) - 1]:
-            return y_vals[len(x_vals) - 1]
+        Args:
+            name: String.
+                Name of the points.
 
-        f = interp1d(x_vals, y_vals)
-        return float(f(x))
+        Returns: LookupTable.
+            The compiled table.
+        """
+        return self.points.table(name)
 
 
     def plot_lookup(self,lookup_names,config=None):
@@ -765,27 +910,113 @@ class Model:
         self.equation_id += 1
         return "bptk_"+str(self.equation_id)+"_"
 
+    @contextmanager
+    def build(self):
+        """Build the System Dynamics part of the model in a build phase.
+
+        Within the build phase, setting equations and initial values of elements only records them. When the block is left, the model is frozen: the function strings of all changed elements are built and compiled once (see freeze). This keeps building large models linear in the number of elements, even if equations are set several times. Errors in equations that only show when their terms are built are raised when the model is frozen.
+
+        Evaluating an equation or requesting the dependency graph within the block freezes the model early, later changes then take effect immediately again.
+
+        Example:
+            with model.build():
+                stock = model.stock("stock")
+                flow = model.flow("flow")
+                stock.equation = flow
+
+        Yields: Model.
+            The model.
+        """
+        if self._deferred is not None:
+            # nested build phases are frozen by the outermost one
+            yield self
+            return
+
+        self._deferred = {}
+        try:
+            yield self
+        finally:
+            self.freeze()
+
+    def freeze(self):
+        """End the build phase (see build) and generate the functions of all elements that were changed within it.
+
+        Does nothing if the model is not being built.
+        """
+        deferred = self._deferred
+        self._deferred = None
+        if not deferred:
+            return
+
+        names = list(deferred.keys())
+        for index, name in enumerate(names):
+            element, build = deferred[name]
+            try:
+                if build:
+                    element.build_function_string()
+                element.generate_function()
+            except Exception:
+                # keep the remaining elements deferred, so the model can be frozen again once the equation is fixed
+                self._deferred = {name: deferred[name] for name in names[index:]}
+                raise
+
+    def _defer(self, element, build=False):
+        """Defer generating the function of an element while the model is being built.
+
+        Until the model is frozen, the equation of the element is a placeholder that freezes the model when it is evaluated.
+
+        Args:
+            element: Element.
+                The element.
+            build: Boolean (Default=False).
+                Whether the function string needs to be built from the equation of the element first.
+
+        Returns: Boolean.
+            False if the model is not being built, the element then generates its function immediately.
+        """
+        if self._deferred is None:
+            return False
+
+        self._deferred[element.name] = (element, build)
+        element._function = element._deferred_function
+        self.equations[element.name] = element._function
+        if element.name not in self.memo:
+            self.memo[element.name] = {}
+        return True
+
+    def _is_deferred(self, element):
+        return self._deferred is not None and element.name in self._deferred
+
     def equation(self,equation, t):
         #TODO this is the same as the evaluate_equation method. Replace it.
         return self.memoize(equation,t)
 
     def memoize(self, equation, arg):
         #TODO: consider making this into an internal method
+        memo = self.memo
+        grid = memo.grid
 
-        #normalize the arg
-
-        normalized_arg= fp.normalize(arg, self.dt, self.starttime, max(fp.scale(self.starttime), fp.scale(self.dt)))
         try:
-            mymemo = self.memo[equation]
-        except:
+            mymemo = memo[equation]
+        except KeyError:
             # In case the equation does not exist in memo
-            self.memo[equation] = {}
-            mymemo = self.memo[equation]
-        if normalized_arg in mymemo.keys():
-            return mymemo[normalized_arg]
-        else:
-            result = self.equations[equation](normalized_arg)
-            mymemo[normalized_arg] = result
+            memo[equation] = {}
+            mymemo = memo[equation]
+
+        # map the arg to its step on the time grid, this also normalizes the arg
+        index = round((arg - grid.starttime) / grid.dt)
+
+        stamps = mymemo.stamps
+        if 0 <= index < len(stamps):
+            if stamps[index] == memo.generation:
+                return mymemo.values[index]
+        elif mymemo.has_value(index):
+            # single slot of a time-invariant equation or a timestep outside of the grid
+            return mymemo.get_value(index)
+
+        normalized_arg = grid.times[index] if 0 <= index < grid.size else grid.time(index)
+        result = self.equations[equation](normalized_arg)
+        mymemo.set_value(index, result)
 
         return result
 
@@ -916,6 +1147,160 @@ class Model:
         """
         return self.memoize(name,t)
 
+    def dependency_graph(self):
+        """Get the dependency graph of the System Dynamics equations.
+
+        The graph is built from the function strings of the model's elements, which are generated from their SD DSL equations. Equations that were added as Python functions via add_equation have no known dependencies, they are opaque. The entries of equations that are added or replaced are updated when the graph is requested (see EquationStore).
+
+        Returns: DependencyGraph.
+            The graph, use its cycles method to find equations that depend on each other at the same timestep.
+        """
+        self.freeze()
+        changed = self.equations.take_changes()
+
+        if self._dependency_graph is None:
+            kinds = {name: self._function_kind(name) for name in self.equations}
+            self._dependency_graph = DependencyGraph.from_function_strings(self._function_strings(), self.equations, self.constants, kinds)
+            self._equation_kinds = None
+        elif changed:
+            self._update_dependency_graph(changed)
+            self._equation_kinds = None
+
+            # a single slot holds the value of a time-invariant equation for all timesteps, if the equation or an equation it reads changed the value only holds for the steps it was used for
+            for name in self._dependency_graph.dependents(changed):
+                if name in self.memo:
+                    self.memo[name].set_invariant(False)
+
+        return self._dependency_graph
+
+    def _function_kind(self, name):
+        """Kind of an equation without function string: constants set by a scenario are time-invariant, nothing is known about other functions."""
+        return TIME_INVARIANT if isinstance(self.equations.get(name), ConstantOverride) else STATE
+
+    def _update_dependency_graph(self, changed):
+        """Update the entries of the dependency graph for the equations that were written since it was built."""
+        graph = self._dependency_graph
+
+        for name in changed:
+            if name not in self.equations:
+                graph.remove(name)
+            else:
+                element = None
+                for elements in [self.constants, self.converters, self.flows, self.biflows, self.stocks]:
+                    element = elements.get(name, element)
+                function_string = element.function_string if element is not None and self.equations[name] is getattr(element, "_function", None) else None
+                graph.set_function_string(name, function_string, name in self.constants, self._function_kind(name))
+
+    def equation_kinds(self):
+        """Classify the System Dynamics equations by what their values depend on (see DependencyGraph.classify).
+
+        Returns: Dict.
+            For each equation its kind: "time_invariant" (e.g. constants and converters that only read constants), "time_only" (e.g. step, pulse or sinwave of constants) or "state".
+        """
+        graph = self.dependency_graph()
+        if self._equation_kinds is None:
+            self._equation_kinds = graph.classify()
+        return dict(self._equation_kinds)
+
+    def prepare_run(self, until=None):
+        """Prepare the memo for a simulation run based on the kinds of the equations (see equation_kinds).
+
+        Time-invariant equations are evaluated once per run, their memos keep a single slot instead of one slot per timestep. Time-only equations that can be evaluated for NumPy arrays are evaluated for all timesteps until the given time at once, all other equations are evaluated step by step as before. Values that are already memoized are kept.
+
+        Args:
+            until: Float (Default=None).
+                The last timestep of the run. Defaults to the stoptime of the model.
+
+        Returns: Dict.
+            The kinds of the equations.
+        """
+        kinds = self.equation_kinds()
+        graph = self.dependency_graph()
+
+        for name in kinds:
+            if name not in self.memo:
+                self.memo[name] = {}
+        self.memo.set_invariant([name for name, kind in kinds.items() if kind == TIME_INVARIANT])
+
+        time_only = graph.order([name for name, kind in kinds.items() if kind == TIME_ONLY])
+        if time_only:
+            evaluate_time_functions(self, time_only, self._function_strings(), kinds, until)
+
+        return kinds
+
+    def _function_strings(self):
+        """Collect the function strings of the model's elements by equation name.
+
+        Equations that were replaced after the element generated its function (e.g. via add_equation) are skipped, as the function string no longer describes them.
+        """
+        function_strings = {}
+        for elements in [self.constants, self.converters, self.flows, self.biflows, self.stocks]:
+            for name, element in elements.items():
+                if self.equations.get(name) is getattr(element, "_function", None):
+                    function_strings[name] = element.function_string
+        return function_strings
+
+    def run_forward(self, until=None, equations=None):
+        """Evaluate the System Dynamics equations by stepping forward through time.
+
+        The equations are ordered once and then advanced together from the starttime until the given time. With the "compiled" engine, one compiled function evaluates all equations of a timestep. Results are written to the memo, so subsequent calls to evaluate_equation are simple lookups.
+
+        Args:
+            until: Float (Default=None).
+                The last timestep to evaluate. Defaults to the stoptime of the model.
+            equations: List (Default=None).
+                Only evaluate these equations and the equations they depend on (see dependency_graph). Defaults to all equations.
+
+        Returns: ForwardStepper.
+            The stepper holding the matrix of results (equations x timesteps).
+        """
+        self.freeze()
+        self.prepare_run(until)
+        stepper = self._forward_stepper
+        compiled = self.engine == "compiled"
+
+        if stepper is not None and (not stepper.matches_equations() or not stepper.matches_runspecs() or stepper.compiled != compiled):
+            stepper = None
+
+        needed = set(self.equations) if equations is None else self.dependency_graph().required(equations)
+
+        if stepper is not None and not needed <= set(stepper.rows):
+            # extend the stepper by the equations it is missing
+            equations = None if equations is None else list(stepper.order) + list(equations)
+            stepper = None
+
+        if stepper is None:
+            stepper = ForwardStepper(self, compiled=compiled, equations=equations)
+            self._forward_stepper = stepper
+
+        stepper.run(until)
+
+        return stepper
+
+    def invalidate_cache(self, equations=(), points=()):
+        """Invalidate the cached results that depend on changed equations or graphical functions.
+
+        Unlike reset_cache, only the memos of the changed equations and of the equations depending on them (see DependencyGraph.affected) are cleared, all other results are kept and reused by the next simulation.
+
+        Args:
+            equations: Iterable (Default=()).
+                Names of the changed equations, e.g. constants.
+            points: Iterable (Default=()).
+                Names of the changed graphical functions.
+
+        Returns: Set.
+            Names of the invalidated equations.
+        """
+        # values computed from an equation read it via memoize, which stores it in its memo. Equations whose memos were never written (e.g. elements whose equation was just set) have no cached dependents
+        equations = [equation for equation in equations if equation not in self.memo or self.memo[equation].written()]
+        if not equations and not points:
+            return set()
+
+        invalidated = self.dependency_graph().affected(equations, points)
+        self.memo.invalidate(invalidated)
+
+        return invalidated
+
     def reset_cache(self):
         """Reset cache of all System Dynamics equations and of the ABM data collector
         """
@@ -925,8 +1310,10 @@ class Model:
         for agent in self.agents:
             agent.reset_cache()
 
-        for equation in self.memo:
-            self.memo[equation] = {}
+        self.memo.reset()
+
+        self._forward_stepper = None
+        self._dependency_graph = None
 
 
 
@@ -12,7 +12,6 @@
 
 from .scheduler import Scheduler
 from ..logger import log
-from .event import DelayedEvent
 
 #################################
 ## SIMULTANEOUSSCHEDULER CLASS ##
@@ -79,19 +78,31 @@ class SimultaneousScheduler(Scheduler):
 
         log("[INFO] Round #{} Step #{}, collect_data={}".format(sim_round, step, collect_data))
 
-        # the simultaneous scheduler first distributes all events to all agents ...
+        # the simultaneous scheduler first distributes all events that are due to the agents ...
+        # delayed events stay in the event bus of the model until their delay has passed
 
-        while len(model.events) > 0:
+        # the receivers of a multicast event share the event. Agents handle their events last in, first out, so multicast events are received first (in reverse) and handled after the other events, in the order they were enqueued in
 
-            # Check if the event is of type DelayedEvent. If yes, we do not get a reply here and the event will be stored in self.delayed_events
+        for event in reversed(model.events.due_multicasts()):
+            receivers = model.multicast_receivers(event)
 
-            event = self.handle_delayed_event(model.events.pop(), dt=model.dt)
+            for receiver in receivers:
+                receiver.receive_event(event)
 
-            if event:
-                model.agents[event.receiver_id].receive_event(event)
+            if model.data_collector and receivers:
+                model.data_collector.record_event(time, event, count=len(receivers))
 
-                if model.data_collector:
-                    model.data_collector.record_event(time, event)
+        for receiver_id, events in model.events.due(model.dt).items():
+            # events to agents that were deleted in the meantime are dropped
+            receiver = model.agent(receiver_id)
+
+            if receiver is not None:
+                # agents handle their events last in, first out, so they handle them in the order they were enqueued in
+                for event in reversed(events):
+                    receiver.receive_event(event)
+
+                    if model.data_collector:
+                        model.data_collector.record_event(time, event)
 
         # give the model a chance to update dynamic properties etc.
 
@@ -115,9 +126,3 @@ class SimultaneousScheduler(Scheduler):
                 if sim_round == model.stoptime and step == (round(1 / model.dt) - 1):
                     model.data_collector.collect_agent_statistics(time, model.agents)
 
-
-        # If any delayed events observed, store them in the model's events list for later use
-        model.events += self.delayed_events
-
-        self.delayed_events = []
-
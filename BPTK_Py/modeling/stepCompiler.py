@@ -0,0 +1,308 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import ast
+from functools import lru_cache, reduce
+
+import numpy as np
+
+from ..sddsl import element as sddsl_element
+from .dependencyGraph import TIME_INVARIANT
+
+
+def vector_max(*args):
+    """max that compares NumPy arrays element-wise"""
+    if len(args) > 1 and any(isinstance(arg, np.ndarray) for arg in args):
+        return reduce(np.maximum, args)
+    return max(*args)
+
+
+def vector_min(*args):
+    """min that compares NumPy arrays element-wise"""
+    if len(args) > 1 and any(isinstance(arg, np.ndarray) for arg in args):
+        return reduce(np.minimum, args)
+    return min(*args)
+
+
+def _parse_template(source, **nodes):
+    """Parse a code template and replace the placeholder names in it by the given AST nodes."""
+
+    class Substitute(ast.NodeTransformer):
+        def visit_Name(self, node):
+            return nodes.get(node.id, node)
+
+    tree = ast.parse(source)
+    return Substitute().visit(tree).body
+
+
+def _parse_function_string(function_string):
+    """Get the body expression of a SD DSL function string of the form "lambda model, t: ...".
+
+    Returns:
+        The AST node of the expression, None if the string is not a lambda of model and t.
+    """
+    try:
+        tree = ast.parse(function_string, mode="eval")
+    except (SyntaxError, ValueError):
+        return None
+
+    function = tree.body
+    if not isinstance(function, ast.Lambda) or [arg.arg for arg in function.args.args] != ["model", "t"]:
+        return None
+
+    return function.body
+
+
+def _is_memoize_call(node):
+    return (isinstance(node, ast.Call)
+            and isinstance(node.func, ast.Attribute) and node.func.attr == "memoize"
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == "model"
+            and len(node.args) == 2 and not node.keywords
+            and isinstance(node.args[0], ast.Constant) and isinstance(node.args[0].value, str))
+
+
+def _is_previous_step(node):
+    """Check whether a time argument is t-model.dt"""
+    return (isinstance(node, ast.BinOp) and isinstance(node.op, ast.Sub)
+            and isinstance(node.left, ast.Name) and node.left.id == "t"
+            and isinstance(node.right, ast.Attribute) and node.right.attr == "dt"
+            and isinstance(node.right.value, ast.Name) and node.right.value.id == "model")
+
+
+class _ReferenceTransformer(ast.NodeTransformer):
+    """Replace the model.memoize calls of one equation by reads of local variables and memo slots.
+
+    Reads at time t of equations computed earlier in the step become reads of their local variable, reads at time t-model.dt become reads of the previous slot of their memo. Reads of time-invariant equations at any time become reads of their local variable, which holds the single slot of their memo. All other calls (e.g. delays or equations computed later in the step) are kept.
+    """
+
+    def __init__(self, rows, row, invariant=()):
+        self.rows = rows
+        self.row = row
+        self.invariant = invariant
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+
+        if not _is_memoize_call(node) or node.args[0].value not in self.rows:
+            return node
+
+        dependency = self.rows[node.args[0].value]
+        time = node.args[1]
+
+        if node.args[0].value in self.invariant:
+            return ast.Name(id="x{}".format(dependency), ctx=ast.Load())
+
+        if isinstance(time, ast.Name) and time.id == "t":
+            return ast.Name(id="x{}".format(dependency), ctx=ast.Load()) if dependency < self.row else node
+
+        if _is_previous_step(time):
+            return _parse_template(
+                "(v{row}[previous] if previous >= 0 and s{row}[previous] == generation else MEMOIZE)".format(row=dependency),
+                MEMOIZE=node
+            )[0].value
+
+        return node
+
+
+def compile_step(model, order, function_strings, name="step", namespace=None, invariant=()):
+    """Compile a single Python function that evaluates all equations of a model for one timestep.
+
+    The function is built as an AST from the function strings of the model's elements. Equations are evaluated in the given order and stored directly in the slots of their StepMemo, equation references become local variable or list slot reads instead of calls to Model.memoize. Equations without a function string are called via model.equations. Time-invariant equations are not evaluated by the step function, it reads the single slot of their memo, which has to be filled before the first step.
+
+    The generated module defines make_step(model, equations, memos), which binds the memos and returns step(t, column, generation).
+
+    Args:
+        model: Model.
+            The model whose equations are compiled.
+        order: List.
+            Names of the equations in evaluation order.
+        function_strings: Dict.
+            Function strings of the elements by equation name.
+        name: String (Default="step").
+            Name of the compiled module, used in tracebacks.
+        namespace: Dict (Default=None).
+            Additional global names for the compiled function, e.g. replacements for builtins.
+        invariant: Iterable (Default=()).
+            Names of the time-invariant equations, whose memos keep a single slot.
+
+    Returns:
+        Tuple (source, make_step): the source code of the generated module and the make_step function.
+    """
+    rows = {equation: row for row, equation in enumerate(order)}
+    invariant = set(invariant)
+
+    bindings = []
+    slots = []
+    cells = []
+
+    for row, equation in enumerate(order):
+        if equation in invariant:
+            bindings += _parse_template("m{row} = memos[{row}]".format(row=row))
+            slots += _parse_template("x{row} = m{row}.slot".format(row=row))
+            continue
+
+        bindings += _parse_template("v{row} = memos[{row}].values\ns{row} = memos[{row}].stamps".format(row=row))
+
+        expression = _parse_function_string(function_strings[equation]) if equation in function_strings else None
+
+        if expression is None:
+            bindings += _parse_template("e{row} = equations[{name!r}]".format(row=row, name=equation))
+            expression = _parse_template("e{row}(t)".format(row=row))[0].value
+        else:
+            expression = _ReferenceTransformer(rows, row, invariant).visit(expression)
+
+        cells += _parse_template(
+            "if s{row}[column] == generation:\n"
+            "    x{row} = v{row}[column]\n"
+            "else:\n"
+            "    x{row} = EXPRESSION\n"
+            "    v{row}[column] = x{row}\n"
+            "    s{row}[column] = generation".format(row=row),
+            EXPRESSION=expression
+        )
+
+    step = _parse_template("def step(t, column, generation):\n    previous = column - 1\n    pass")[0]
+    step.body = step.body[:1] + slots + cells
+
+    make_step = _parse_template("def make_step(model, equations, memos):\n    pass\n    return step")[0]
+    make_step.body = bindings + [step] + make_step.body[1:]
+
+    module = ast.fix_missing_locations(ast.Module(body=[make_step], type_ignores=[]))
+
+    # the function strings are evaluated in the namespace of the sddsl elements
+    scope = dict(vars(sddsl_element))
+    scope.update(namespace or {})
+    exec(compile(module, "<{} {}>".format(name, model.name), "exec"), scope)
+
+    return ast.unparse(module), scope["make_step"]
+
+
+class _VectorTransformer(ast.NodeTransformer):
+    """Rewrite the expression of a time-only equation, so it can be evaluated for a NumPy array of timesteps.
+
+    Reads of other equations become calls of read(name), conditional expressions become np.where and boolean operators their element-wise NumPy counterparts.
+    """
+
+    def visit_Call(self, node):
+        self.generic_visit(node)
+
+        if _is_memoize_call(node):
+            return _parse_template("read({!r})".format(node.args[0].value))[0].value
+
+        return node
+
+    def visit_IfExp(self, node):
+        self.generic_visit(node)
+        return _parse_template("np.where(TEST, BODY, ORELSE)", TEST=node.test, BODY=node.body, ORELSE=node.orelse)[0].value
+
+    def visit_BoolOp(self, node):
+        self.generic_visit(node)
+        function = "np.logical_and" if isinstance(node.op, ast.And) else "np.logical_or"
+        expression = node.values[0]
+        for value in node.values[1:]:
+            expression = _parse_template(function + "(LEFT, RIGHT)", LEFT=expression, RIGHT=value)[0].value
+        return expression
+
+    def visit_UnaryOp(self, node):
+        self.generic_visit(node)
+        if isinstance(node.op, ast.Not):
+            return _parse_template("np.logical_not(OPERAND)", OPERAND=node.operand)[0].value
+        return node
+
+
+@lru_cache(maxsize=4096)
+def _vectorized_function(function_string):
+    """Compile the function string of a time-only equation into a function (model, t, read) that accepts a NumPy array t, None if the string cannot be parsed."""
+    expression = _parse_function_string(function_string)
+    if expression is None:
+        return None
+
+    function = ast.Expression(body=ast.Lambda(
+        args=ast.arguments(posonlyargs=[], args=[ast.arg(arg="model"), ast.arg(arg="t"), ast.arg(arg="read")], kwonlyargs=[], kw_defaults=[], defaults=[]),
+        body=_VectorTransformer().visit(expression)
+    ))
+
+    scope = dict(vars(sddsl_element))
+    scope.update({"max": vector_max, "min": vector_min})
+    return eval(compile(ast.fix_missing_locations(function), "<vectorized>", "eval"), scope)
+
+
+def evaluate_time_functions(model, names, function_strings, kinds, until=None):
+    """Evaluate time-only equations for all timesteps until the given time at once.
+
+    Each function string is rewritten to accept a NumPy array of timesteps (see _VectorTransformer). Time-invariant equations it reads are read once, time-only equations via their array of values. The results are written to the memo of the model, values that are already memoized are kept. Equations that cannot be evaluated for arrays (or whose values are not all finite numbers, e.g. due to a division by zero) are left to the step by step evaluation, just as the equations that read them.
+
+    Args:
+        model: Model.
+            The model whose equations are evaluated.
+        names: List.
+            Names of the time-only equations, ordered by their dependencies.
+        function_strings: Dict.
+            Function strings of the elements by equation name.
+        kinds: Dict.
+            Kinds of all equations (see DependencyGraph.classify).
+        until: Float (Default=None).
+            The last timestep to evaluate. Defaults to the stoptime of the model.
+
+    Returns:
+        List of the names of the evaluated equations.
+    """
+    memo = model.memo
+    grid = memo.grid
+    size = grid.size if until is None else min(grid.size, max(0, grid.index(until) + 1))
+    if size == 0:
+        return []
+
+    times = np.array(grid.times[:size], dtype=np.float64)
+    arrays = {}
+
+    def read(name):
+        if name in arrays:
+            return arrays[name]
+        if kinds.get(name) == TIME_INVARIANT:
+            value = model.memoize(name, grid.times[size - 1])
+            # values that are NumPy arrays themselves (see Element.setup_array) would be broadcast against the timesteps
+            if np.ndim(value) > 0:
+                raise TypeError(name)
+            return value
+        raise KeyError(name)
+
+    for name in names:
+        mymemo = memo.setdefault(name, {})
+        valid = [index for index in range(min(size, len(mymemo.stamps))) if mymemo.stamps[index] == memo.generation]
+
+        if len(valid) == size:
+            arrays[name] = np.asarray(mymemo.values[:size])
+            continue
+
+        function = _vectorized_function(function_strings[name]) if name in function_strings else None
+        if function is None:
+            continue
+
+        try:
+            with np.errstate(all="ignore"):
+                values = np.broadcast_to(np.asarray(function(model, times, read)), times.shape)
+        except Exception:
+            # anything the expression does not support for arrays, the equation is evaluated step by step
+            continue
+
+        if values.dtype.kind not in "biuf" or not np.all(np.isfinite(values)):
+            continue
+
+        values = values.tolist()
+        for index in valid:
+            values[index] = mymemo.values[index]
+
+        mymemo.set_values(values)
+        arrays[name] = np.asarray(values)
+
+    return list(arrays)
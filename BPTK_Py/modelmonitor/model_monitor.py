@@ -92,7 +92,7 @@ class ModelMonitor():
                     #os.chdir(config.configuration["sd_py_compiler_root"])
                     print(self.source_file)
 
-                    output = compile(target="py",src=self.source_file,dest=self.dest + ".py")
+                    output = compile(target="py",src=self.source_file,dest=self.dest + ".py",cache_dir=config.configuration.get("sd_compile_cache"))
 
                     # Go back to working dir
                     #os.chdir(current_dir)
@@ -104,10 +104,11 @@ class ModelMonitor():
                         self.running = False
                         return None
 
-                    ## Refresh all scenarios with the given model file
-                    self.update_func(self.source_file)
-                    log("[INFO] ABMModel Monitor for {}: model updated and relaoded scenarios!".format(
-                        str(self.source_file)))
+                    ## Refresh all scenarios with the given model file. If the generated model did not change (e.g. the file was only saved again), the scenarios are kept
+                    if output is not False:
+                        self.update_func(self.source_file)
+                        log("[INFO] ABMModel Monitor for {}: model updated and relaoded scenarios!".format(
+                            str(self.source_file)))
 
                     # Store new timestamp as cached timestamp
                     self._cached_stamp = stamp
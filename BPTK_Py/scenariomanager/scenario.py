@@ -11,6 +11,8 @@
 
 ### IMPORTS
 from ..logger import log
+from ..modeling.dependencyGraph import DependencyGraph
+from ..util import compile_constant, compile_points
 from copy import deepcopy
 ###
 
@@ -108,9 +110,32 @@ class SimulationScenario():
         self.__sd_simulation=sd_simulation
 
     def reset_cache(self):
-        for key in self.model.memo.keys():
-            self.model.memo[key] = {}
+        if hasattr(self.model.memo, "reset"):
+            # step-indexed memos are invalidated in O(1)
+            self.model.memo.reset()
+        else:
+            for key in self.model.memo.keys():
+                self.model.memo[key] = {}
+        self.sd_simulation = None
+
+    def invalidate_cache(self, constants=(), points=()):
+        """
+        Invalidate only the cached results that depend on the given constants or graphical functions, all other results are kept
+        :param constants: names of the changed constants
+        :param points: names of the changed graphical functions
+        :return: set of the names of the invalidated equations
+        """
+        if hasattr(self.model, "invalidate_cache"):
+            invalidated = self.model.invalidate_cache(constants, points)
+        else:
+            invalidated = self.dependency_graph().affected(constants, points)
+            if hasattr(self.model.memo, "invalidate"):
+                self.model.memo.invalidate(invalidated)
+            else:
+                for key in invalidated:
+                    self.model.memo[key] = {}
         self.sd_simulation = None
+        return invalidated
 
     def _set_cache(self,cache):
         self.model.memo = cache
@@ -118,6 +143,13 @@ class SimulationScenario():
     def _get_cache(self):
         return self.model.memo
 
+    def dependency_graph(self):
+        """
+        Get the dependency graph of the scenario's model (SD DSL or XMILE)
+        :return: DependencyGraph
+        """
+        return DependencyGraph.from_model(self.model)
+
     def setup_constants(self):
         """
         Sets up the constants of the simulation model upon scenario manager initialization
@@ -127,12 +159,13 @@ class SimulationScenario():
         if self.model is not None:
 
             for constant, value in self.constants.items():
-                if type(value) == str:
-                    self.model.equations[constant] = eval("lambda t : " + value)
-                    log("[INFO] {}, {}: Changed constant {} to {}".format(self.scenario_manager, self.name, constant,
-                                                                              str(value)))
-                elif type(value) == int or type(value) == float:
-                    self.model.equations[constant] = eval("lambda t: " + str(value))
+                if type(value) == str or type(value) == int or type(value) == float:
+                    # compiled once, evaluating the constant only returns the bound value
+                    try:
+                        self.model.equations[constant] = compile_constant(value)
+                    except ValueError as e:
+                        log("[ERROR] {}, {}: {}".format(self.scenario_manager, self.name, str(e)))
+                        continue
                     log("[INFO] {}, {}: Changed constant {} to {}".format(self.scenario_manager, self.name, constant,
                                                                               str(value)))
                 else:
@@ -152,7 +185,11 @@ class SimulationScenario():
         if self.model is not None:
             for name, value in self.points.items():
                 if type(value) == str:
-                    self.model.points[name] = eval(value)
+                    try:
+                        self.model.points[name] = compile_points(value)
+                    except ValueError as e:
+                        log("[ERROR] {}, {}: {}".format(self.scenario_manager, self.name, str(e)))
+                        continue
                     log("[INFO] {}, {}: Changed points {} to {}".format(self.scenario_manager, self.name, name, str(value)))
                 elif type(value) == list:
                     self.model.points[name] = value
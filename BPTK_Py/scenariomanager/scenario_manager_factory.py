@@ -19,6 +19,7 @@ from pathlib import Path
 import BPTK_Py.config.config as config
 from ..modelmonitor import FileMonitor
 from ..logger import log
+from ..sdcompiler.compile import compile_xmile_parallel
 from ..modelmonitor import ModelMonitor
 from ..scenariomanager import ScenarioManagerHybrid
 
@@ -52,7 +53,10 @@ class ScenarioManagerFactory():
         self.start_scenario_monitor = start_scenario_monitor
         self.start_model_monitor = start_model_monitor
 
-    def __readScenario(self, filename=""):
+        # Compile time in seconds of each XMILE source compiled while loading the scenario managers
+        self.compile_timings = {}
+
+    def __readScenario(self, filename="", pending=None):
         """
         Reads the specified JSON file and generates the scenario_manager and scenario objects
         Pretty large method that does the following:
@@ -60,6 +64,7 @@ class ScenarioManagerFactory():
          - update the scenario managers in case a new scenario is detected.
          - If you actually updated a scenario, first you need to pop it from a scenario manager's scenarios dict
         :param filename: filename of JSON file to parse
+        :param pending: Optional list. If given, the models of SD scenario managers are not instantiated, the managers are added to the list instead (see __instantiate_models)
         :return:  self.scenario_managers
         """
         model = None
@@ -145,7 +150,10 @@ class ScenarioManagerFactory():
                             "[ERROR] Scenario monitor: Source model file not found: \"{}\". Not attempting to monitor changes to it.".format(
                                 str(manager.source)))
 
-                manager.instantiate_model()
+                if pending is None:
+                    manager.instantiate_model()
+                elif manager not in pending:
+                    pending.append(manager)
 
             ## CREATE FILE MONITOR
             if self.start_scenario_monitor and not filename in self.file_monitors.keys():
@@ -170,9 +178,12 @@ class ScenarioManagerFactory():
             log("[INFO] New scenario manager or reset. Reading in all scenarios from storage!")
             self.scenario_files = glob.glob(os.path.join(path, '*'))
 
+            pending = []
             for infile in self.scenario_files:
                 if not os.path.isdir(infile):
-                    self.__readScenario(filename=infile)
+                    self.__readScenario(filename=infile, pending=pending)
+
+            self.__instantiate_models(pending)
 
             log("[INFO] Successfully loaded all scenarios!")
 
@@ -186,6 +197,33 @@ class ScenarioManagerFactory():
 
         return scenario_managers
 
+    def __instantiate_models(self, managers):
+        """
+        Instantiate the models of SD scenario managers. The XMILE sources that need to be compiled are compiled in parallel first
+        :param managers: List of ScenarioManagerSd
+        :return: None
+        """
+        jobs = {}
+        for manager in managers:
+            if manager.needs_compilation():
+                jobs[manager.model_file + ".py"] = manager.source
+
+        if len(jobs) > 0:
+            results = compile_xmile_parallel([(source, dest) for dest, source in jobs.items()],
+                                             cache_dir=config.configuration.get("sd_compile_cache"),
+                                             processes=config.configuration.get("sd_compile_processes"))
+
+            for source, (seconds, error) in results.items():
+                if error is None:
+                    self.compile_timings[source] = seconds
+                    log("[INFO] Compiled {} in {:.2f}s".format(source, seconds))
+                else:
+                    log("[ERROR] Compiling {} failed: {}".format(source, error))
+
+        # models that failed to compile are compiled again (and their errors reported) by instantiate_model
+        for manager in managers:
+            manager.instantiate_model()
+
     def reset_scenario(self, scenario_manager, scenario):
         """
         Reloads exactly one scenario. For lookup, requires scenario manager's name and the scenario's name
@@ -330,7 +368,7 @@ class ScenarioManagerFactory():
 
     def _refresh_scenarios_for_source_model(self, filename):
         """
-        Refreshes all scenarios that use the given source file (e.g. itmx)
+        Refreshes all scenarios that use the given source file (e.g. itmx). The changed equations are hot-swapped into the live models, scenarios are only reloaded if the models cannot be swapped
         :param filename:
         :return:
         """
@@ -341,6 +379,9 @@ class ScenarioManagerFactory():
 
         for manager_name, manager in managers.items():
             if manager.source == filename:
+                if isinstance(manager, ScenarioManagerSd) and manager.hot_swap_model() is not None:
+                    continue
+
                 for scenario_name in deepcopy(list(manager.scenarios.keys())):
                     self.reset_scenario(scenario=scenario_name, scenario_manager=manager_name)
 
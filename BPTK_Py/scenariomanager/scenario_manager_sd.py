@@ -13,6 +13,7 @@
 
 import importlib
 import os
+import sys
 from pathlib import Path
 
 import BPTK_Py.config.config as config
@@ -21,6 +22,45 @@ from .scenario_manager import ScenarioManager
 from .scenario import SimulationScenario
 from ..modeling.model import Model
 from BPTK_Py.sdcompiler.compile import compile_xmile as compile
+from BPTK_Py.sdcompiler.cache import file_digest
+
+# Hash of the file each model module was loaded from, modules are only reloaded if their file changed
+_module_digests = {}
+
+def _code_key(code):
+    """
+    Key of the bytecode of a compiled function, two functions with equal keys compute the same. Line numbers are not part of the key, hence moving an equation within the model file does not change it
+    :param code: code object
+    :return: hashable key
+    """
+    return (
+        code.co_code,
+        tuple(_code_key(const) if hasattr(const, "co_code") else (type(const).__name__, repr(const)) for const in code.co_consts),
+        code.co_names,
+        code.co_varnames,
+        code.co_freevars
+    )
+
+def _changed_equations(old_model, new_model):
+    """
+    Compare two simulation models of the same XMILE source
+    :param old_model: model instance of the previous version
+    :param new_model: model instance of the new version
+    :return: tuple (set of the names of changed, added or removed equations, set of the names of graphical functions whose points changed)
+    """
+    equations = set(old_model.equations.keys()) ^ set(new_model.equations.keys())
+
+    for name, equation in new_model.equations.items():
+        if name in old_model.equations and _code_key(old_model.equations[name].__code__) != _code_key(equation.__code__):
+            equations.add(name)
+
+    points = set(old_model.points.keys()) ^ set(new_model.points.keys())
+
+    for name, value in new_model.points.items():
+        if name in old_model.points and list(map(list, old_model.points[name])) != list(map(list, value)):
+            points.add(name)
+
+    return equations, points
 
 class ScenarioManagerSd(ScenarioManager):
     """
@@ -143,45 +183,47 @@ class ScenarioManagerSd(ScenarioManager):
         if not model:
             return None
 
-        new_mod = Model(starttime=model.starttime, stoptime=model.stoptime, dt=model.dt, name=model.name)
-
-
-        for name, constant in model.constants.items():
-            new_const = new_mod.constant(constant.name)
-            new_const._elements = constant._elements
-            new_const.function_string = constant.function_string
-            new_const.equation = constant.equation
-            new_const.generate_function()
-            new_mod.memo[constant.name] = {}
-
-        for name, converter in model.converters.items() :
-            new_converter = new_mod.converter(converter.name)
-            new_converter._elements = converter._elements
-            new_converter.function_string = converter.function_string
-            new_converter.generate_function()
-            new_mod.memo[converter.name] = {}
-
-        for name, flow in model.flows.items():
-            new_flow = new_mod.flow(flow.name)
-            new_flow._elements = flow._elements
-            new_flow.function_string = flow.function_string
-            new_flow.generate_function()
-            new_mod.memo[flow.name] = {}
-
-        for name, biflow in model.biflows.items():
-            new_biflow = new_mod.biflow(biflow.name)
-            new_biflow._elements = biflow._elements
-            new_biflow.function_string = biflow.function_string
-            new_biflow.generate_function()
-            new_mod.memo[biflow.name] = {}
-
-        for name, stock in model.stocks.items():
-            new_stock = new_mod.stock(stock.name)
-            new_stock._elements = stock._elements
-            new_stock.function_string = stock.function_string
-            new_stock._Stock__initial_value = new_mod.constants[stock._Stock__initial_value.name] if type(stock._Stock__initial_value) is str else stock._Stock__initial_value
-            new_stock.generate_function()
-            new_mod.memo[stock.name] = {}
+        new_mod = Model(starttime=model.starttime, stoptime=model.stoptime, dt=model.dt, name=model.name, engine=model.engine)
+
+
+        # the functions of the elements are generated once, when the build phase ends
+        with new_mod.build():
+            for name, constant in model.constants.items():
+                new_const = new_mod.constant(constant.name)
+                new_const._elements = constant._elements
+                new_const.function_string = constant.function_string
+                new_const.equation = constant.equation
+                new_const.generate_function()
+                new_mod.memo[constant.name] = {}
+
+            for name, converter in model.converters.items() :
+                new_converter = new_mod.converter(converter.name)
+                new_converter._elements = converter._elements
+                new_converter.function_string = converter.function_string
+                new_converter.generate_function()
+                new_mod.memo[converter.name] = {}
+
+            for name, flow in model.flows.items():
+                new_flow = new_mod.flow(flow.name)
+                new_flow._elements = flow._elements
+                new_flow.function_string = flow.function_string
+                new_flow.generate_function()
+                new_mod.memo[flow.name] = {}
+
+            for name, biflow in model.biflows.items():
+                new_biflow = new_mod.biflow(biflow.name)
+                new_biflow._elements = biflow._elements
+                new_biflow.function_string = biflow.function_string
+                new_biflow.generate_function()
+                new_mod.memo[biflow.name] = {}
+
+            for name, stock in model.stocks.items():
+                new_stock = new_mod.stock(stock.name)
+                new_stock._elements = stock._elements
+                new_stock.function_string = stock.function_string
+                new_stock._Stock__initial_value = new_mod.constants[stock._Stock__initial_value.name] if type(stock._Stock__initial_value) is str else stock._Stock__initial_value
+                new_stock.generate_function()
+                new_mod.memo[stock.name] = {}
 
         for name, function in model.functions.items():
             new_function = new_mod.function(name, model.fn[name])
@@ -193,64 +235,78 @@ class ScenarioManagerSd(ScenarioManager):
 
 
 
-    def instantiate_model(self):
+    def needs_compilation(self):
         """
-        This method generates the XMILE model using the XMILE compiler. Loads the model_file from disk. If the file is not available, it will first parse the source file using the xmile compiler
-        :return: None
+        Check whether the XMILE source of the model needs to be compiled, i.e. the model file does not exist or is older than the source
+        :return: True if instantiate_model will compile the source
         """
+        if isinstance(self.model, Model) or not self.source or not os.path.isfile(self.source):
+            return False
 
-        # do nothing if this is a hybrid model
-        if isinstance(self.model, Model):
-            return
+        py_model_file_path = self.model_file + ".py"
 
+        return not os.path.isfile(py_model_file_path) or os.stat(self.source).st_mtime > os.stat(py_model_file_path).st_mtime
 
-        # Check if the source file changed in the meantime (newer version saved outside Jupyter/Bptk)
-        if os.path.isfile(self.model_file + ".py") and not self.source == "":
-            last_stamp_model = os.stat(self.model_file + ".py").st_mtime
-            last_stamp_source = 0
+    def load_model_class(self):
+        """
+        Import the simulation model class from the model file. The module is reloaded if it was imported before and the model file changed since
+        :return: simulation model class
+        """
+        py_model_file_path = self.model_file + ".py"
 
-            if not self.source is None and not os.path.isfile(self.source):
-                log("[ERROR] Source model file not found: \"{}\"".format(str(self.source)))
-                self.source = ""
+        ## FROM "model/model_name" I have to come to python-specific notation "model.model_name"
+        full_file_path = Path(py_model_file_path)
 
-            elif not self.source is None:
-                last_stamp_source = os.stat(self.source).st_mtime
+        ## need to check whether this is in model/model_name notation (XMILE) or model.model_name notation (SDDSL)
 
+        if full_file_path.parent.name:
+            package_link = full_file_path.parent.name + "." + full_file_path.stem
         else:
-            last_stamp_source = 0
-            last_stamp_model = 0
+            package_link = full_file_path.stem
 
-        py_model_file_path = self.model_file + ".py"
+        class_link = "simulation_model"
+
+        mod = None
 
-        if not os.path.isfile(py_model_file_path) or last_stamp_source > last_stamp_model:
-            if not self.source is None and os.path.isfile(self.source):  ## <- Only do if the source actually exists
-                compile(target="py", src=self.source, dest=py_model_file_path)
         try:
-            ## FROM "model/model_name" I have to come to python-specific notation "model.model_name"
-            full_file_path = Path(py_model_file_path)
+            loaded = package_link in sys.modules
+            mod = importlib.import_module(package_link)
+        except:
+            class_link = package_link.split(".")[len(package_link.split(".")) - 1]
+            package_link = ".".join(package_link.split(".")[:-1])
+            loaded = package_link in sys.modules
+            mod = importlib.import_module(package_link)
+
+
+        #  In case we loaded the same module before, Python would not do anything with the above line alone. We explicitly need to tell Python to reload the file, unless it did not change since
+        digest = file_digest(py_model_file_path)
+        if loaded and (digest is None or _module_digests.get(mod.__name__) != digest):
+            mod = importlib.reload(mod)
+        _module_digests[mod.__name__] = digest
+        return getattr(mod, class_link)
 
-            ## need to check whether this is in model/model_name notation (XMILE) or model.model_name notation (SDDSL)
-           
-            if full_file_path.parent.name: 
-                package_link = full_file_path.parent.name + "." + full_file_path.stem
-            else:
-                package_link = full_file_path.stem
+    def instantiate_model(self):
+        """
+        This method generates the XMILE model using the XMILE compiler. Loads the model_file from disk. If the file is not available, it will first parse the source file using the xmile compiler
+        :return: None
+        """
 
-            class_link = "simulation_model"
+        # do nothing if this is a hybrid model
+        if isinstance(self.model, Model):
+            return
 
-            mod = None
 
-            try:
-                mod = importlib.import_module(package_link)
-            except:
-                class_link = package_link.split(".")[len(package_link.split(".")) - 1]
-                package_link = ".".join(package_link.split(".")[:-1])
-                mod = importlib.import_module(package_link)
+        # Check if the source file changed in the meantime (newer version saved outside Jupyter/Bptk)
+        if os.path.isfile(self.model_file + ".py") and self.source and not os.path.isfile(self.source):
+            log("[ERROR] Source model file not found: \"{}\"".format(str(self.source)))
+            self.source = ""
 
+        py_model_file_path = self.model_file + ".py"
 
-            #  In case we loaded the same module before, Python would not do anything with the above line alone. We explicitly need to tell Python to reload the file!
-            mod = importlib.reload(mod)
-            model_class = getattr(mod, class_link)
+        if self.needs_compilation():
+            compile(target="py", src=self.source, dest=py_model_file_path, cache_dir=config.configuration.get("sd_compile_cache"))
+        try:
+            model_class = self.load_model_class()
 
             ## INSTANTIATE THE MODEL OBJECT.
             for scenario in self.scenarios.values():
@@ -269,3 +325,61 @@ class ScenarioManagerSd(ScenarioManager):
                 "[ERROR] Module not found Error when trying to load simulation class from external file. Only use relative paths and do not rename the class inside the generated class! Error Message: {}".format(
                     str(e)))
             self.scenarios = {}
+
+    def hot_swap_model(self):
+        """
+        Swap the models of all scenarios for the current version of the model file, e.g. after the XMILE source was recompiled. The memoized results of all equations that neither changed nor depend on a changed equation or graphical function are kept
+        :return: set of the names of the swapped equations, None if the models cannot be swapped and the scenarios need to be reloaded (e.g. the time grid or the dimensions of the model changed)
+        """
+        models = [scenario.model for scenario in self.scenarios.values() if scenario.model is not None]
+
+        if isinstance(self.model, Model) or any(isinstance(model, Model) for model in models):
+            return None
+
+        if not models:
+            return set()
+
+        old_class = type(models[0])
+
+        try:
+            new_class = self.load_model_class()
+            old_model = old_class()
+            new_model = new_class()
+        except Exception as e:
+            log("[ERROR] Failed to load the new version of the model {}: {}".format(self.model_file, str(e)))
+            return None
+
+        for attribute in ["starttime", "stoptime", "dt", "dimensions", "dimensions_order"]:
+            if getattr(old_model, attribute, None) != getattr(new_model, attribute, None):
+                log("[INFO] {} of model {} changed, scenarios need to be reloaded".format(attribute, self.model_file))
+                return None
+
+        equations, points = _changed_equations(old_model, new_model)
+        removed = set(old_model.equations.keys()) - set(new_model.equations.keys())
+
+        for scenario in self.scenarios.values():
+            if scenario.model is None:
+                continue
+
+            model = new_class()
+            model.starttime = scenario.model.starttime
+            model.stoptime = scenario.model.stoptime
+            model.dt = scenario.model.dt
+
+            # Keep the memo of the previous model, the values of the changed equations and all their dependents are invalidated
+            memo = scenario.model.memo
+            for name in removed:
+                memo.pop(name, None)
+            model.memo = memo
+            for name in model.equations.keys():
+                model.memo.setdefault(name, {})
+
+            scenario.model = model
+            scenario.setup_constants()
+            scenario.setup_points()
+
+            scenario.invalidate_cache(constants=equations, points=points)
+
+        log("[INFO] {}: Swapped equations {} and graphical functions {} of model {}".format(self.name, sorted(equations), sorted(points), self.model_file))
+
+        return equations | points
@@ -299,7 +299,8 @@ class HybridRunner(ScenarioRunner):
             scenario.run_step(step)
         
         for scenario in scenario_objects:
-            agent_instance_data = self._get_agents_for_model(scenario)
+            # the agents themselves are only needed for individual agent properties
+            agent_instance_data = self._get_agents_for_model(scenario) if individual_agent_properties else {}
 
             data = scenario.statistics()
             if len(data) == 0:
@@ -0,0 +1,280 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import argparse
+import glob
+import os
+import tempfile
+import time
+
+from .compile import compile_xmile, stages
+from .parsers.xmile.xmile import parse_xmile
+from .parsers.smile.grammar import SMILEVisitor, grammar
+from .parsers.smile.parser import SMILEParser, _parse, parse_smile
+from .profiling import CompileProfile
+
+'''
+Benchmarks of the XMILE compiler. Run as python -m BPTK_Py.sdcompiler.benchmark <models>, where models are XMILE files or directories containing them (e.g. tests/test_models).
+Besides the parsers of SMILE equations, each model is compiled with a CompileProfile, as well as synthetic array models that are scaled by the factors given with --scale
+'''
+
+_synthetic_model = """<?xml version="1.0" encoding="utf-8"?>
+<xmile version="1.0" xmlns="http://docs.oasis-open.org/xmile/ns/XMILE/v1.0" xmlns:isee="http://iseesystems.com/XMILE">
+	<header>
+		<smile version="1.0" namespace="std, isee" uses_arrays="2"/>
+		<name>synthetic_{scale}x</name>
+	</header>
+	<sim_specs method="Euler" time_units="months">
+		<start>1</start>
+		<stop>13</stop>
+		<dt>1</dt>
+	</sim_specs>
+	<dimensions>
+		<dim name="Products" size="{products}"/>
+		<dim name="Countries">
+			{countries}
+		</dim>
+	</dimensions>
+	<model>
+		<variables>
+			<stock name="Inventory">
+				<dimensions>
+					<dim name="Products"/>
+					<dim name="Countries"/>
+				</dimensions>
+				<eqn>10</eqn>
+				<inflow>Production</inflow>
+				<outflow>Sales</outflow>
+			</stock>
+			<flow name="Production">
+				<dimensions>
+					<dim name="Products"/>
+					<dim name="Countries"/>
+				</dimensions>
+				<eqn>Capacity[Products] * Share[Countries]</eqn>
+			</flow>
+			<flow name="Sales">
+				<dimensions>
+					<dim name="Products"/>
+					<dim name="Countries"/>
+				</dimensions>
+				<eqn>MIN(Inventory, Demand[Countries])</eqn>
+			</flow>
+			<aux name="Capacity">
+				<dimensions>
+					<dim name="Products"/>
+				</dimensions>
+				<eqn>100</eqn>
+			</aux>
+			<aux name="Share">
+				<dimensions>
+					<dim name="Countries"/>
+				</dimensions>
+				<eqn>0.5</eqn>
+			</aux>
+			<aux name="Demand">
+				<dimensions>
+					<dim name="Countries"/>
+				</dimensions>
+				<eqn>20</eqn>
+			</aux>
+			<aux name="Product Inventory">
+				<dimensions>
+					<dim name="Products"/>
+				</dimensions>
+				<eqn>SUM(Inventory[Products, *])</eqn>
+			</aux>
+			<aux name="Country Inventory">
+				<dimensions>
+					<dim name="Countries"/>
+				</dimensions>
+				<eqn>SUM(Inventory[*, Countries])</eqn>
+			</aux>
+			<aux name="Total Inventory">
+				<eqn>SUM(Inventory[*, *])</eqn>
+			</aux>
+			<aux name="Mean Inventory">
+				<eqn>MEAN(Inventory[*, *])</eqn>
+			</aux>
+		</variables>
+	</model>
+</xmile>
+"""
+
+
+def model_files(paths):
+    """
+    Find the XMILE models in the given files and directories
+    :param paths: list of files and directories
+    :return: sorted list of model files
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for extension in ["stmx", "itmx", "xmile"]:
+                files += glob.glob(os.path.join(path, "**", "*." + extension), recursive=True)
+        else:
+            files += [path]
+    return sorted(files)
+
+
+def equations(filename):
+    """
+    Get the equation strings of all elements of a model, one per cell of arrayed elements
+    :param filename: XMILE model
+    :return: list of equation strings
+    """
+    IR = parse_xmile(filename)
+    return [equation for model in IR["models"].values() for entities in model["entities"].values() for entity in entities for equation in entity["equation"]]
+
+
+def synthetic_model(scale):
+    """
+    XMILE source of a synthetic array model. It has a two dimensional stock with flows and aggregations over both dimensions. The Products dimension has 3 * scale elements and the Countries dimension 4 elements, so the number of array elements grows linearly with the scale
+    :param scale: Scale of the model
+    :return: XMILE source (str)
+    """
+    countries = "\n\t\t\t".join('<elem name="Country_{}"/>'.format(index + 1) for index in range(4))
+    return _synthetic_model.format(scale=scale, products=3 * scale, countries=countries)
+
+
+def _timed(function, equations, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(equations)
+        duration = time.perf_counter() - start
+        best = duration if best is None else min(best, duration)
+    return best
+
+
+def benchmark_smile_parsers(files, repeat=5):
+    """
+    Compare the parsers of SMILE equations on the equations of the given models: the PEG grammar, the hand-written parser and the hand-written parser with memoization of duplicate equations
+    :param files: list of XMILE models
+    :param repeat: number of runs, the fastest run counts
+    :return: dict {parser: seconds} and the number of equations
+    """
+    strings = [equation for filename in files for equation in equations(filename)]
+
+    def parse_grammar(strings):
+        for equation in strings:
+            SMILEVisitor().visit(grammar.parse(equation))
+
+    def parse_parser(strings):
+        for equation in strings:
+            SMILEParser().parse(equation)
+
+    def parse_memoized(strings):
+        _parse.cache_clear()
+        for equation in strings:
+            parse_smile(equation)
+
+    results = {
+        "grammar": _timed(parse_grammar, strings, repeat),
+        "parser": _timed(parse_parser, strings, repeat),
+        "parser (memoized)": _timed(parse_memoized, strings, repeat)
+    }
+    return results, len(strings)
+
+
+def profile_compile(filename, target="py", repeat=1, trace_allocations=False):
+    """
+    Compile a model with a CompileProfile. The memo of parsed equations is cleared before each run, so every run parses all equations
+    :param filename: XMILE model
+    :param target: Target language
+    :param repeat: number of runs, the profile of the fastest run is returned
+    :param trace_allocations: record the allocations of each stage, which slows down the stages
+    :return: CompileProfile
+    """
+    best = None
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(repeat):
+            _parse.cache_clear()
+            profile = CompileProfile(trace_allocations=trace_allocations)
+            compile_xmile(filename, os.path.join(directory, "model.py"), target, profile=profile)
+            best = profile if best is None or profile.seconds < best.seconds else best
+    return best
+
+
+def benchmark_compile(files, scales=(), target="py", repeat=1, trace_allocations=False):
+    """
+    Profile the compilation of the given models and of synthetic array models of the given scales
+    :param files: list of XMILE models
+    :param scales: list of scales of synthetic models (see synthetic_model)
+    :param target: Target language
+    :param repeat: number of runs, the fastest run counts
+    :param trace_allocations: record the allocations of each stage
+    :return: dict {model: CompileProfile}
+    """
+    results = {}
+    for filename in files:
+        results[filename] = profile_compile(filename, target, repeat, trace_allocations)
+
+    with tempfile.TemporaryDirectory() as directory:
+        for scale in scales:
+            filename = os.path.join(directory, "synthetic_{}x.stmx".format(scale))
+            with open(filename, "w") as outfile:
+                outfile.write(synthetic_model(scale))
+            results["synthetic {}x".format(scale)] = profile_compile(filename, target, repeat, trace_allocations)
+
+    return results
+
+
+def stage_totals(profiles):
+    """
+    Sum up the wall time of each stage over several compilations
+    :param profiles: list of CompileProfile
+    :return: dict {stage: seconds}, in the order of the stages
+    """
+    totals = {}
+    for profile in profiles:
+        for entry in profile.stages:
+            totals[entry["stage"]] = totals.get(entry["stage"], 0) + entry["seconds"]
+    return totals
+
+
+def main(args=None):
+    argument_parser = argparse.ArgumentParser(description="Benchmark the XMILE compiler")
+    argument_parser.add_argument("models", nargs="+", help="XMILE models or directories containing them")
+    argument_parser.add_argument("--repeat", type=int, default=5, help="number of runs, the fastest run counts")
+    argument_parser.add_argument("--target", default="py", help="target language of the compiled models")
+    argument_parser.add_argument("--scale", type=int, nargs="*", default=[10, 100], help="scales of the synthetic array models")
+    argument_parser.add_argument("--allocations", action="store_true", help="record the allocations of each stage")
+    argument_parser.add_argument("--profile", action="store_true", help="print the profile of each model")
+    args = argument_parser.parse_args(args)
+
+    files = model_files(args.models)
+    results, count = benchmark_smile_parsers(files, repeat=args.repeat)
+
+    print("Parsing {} equations of {} models".format(count, len(files)))
+    for name, seconds in results.items():
+        print("{:<20} {:>10.2f} ms {:>8.1f}x".format(name, seconds * 1000, results["grammar"] / seconds))
+
+    profiles = benchmark_compile(files, args.scale, target=args.target, repeat=args.repeat, trace_allocations=args.allocations)
+
+    print("\nCompiling {} models to {}".format(len(profiles), args.target))
+    for model, profile in profiles.items():
+        if args.profile:
+            print("\n{}\n{}".format(model, profile.report()))
+        else:
+            slowest = max(profile.stages, key=lambda entry: entry["seconds"])
+            print("{:<50} {:>10.2f} ms   slowest: {} ({:.2f} ms)".format(os.path.basename(model)[-50:], profile.seconds * 1000, slowest["stage"], slowest["seconds"] * 1000))
+
+    corpus = stage_totals([profile for model, profile in profiles.items() if model in files])
+    print("\nStages over the {} models".format(len(files)))
+    for stage, seconds in corpus.items():
+        print("{:<24} {:>10.2f} ms".format(stage, seconds * 1000))
+
+
+if __name__ == "__main__":
+    main()
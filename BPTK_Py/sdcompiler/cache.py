@@ -0,0 +1,121 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import hashlib
+import os
+import tempfile
+
+'''
+Cache of compiled models. Generated code is stored under a key that is the hash of the source model, the target and the version of the compiler, so identical sources are compiled only once
+'''
+
+_compiler_version = None
+
+
+def compiler_version():
+    '''
+    Version of the compiler: The hash of the sources of the compiler package, so any change to the parser, plugins, generators or templates invalidates the cache
+    :return: Hex digest (str)
+    '''
+    global _compiler_version
+
+    if _compiler_version is None:
+        digest = hashlib.sha256()
+        root = os.path.dirname(os.path.abspath(__file__))
+
+        for directory, subdirectories, files in sorted(os.walk(root)):
+            subdirectories.sort()
+            for filename in sorted(files):
+                if filename.endswith(".py"):
+                    path = os.path.join(directory, filename)
+                    digest.update(os.path.relpath(path, root).encode("utf-8"))
+                    with open(path, "rb") as infile:
+                        digest.update(infile.read())
+
+        _compiler_version = digest.hexdigest()
+
+    return _compiler_version
+
+
+def file_digest(path):
+    '''
+    Hash of the content of a file
+    :param path: Path of the file
+    :return: Hex digest (str), None if the file does not exist
+    '''
+    if not os.path.isfile(path):
+        return None
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for block in iter(lambda: infile.read(1 << 20), b""):
+            digest.update(block)
+
+    return digest.hexdigest()
+
+
+class CompileCache():
+    '''
+    Content-addressed cache of generated code, one file per key in the cache directory
+    '''
+
+    def __init__(self, directory):
+        '''
+        :param directory: Cache directory, created when the first entry is stored
+        '''
+        self.directory = str(directory)
+
+    def key(self, src, target):
+        '''
+        Key of a source model for a target
+        :param src: Path of the source model (XMILE)
+        :param target: Target language
+        :return: Key (str)
+        '''
+        digest = hashlib.sha256()
+        digest.update(compiler_version().encode("utf-8"))
+        digest.update(str(target).encode("utf-8"))
+        digest.update(file_digest(src).encode("utf-8"))
+        return digest.hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key)
+
+    def get(self, key):
+        '''
+        Generated code stored under the key
+        :param key: Key (see key)
+        :return: Generated code (str), None on a cache miss
+        '''
+        try:
+            with open(self.path(key), "r") as infile:
+                return infile.read()
+        except OSError:
+            return None
+
+    def put(self, key, code):
+        '''
+        Store generated code. The entry is written to a temporary file first and then moved, so concurrent readers never see partial entries
+        :param key: Key (see key)
+        :param code: Generated code (str)
+        :return: None
+        '''
+        os.makedirs(self.directory, exist_ok=True)
+        handle, temporary = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(handle, "w") as outfile:
+                outfile.write(code)
+            os.replace(temporary, self.path(key))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            raise
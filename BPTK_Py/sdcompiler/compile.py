@@ -10,15 +10,22 @@
 # MIT License
 try:
     from .parsers.xmile.xmile import parse_xmile
-    from .plugins import StockExpressions,ExpandArrays, sortEntities,FindComplexFunctions, resolveSelf, resolveAsterisk, fixLabels, filterGhosts, replaceDimensionNames
+    from .plugins import StockExpressions,ExpandArrays, sortEntities,FindComplexFunctions, resolveSelf, resolveAsterisk, fixLabels, filterGhosts, replaceDimensionNames, dependencyGraph
+    from .cache import CompileCache
+    from .profiling import CompileProfile
     standalone = False
 
 except:
     from parsers.xmile.xmile import parse_xmile
-    from plugins import StockExpressions,ExpandArrays, sortEntities, FindComplexFunctions, resolveSelf, resolveAsterisk, fixLabels, filterGhosts, replaceDimensionNames
+    from plugins import StockExpressions,ExpandArrays, sortEntities, FindComplexFunctions, resolveSelf, resolveAsterisk, fixLabels, filterGhosts, replaceDimensionNames, dependencyGraph
+    from cache import CompileCache
+    from profiling import CompileProfile
     standalone = True
 
 import importlib
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
 
 # Getting the generator module. Here I'd find the targets!
 if standalone:
@@ -30,15 +37,32 @@ else:
     # Getting the generator module. Here I'd find the targets!
     mod = importlib.import_module(".generator", package=__name__[0:find])
 
+# Stages that build the Intermediate Representation, in order. Each stage takes the result of the previous one
+stages = [
+    ("parse_xmile", parse_xmile),
+    ("StockExpressions", StockExpressions),
+    ("replaceDimensionNames", replaceDimensionNames),
+    ("resolveSelf", resolveSelf),
+    ("filterGhosts", filterGhosts),
+    ("ExpandArrays", ExpandArrays),
+    ("sortEntities", sortEntities),
+    ("resolveAsterisk", resolveAsterisk),
+    ("FindComplexFunctions", FindComplexFunctions),
+    ("fixLabels", fixLabels),
+    ("dependencyGraph", dependencyGraph),
+]
 
-def compile_xmile(src, dest, target):
+
+def compile_xmile(src, dest, target, cache_dir=None, profile=None):
     '''
     Main entry point. No need to ever change. It automagically finds all generators within the sd_compiler.generator package.
     Make sure to export from there.
     :param src:
     :param dest:
     :param target:
-    :return:
+    :param cache_dir: Directory of the compile cache (see cache.CompileCache). If the source was compiled for the target before, the generated code is taken from the cache and the source is not parsed again
+    :param profile: Optional profiling.CompileProfile that records each stage and the generator. Nothing is recorded if the code is taken from the cache
+    :return: True if the destination file was written, False if it already contained the generated code
     '''
 
     ## Check whether there is a generator for the target language
@@ -47,27 +71,68 @@ def compile_xmile(src, dest, target):
             pass
         raise TargetNotSupportedException("Target Language {} not (yet) supported".format(target))
 
-    # Build Intermediate Representation
+    cache = CompileCache(cache_dir) if cache_dir else None
+    key = cache.key(src, target) if cache else None
+    result = cache.get(key) if cache else None
+
+    if result is None:
+        # Build Intermediate Representation
+        IR = src
+        for stage, function in stages:
+            IR = profile.run(stage, function, IR) if profile else function(IR)
+
+        # Get the Generator for the target language
+        generator = getattr(mod,target)
 
-    IR = fixLabels(
-        FindComplexFunctions(
-            resolveAsterisk(
-                sortEntities(
-                    ExpandArrays(
-                        filterGhosts(
-                            resolveSelf(
-                                replaceDimensionNames(
-                                    StockExpressions(
-                                            parse_xmile(src))))))))))
+        result = profile.run(target, generator, IR) if profile else generator(IR)
 
-    # Get the Generator for the target language
-    generator = getattr(mod,target)
+        if cache:
+            cache.put(key, result)
 
-    result = generator(IR)
+    # Keep the file untouched if it is up to date, so modules imported from it do not need to be reloaded
+    if os.path.isfile(dest):
+        with open(dest, "r") as infile:
+            if infile.read() == result:
+                return False
 
     # Write out the file
     with open(dest,"w") as outfile:
         outfile.write(result)
 
+    return True
+
+
+def _compile_job(job):
+    '''
+    Compile one model in a worker process of compile_xmile_parallel
+    :param job: Tuple (src, dest, target, cache_dir)
+    :return: Tuple (src, seconds, error message or None)
+    '''
+    src, dest, target, cache_dir = job
+    start = time.perf_counter()
+    try:
+        compile_xmile(src, dest, target, cache_dir=cache_dir)
+    except Exception as e:
+        return src, time.perf_counter() - start, str(e)
+    return src, time.perf_counter() - start, None
+
+
+def compile_xmile_parallel(jobs, target="py", cache_dir=None, processes=None):
+    '''
+    Compile several models at once. compile_xmile only reads the source and writes the destination, so the models are compiled in a pool of processes
+    :param jobs: List of (src, dest) tuples
+    :param target: Target language
+    :param cache_dir: Directory of the compile cache (see compile_xmile)
+    :param processes: Number of processes, defaults to the number of CPUs. Single models are compiled in the calling process
+    :return: Dict {src: (seconds, error message or None)}
+    '''
+    jobs = [(src, dest, target, cache_dir) for src, dest in jobs]
+    processes = min(len(jobs), processes or os.cpu_count() or 1)
 
+    if processes <= 1:
+        results = [_compile_job(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as pool:
+            results = list(pool.map(_compile_job, jobs))
 
+    return {src: (seconds, error) for src, seconds, error in results}
@@ -11,6 +11,7 @@
 
 ## Add your generators here. Give it a nice name. It will be used as target name
 from .py.py import generate as py
+from .numpy.numpy import generate as numpy
 
 
 def json(IR):
@@ -9,7 +9,7 @@
 # Copyright (c) 2019 transentis labs GmbH
 # MIT License
 
-def generate(IR, template, parseExpression):
+def generate(IR, template, parseExpression, context=None, **variables):
     """
     The generator for python.
 
@@ -18,13 +18,16 @@ def generate(IR, template, parseExpression):
     :param IR:
     :param template: Jinja template as str
     :param parseExpression: Function that parses the IR expressions to the specific target language
+    :param context: Export context, built from the IR if not given
+    :param variables: Additional variables for the template
     :return:
     """
     from jinja2 import Template
     template = Template(template)
 
     ## generate context from IR
-    context = build_context(IR, parseExpression)
+    if context is None:
+        context = build_context(IR, parseExpression)
 
     ## Fill template
     output = template.render(stocks=context["stocks"],
@@ -34,7 +37,10 @@ def generate(IR, template, parseExpression):
                              gfs=context["gfs"],
                              constants=context["constants"],
                              dimensions=context["dimensions"],
-                             notmemoized=context["notmemoized"])
+                             notmemoized=context["notmemoized"],
+                             dependencies=IR.get("dependencies", {}),
+                             same_step_dependencies=IR.get("same_step_dependencies", {}),
+                             **variables)
 
     return output
 
@@ -0,0 +1,88 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+'''
+Template of the numpy target, rendered after the template of the py target (see numpy.generate). The model class of the py target is rendered as memo_simulation_model
+'''
+template = '''
+
+class simulation_model(memo_simulation_model):
+    """
+    Forward-stepping simulation model. The step function evaluates the equations in topological order and writes their values to the preallocated slots of the memo, reading the equations it depends on directly from their slots.
+    memoize then only reads these slots, equations are evaluated recursively only for timesteps that were not stepped yet (e.g. if the model is used without run_forward)
+    """
+    def __init__(self):
+        super().__init__()
+        self.engine = "forward"
+
+        # Topological order of the equations (by the equations they read at the same timestep)
+        self.order = [{% for step in steps -%} '{{step.name}}' {%- if not loop.last -%}, {% endif %} {%- endfor %}]
+
+        # The generated equations, equations that are replaced (e.g. by scenarios) are called by the step function instead of the generated code
+        self.generated_equations = dict(self.equations)
+
+    def step_function(self):
+        """
+        Build the step function for the current memo and equations
+        :return: Function step(i, t) that evaluates all equations for the step with index i (at time t). Values that are already stored in the memo are kept
+        """
+        memo = self.memo
+        generation = memo.generation
+        size = memo.grid.size
+        equations = self.equations
+        generated = self.generated_equations
+
+        values, stamps, replaced = [], [], []
+        for equation in self.order:
+            mymemo = memo.setdefault(equation)
+            if len(mymemo.stamps) != size:
+                mymemo.values = [None] * size
+                mymemo.stamps = [0] * size
+            values += [mymemo.values]
+            stamps += [mymemo.stamps]
+            replaced += [None if equations.get(equation) is generated[equation] else equations.get(equation)]
+
+        {% for step in steps -%}
+        v{{loop.index0}}, s{{loop.index0}}, f{{loop.index0}} = values[{{loop.index0}}], stamps[{{loop.index0}}], replaced[{{loop.index0}}]
+        {% endfor %}
+        def step(i, t):
+            {% for step in steps -%}
+            if s{{loop.index0}}[i] != generation:
+                if f{{loop.index0}} is None:
+                    v{{loop.index0}}[i] = {{step.expression}}
+                else:
+                    v{{loop.index0}}[i] = f{{loop.index0}}(t)
+                s{{loop.index0}}[i] = generation
+            {% endfor %}
+            return None
+
+        return step
+
+    def run_forward(self, until=None, equations=None):
+        """
+        Step forward from the starttime until the given time. Subsequent calls to equation / memoize are simple lookups
+        :param until: Last timestep to evaluate, defaults to the stoptime
+        :param equations: Accepted for compatibility with the models of the SD DSL, all equations are evaluated
+        :return: None
+        """
+        if until is None:
+            until = self.stoptime
+
+        grid = self.memo.grid
+        steps = min(grid.size, max(0, round((until - grid.starttime) / grid.dt) + 1))
+        step = self.step_function()
+        times = grid.times
+
+        for i in range(steps):
+            step(i, times[i])
+
+'''
@@ -0,0 +1,139 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+
+import re
+
+
+def generate(IR):
+    """
+    The generator for the numpy target. Renders the python model together with a forward-stepping model class, whose step function evaluates the equations in topological order
+
+    :param IR:
+    :return:
+    """
+    from ..contextBuilder import build_context
+    from ..py import py
+    from ..py.jinja_template import template as py_template
+    from .jinja_template import template
+
+    # parseExpression resolves array subscripts using the dimensions the array references are annotated with, and keys the state of builtins by the call sites the calls are annotated with
+    py.resolve_dimensions(IR)
+    py.resolve_call_sites(IR)
+
+    context = build_context(IR, py.parseExpression)
+    order = topological_order(IR.get("same_step_dependencies", {}))
+
+    return py.generate(IR, template=py_template + template, context=context, model_class="memo_simulation_model", order=order, steps=steps(context, order))
+
+
+def steps(context, order):
+    '''
+    The equations of the step function in topological order. Reads of equations that are evaluated earlier in the same step or in the previous step become reads of their memo slots
+    :param context: Export context (see contextBuilder.build_context)
+    :param order: Topological order of the equations
+    :return: List of dicts {"name", "expression"}
+    '''
+    bodies = {}
+    for kind in ["stocks", "flows", "converters", "constants", "gfs"]:
+        for entity in context[kind]:
+            name = entity["name"] + ("[{}]".format(entity["labels"]) if "labels" in entity.keys() else "")
+            expression = str(entity["expression"])
+            if kind == "gfs":
+                expression = "LERP( {}, self.points.table(\'{}\'))".format(expression, entity["name"])
+            bodies[name] = expression
+
+    names = [name for name in order if name in bodies.keys()]
+    ordered = set(names)
+    names += [name for name in bodies.keys() if name not in ordered]
+    slots = {name: slot for slot, name in enumerate(names)}
+    steps = []
+
+    for slot, name in enumerate(names):
+        functions = argument_functions(bodies[name])
+
+        def read(match):
+            equation, previous = match.group(1), match.group(2) is not None
+            if equation not in slots or any(start <= match.start() < end for start, end in functions):
+                return match.group(0)
+            if previous:
+                # the step before the first step is not on the time grid
+                return "(v{}[i-1] if i else {})".format(slots[equation], match.group(0))
+            if slots[equation] < slot:
+                return "v{}[i]".format(slots[equation])
+            return match.group(0)
+
+        steps += [{"name": name, "expression": memoize_pattern.sub(read, bodies[name])}]
+
+    return steps
+
+
+def argument_functions(expression):
+    '''
+    Spans of the arguments that are handed over to builtins as functions of t (see py.time_varying). The builtins call them at other timesteps, so their memo reads are kept
+    :param expression: Code of an equation
+    :return: List of (start, end)
+    '''
+    spans = []
+    for match in re.finditer(r"lambda t:", expression):
+        if spans and match.start() < spans[-1][1]:
+            continue
+        depth = 0
+        end = match.end()
+        while end < len(expression):
+            if expression[end] in "([{":
+                depth += 1
+            elif expression[end] in ")]}":
+                if depth == 0:
+                    break
+                depth -= 1
+            elif expression[end] == "," and depth == 0:
+                break
+            end += 1
+        spans += [(match.start(), end)]
+    return spans
+
+
+'''
+Memo reads of the generated python code at the same timestep (t) or at the previous one (t-self.dt)
+'''
+memoize_pattern = re.compile(r"self\.memoize\('([^']+)', ?t( ?- ?self\.dt)?\)")
+
+
+def topological_order(dependencies):
+    '''
+    Order the equations such that each equation comes after the equations it reads at the same timestep. Cycles are broken at an arbitrary equation, the generated model still evaluates the equations of a cycle on demand
+    :param dependencies: Dict {equation: [equations read at the same timestep]}
+    :return: List of equations
+    '''
+    order = []
+    visited = set()
+
+    for name in sorted(dependencies.keys()):
+        if name in visited:
+            continue
+
+        visited.add(name)
+        stack = [(name, iter(dependencies[name]))]
+
+        while stack:
+            equation, children = stack[-1]
+            for child in children:
+                if child in dependencies and child not in visited:
+                    visited.add(child)
+                    stack.append((child, iter(dependencies[child])))
+                    break
+            else:
+                stack.pop()
+                order.append(equation)
+
+    return order
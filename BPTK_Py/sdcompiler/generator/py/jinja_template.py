@@ -26,6 +26,8 @@ import math, statistics, random, logging
 from datetime import datetime
 import re
 import itertools
+from collections.abc import MutableMapping
+from bisect import bisect_right
 from copy import copy, deepcopy
 
 {{header}}
@@ -45,26 +47,249 @@ def cartesian_product(listoflists):
 
     return res
 
+class lookup_table:
+    """
+    Compiled graphical function. The points are sorted by x once, single values are looked up via binary search, NumPy arrays of values via np.interp
+    """
+    def __init__(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        order = np.argsort(points[:, 0], kind="stable")
+        self.x = np.ascontiguousarray(points[order, 0])
+        self.y = np.ascontiguousarray(points[order, 1])
+        self._x = self.x.tolist()
+        self._y = self.y.tolist()
+
+    def __call__(self, x):
+        if isinstance(x, np.ndarray):
+            return np.interp(x, self.x, self.y)
+        xs = self._x
+        ys = self._y
+        if x <= xs[0]:
+            return ys[0]
+        if x >= xs[-1]:
+            return ys[-1]
+        i = bisect_right(xs, x)
+        return (ys[i] - ys[i - 1]) / (xs[i] - xs[i - 1]) * (x - xs[i - 1]) + ys[i - 1]
+
+class points_store(dict):
+    """
+    Points of the graphical functions, a dict {name: points}. Lookup tables are compiled when first used and discarded when the points are replaced
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tables = {}
+
+    def __setitem__(self, name, points):
+        super().__setitem__(name, points)
+        self.tables.pop(name, None)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.tables.pop(name, None)
+
+    def setdefault(self, name, points=None):
+        if name not in self:
+            self[name] = points
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, points in dict(*args, **kwargs).items():
+            self[name] = points
+
+    def pop(self, name, *default):
+        self.tables.pop(name, None)
+        return super().pop(name, *default)
+
+    def clear(self):
+        super().clear()
+        self.tables.clear()
+
+    def table(self, name):
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = lookup_table(self[name])
+        return table
+
 def LERP(x,points):
     """
     Linear interpolation between a set of points
-    :param x: x to obtain y for
-    :param points: List of tuples containing the graphical function's points [(x,y),(x,y) ... ]
+    :param x: x to obtain y for, a number or a NumPy array of numbers
+    :param points: Compiled lookup_table or list of tuples containing the graphical function's points [(x,y),(x,y) ... ]
     :return: y value for x obtained using linear interpolation
     """
-    x_vals = np.array([ x[0] for x in points])
-    y_vals = np.array([x[1] for x in points])
+    if not isinstance(points, lookup_table):
+        points = lookup_table(points)
+    return points(x)
+
+def scale(x):
+    """
+    Number of decimal places of x (with at most 14 significant digits)
+    :param x: Float
+    :return: Integer
+    """
+    max_digits = 14
+    int_part = int(abs(x))
+    magnitude = 1 if int_part == 0 else int(math.log10(int_part)) + 1
+    if magnitude >= max_digits:
+        return 0
+    frac_part = abs(x) - int_part
+    multiplier = 10 ** (max_digits - magnitude)
+    frac_digits = multiplier + int(multiplier * frac_part + 0.5)
+    while frac_digits % 10 == 0:
+        frac_digits /= 10
+    return int(math.log10(frac_digits))
+
+class time_grid():
+    """
+    Time grid of a simulation run. Step i is the (normalized) time starttime + i*dt
+    """
+    def __init__(self, starttime, stoptime, dt):
+        self.starttime = starttime * 1.0
+        self.stoptime = stoptime * 1.0
+        self.dt = dt * 1.0
+        self.precision = max(scale(self.starttime), scale(self.dt))
+        self.size = max(0, round((self.stoptime - self.starttime) / self.dt) + 1) if self.dt > 0 else 0
+        self.times = [1.0 * round(self.dt * index + self.starttime, self.precision) for index in range(self.size)]
+
+    def index(self, t):
+        """
+        Step index of a timestep
+        :param t: Timestep
+        :return: Index of the step, None if t is not a step of the grid
+        """
+        if not self.size:
+            return None
+        index = round((t - self.starttime) / self.dt)
+        if 0 <= index < self.size and abs(t - self.times[index]) <= self.dt * 1e-6:
+            return index
+        return None
+
+class step_memo(MutableMapping):
+    """
+    Memo of one equation, behaves like the dict {t: value}.
+    Values of steps of the time grid are kept in lists indexed by step, which are allocated when the first value is stored. Each value is stamped with the generation of the memo store, values with an older stamp are considered empty. Values of other timesteps are kept in a dict
+    """
+    def __init__(self, store):
+        self.store = store
+        self.values = []
+        self.stamps = []
+        self.outside = {}
+
+    def set_value(self, index, value):
+        if not self.stamps:
+            self.values = [None] * self.store.grid.size
+            self.stamps = [0] * self.store.grid.size
+        self.values[index] = value
+        self.stamps[index] = self.store.generation
+
+    def __getitem__(self, t):
+        index = self.store.grid.index(t)
+        if index is None:
+            generation, value = self.outside[t]
+            if generation == self.store.generation:
+                return value
+        elif index < len(self.stamps) and self.stamps[index] == self.store.generation:
+            return self.values[index]
+        raise KeyError(t)
+
+    def __setitem__(self, t, value):
+        index = self.store.grid.index(t)
+        if index is None:
+            self.outside[t] = (self.store.generation, value)
+        else:
+            self.set_value(index, value)
+
+    def __delitem__(self, t):
+        self[t]
+        index = self.store.grid.index(t)
+        if index is None:
+            del self.outside[t]
+        else:
+            self.stamps[index] = 0
+            self.values[index] = None
+
+    def clear(self):
+        """
+        Invalidate all values of the equation, the lists keep their identity
+        """
+        self.stamps[:] = [0] * len(self.stamps)
+        self.outside.clear()
+
+    def __iter__(self):
+        generation = self.store.generation
+        keys = [self.store.grid.times[index] for index, stamp in enumerate(self.stamps) if stamp == generation]
+        keys += [t for t, (stamp, _) in self.outside.items() if stamp == generation]
+        return iter(keys)
 
-    if x<= x_vals[0]:
-        return y_vals[0]
+    def __len__(self):
+        return len(list(iter(self)))
 
-    if x >= x_vals[len(x_vals)-1]:
-        return y_vals[len(x_vals)-1]
+    def __repr__(self):
+        return repr(dict(self.items()))
 
-    f = interp1d(x_vals, y_vals)
-    return float(f(x))
+class memo_store(dict):
+    """
+    Memo of all equations, a dict {equation: step_memo}. Dicts that are assigned are converted to step memos.
+    Resetting the store only increments its generation, which invalidates all values.
+    The hidden state of builtins (e.g. the stocks of SMTHN) is kept in builtin_states and dropped whenever values are invalidated
+    """
+    def __init__(self, starttime, stoptime, dt):
+        super().__init__()
+        self.generation = 1
+        self.grid = time_grid(starttime, stoptime, dt)
+        self.builtin_states = {}
+
+    def __setitem__(self, equation, memo):
+        if not (isinstance(memo, step_memo) and memo.store is self):
+            values = memo
+            memo = step_memo(self)
+            memo.update(values)
+        super().__setitem__(equation, memo)
+
+    def setdefault(self, equation, memo=None):
+        if equation not in self:
+            self[equation] = memo if memo is not None else {}
+        return self[equation]
+
+    def update(self, *args, **kwargs):
+        for equation, memo in dict(*args, **kwargs).items():
+            self[equation] = memo
+
+    def reset(self):
+        self.generation += 1
+        self.builtin_states = {}
+
+    def invalidate(self, equations):
+        """
+        Invalidate the values of the given equations only
+        """
+        for equation in equations:
+            if equation in self:
+                self[equation].clear()
+        self.builtin_states = {}
 
-class simulation_model():
+    def set_grid(self, starttime, stoptime, dt):
+        """
+        Change the time grid. Values of steps on the old grid are kept if they are steps of the new grid
+        """
+        grid = self.grid
+        if (grid.starttime, grid.stoptime, grid.dt) == (starttime * 1.0, stoptime * 1.0, dt * 1.0):
+            return
+        memos = {equation: dict(memo.items()) for equation, memo in self.items()}
+        self.grid = time_grid(starttime, stoptime, dt)
+        self.builtin_states = {}
+        for equation, memo in memos.items():
+            self[equation] = memo
+
+    def __reduce__(self):
+        return (restore_memo_store, (self.grid.starttime, self.grid.stoptime, self.grid.dt, {equation: dict(memo.items()) for equation, memo in self.items()}))
+
+def restore_memo_store(starttime, stoptime, dt, memos):
+    store = memo_store(starttime, stoptime, dt)
+    store.update(memos)
+    return store
+
+class {{ model_class|default('simulation_model') }}():
     def __init__(self):
         # Simulation Settings
         self.dt = {{specs.dt}}
@@ -95,7 +320,7 @@ class simulation_model():
     
         # gf
         {% for gf in gfs -%}
-        '{{ gf.name }}{% if "labels" in gf.keys() %}[{{ gf.labels }}]{% endif %}' : lambda t: LERP( {{ gf.expression}}, self.points['{{gf.name}}']),
+        '{{ gf.name }}{% if "labels" in gf.keys() %}[{{ gf.labels }}]{% endif %}' : lambda t: LERP( {{ gf.expression}}, self.points.table('{{gf.name}}')),
         {% endfor %}
     
         #constants
@@ -120,6 +345,15 @@ class simulation_model():
         {% endfor %}}
                 
         self.dimensions_order = {{dimensions.order}}     
+
+        # Index of each label within its dimension and the names of the elements of each arrayed equation as an ndarray in the shape of its dimensions.
+        # Subscripts of array references are resolved to indices into these ndarrays at compile time
+        self.label_indices = {dimension: {str(label): index for index, label in enumerate(values["labels"])} for dimension, values in self.dimensions.items()}
+        self.arrays = {}
+        for name, order in self.dimensions_order.items():
+            shape = tuple(len(self.dimensions[dimension]["labels"]) for dimension in order)
+            elements = [name + "[" + ",".join(labels) + "]" for labels in itertools.product(*[[str(label) for label in self.dimensions[dimension]["labels"]] for dimension in order])]
+            self.arrays[name] = np.array(elements, dtype=object).reshape(shape)
     
         self.stocks = [{% for stock in stocks -%} '{{stock.name}}{% if "labels" in stock.keys() %}[{{ stock.labels }}]{% endif %}'   {%- if not loop.last -%} , {% endif %}  {% endfor%}]
         self.flows = [{% for flow in flows -%} '{{flow.name}}{% if "labels" in flow.keys() %}[{{ flow.labels }}]{% endif %}' {%- if not loop.last -%}, {% endif %}  {% endfor%}]
@@ -136,9 +370,29 @@ class simulation_model():
                     { 'message':'{{message.message}}','action':'{{message.action}}'} {% endfor%}{% endfor%}
             ]
     
-        self.memo = {}
+        self.memo = memo_store(self.starttime, self.stoptime, self.dt)
         for key in list(self.equations.keys()):
-          self.memo[key] = {}  # DICT OF DICTS!
+          self.memo[key] = {}  # DICT OF STEP MEMOS!
+
+        # Dependency graph: the equations each equation reads (at any time / at the same timestep)
+        self.dependencies = {{dependencies}}
+        self.same_step_dependencies = {{same_step_dependencies}}
+
+    def __setattr__(self, name, value):
+        # Points are kept in a points store, which compiles the lookup tables
+        if name == "points" and isinstance(value, dict) and not isinstance(value, points_store):
+            value = points_store(value)
+
+        # The memo is kept on the time grid of the model. Plain dicts (e.g. cached memos of a scenario) are converted
+        if name == "memo" and not isinstance(value, memo_store):
+            memo = memo_store(self.starttime, self.stoptime, self.dt)
+            memo.update(value)
+            value = memo
+
+        super().__setattr__(name, value)
+
+        if name in ["dt", "starttime", "stoptime", "memo"] and "memo" in self.__dict__:
+            self.memo.set_grid(self.starttime, self.stoptime, self.dt)
           
     
     """
@@ -225,6 +479,7 @@ class simulation_model():
         return np.random.triangular(left, mode, right)
     
     def rank(self, lis, rank):
+        lis = np.ravel(lis)
         rank = int(rank)
         sorted_list = np.sort(lis)
         try:
@@ -300,7 +555,7 @@ class simulation_model():
         results = []
         for t in np.arange(self.starttime, self.stoptime + self.dt,
                            self.dt):  # Compute all y values for graphical functions using standard interpolate (LERP)
-            results += [(LERP(t, self.points[gf]), t)] # y,x
+            results += [(LERP(t, self.points.table(gf)), t)] # y,x
 
         return np.round(lerpfun(value, results),
                      3)  # Use LERP function for the reversed set of points (y,x) and find the correct value. Cannot use standard LERP here because that would require continuous X (1,2,3..)
@@ -348,15 +603,32 @@ class simulation_model():
     def irr(self, stock_name, missing, t,myname):
         """
         Approximate IRR (Internal Rate of Return)
+        The values of the stock are collected into an array once and kept, each NPV is then computed over the values up to t. Each NPV still takes time linear in the number of steps up to t, as the rate changes between the approximation steps
         :param stock_name: Identifier of Stock to approximate for
         :param missing: Replace missing values with this value
         :param t:
         :return:
         """
-
-        def compute_npv(stock_name, t, i, missing):
-            I = missing if missing else self.equation(stock_name, self.starttime)
-            return I + sum( [self.memoize(stock_name, t) / (1 + i) ** t for t in np.arange(self.starttime+self.dt , t, self.dt)])
+        state = self.builtin_state(("irr", stock_name))
+        start = self.starttime + self.dt
+        count = max(0, int(np.ceil((t - start) / self.dt))) # Length of np.arange(start, t, self.dt)
+
+        if "times" not in state:
+            state.update(times=np.empty(0), flows=np.empty(0), count=0)
+        if len(state["times"]) < count:
+            # room for the values up to the stoptime (or t), the values collected so far are kept
+            state["times"] = np.arange(start, max(t, self.stoptime + self.dt), self.dt)
+            state["flows"] = np.resize(state["flows"], len(state["times"]))
+        while state["count"] < count:
+            state["flows"][state["count"]] = self.memoize(stock_name, state["times"][state["count"]])
+            state["count"] += 1
+
+        times = state["times"][:count]
+        flows = state["flows"][:count]
+        I = missing if missing else self.equation(stock_name, self.starttime)
+
+        def compute_npv(i):
+            return I + np.sum(flows / (1 + i) ** times)
 
         i = 0
         try:
@@ -366,10 +638,10 @@ class simulation_model():
 
         if t == self.starttime: return None
 
-        best_kw = {i : compute_npv(stock_name, t, i, missing)}
+        best_kw = {i : compute_npv(i)}
         for _ in range(0, 300):
             # Here we approximate the IRR
-            kw = compute_npv(stock_name, t, i, missing)
+            kw = compute_npv(i)
 
             change = 0.001
 
@@ -426,6 +698,49 @@ class simulation_model():
         return 1 if rndnumber < (probability*self.dt) else 0
 
 
+    def builtin_state(self, key):
+        """
+        Persistent state of a builtin call, e.g. the hidden stocks of SMTHN. It is kept in the memo store until the memo is reset or invalidated
+        :param key: Key of the call, the builtin and its call site (or the equation it reads)
+        :return: dict
+        """
+        return self.memo.builtin_states.setdefault(key, {})
+
+    def argument(self, value, t):
+        """
+        Value of a builtin argument at t. Arguments that vary over time are handed over as functions of t
+        :param value: Number or function of t
+        :param t: current t
+        :return: Value
+        """
+        return value(t) if callable(value) else value
+
+    def step_state(self, key, t, initial_state, next_state):
+        """
+        Hidden state of a builtin at t. The states of the steps of the time grid are computed forward from the start time once and kept per call, states of other timesteps are computed from the start time
+        :param key: Key of the call
+        :param t: current t
+        :param initial_state: Function t -> state at the start time
+        :param next_state: Function (state, t) -> state at t + dt
+        :return: State at t
+        """
+        grid = self.memo.grid
+        index = grid.index(t)
+
+        if index is None:
+            times = [t]
+            while times[-1] > self.starttime:
+                times.append(times[-1] - self.dt)
+            state = initial_state(times[-1])
+            for previous in reversed(times[1:]):
+                state = next_state(state, previous)
+            return state
+
+        steps = self.builtin_state(key).setdefault("steps", [])
+        while len(steps) <= index:
+            steps.append(next_state(steps[-1], grid.times[len(steps) - 1]) if steps else initial_state(grid.times[0]))
+        return steps[index]
+
     def derivn(self, equation, order, t):
         """
         nth derivative of an equation
@@ -434,112 +749,73 @@ class simulation_model():
         :param t: current t
         :return:
         """
-        memo = {}
+        if order < 1:
+            raise ValueError("DERIVN requires an order of at least 1, got {}".format(order))
         dt = 0.25
+        memo = self.builtin_state(("derivn", equation)) # {(n, t): value}, shared by the calls of all orders
+
+        def derivative(n, t):
+            if not (n, t) in memo:
+                if t <= self.starttime:
+                    memo[(n, t)] = 0
+                elif n == 1:
+                    memo[(n, t)] = (self.memoize(equation, t) - self.memoize(equation, t - dt)) / dt
+                else:
+                    memo[(n, t)] = (derivative(n - 1, t) - derivative(n - 1, t - dt)) / dt
+            return memo[(n, t)]
 
-        def mem(eq, t):
-            """
-            Memo for internal equations
-            :param eq:
-            :param t:
-            :return:
-            """
-            if not eq in memo.keys(): memo[eq] = {}
-            mymemo = memo[eq]
-            if t in mymemo.keys(): return mymemo[t]
-            else:
-                mymemo[t] = s[eq](t)
-                return mymemo[t]
-
-        s = {}
-        s[1] = lambda t: 0 if t <= self.starttime else (self.memoize(equation, t) - self.memoize(equation, t - dt)) / dt
-
-        def addEquation(n):
-            s[n] = lambda t: 0 if t <= self.starttime else (mem(n - 1, t) - mem(n - 1, t - dt)) / dt
-
-        for n in list(range(2, order + 1)): addEquation(n)
-
-        return s[order](t) if ( t >= self.starttime + (dt * order) ) else 0
+        return derivative(order, t) if ( t >= self.starttime + (dt * order) ) else 0
 
-    def smthn(self, inputstream, averaging_time, initial, n, t):
+    def smthn(self, call_site, inputstream, averaging_time, initial, n, t):
         """
-        Pretty complex operator. Actually we are building a whole model here and have it run
+        nth order exponential smooth, also used for the delay builtins. The smooth is a chain of n hidden stocks, which are stepped forward once per timestep and kept per call site
         Find info in https://www.iseesystems.com/resources/help/v1-9/default.htm#08-Reference/07-Builtins/Delay_builtins.htm#kanchor364
+        :param call_site: Key of the call site
         :param inputstream:
-        :param averaging_time:
-        :param initial:
-        :param n:
+        :param averaging_time: Number or function of t
+        :param initial: Number or function of t
+        :param n: Number or function of t
         :param t:
         :return:
         """
-        memo = {}
-        dt = self.dt
-        from copy import deepcopy
+        def initial_state(t):
+            initial_value = self.argument(initial, t)
+            return [max([0, (self.memoize(inputstream, t) if (initial_value is None) else initial_value)])] * int(self.argument(n, t))
+
+        def next_state(stocks, t):
+            order = int(self.argument(n, t))
+            stocks = stocks[:order] + stocks[-1:] * (order - len(stocks))
+            averaging_time_t = self.argument(averaging_time, t)
+            inflow = self.memoize(inputstream, t)
+            result = []
+            for stock in stocks:
+                result.append(stock + self.dt * ((inflow - stock) / (averaging_time_t / order)))
+                inflow = stock
+            return result
+
+        return self.step_state(("smthn", call_site), t, initial_state, next_state)[-1]
+
+    def forcst(self, call_site, inputstream, averaging_time, horizon, initial, t):
+        """
+        Forecast of the input, extrapolated by its trend over the horizon. The average of the input is a hidden stock, which is stepped forward once per timestep and kept per call site
+        :param call_site: Key of the call site
+        :param inputstream:
+        :param averaging_time: Number or function of t
+        :param horizon:
+        :param initial: Initial trend, number or function of t
+        :param t:
+        :return:
+        """
+        def initial_state(t):
+            return self.memoize(inputstream, t) / (1 + self.argument(initial, t) * self.argument(averaging_time, t))
 
-        def mem(eq, t):
-            """
-            Internal memo for equations
-            :param eq:
-            :param t:
-            :return:
-            """
-            if not eq in memo.keys(): memo[eq] = {}
-            mymemo = memo[eq]
-            if t in mymemo.keys():return mymemo[t]
-            else:
-                mymemo[t] = s[eq](t)
-                return mymemo[t]
-
-        s = {}
-
-        def addEquation(n, upper):
-            y = deepcopy(n)
-            if y == 1:
-                s["stock1"] = lambda t: (
-                    (max([0, (self.memoize(inputstream, t) if (initial is None) else initial)])) if (
-                                t <= self.starttime) else (
-                                mem('stock1', t - dt) + dt * (mem('changeInStock1', t - dt))))
-                s['changeInStock1'] = lambda t: (self.memoize(inputstream, t) - mem('stock1', t)) / (
-                            averaging_time / upper)
-            if y > 1:
-                s["stock{}".format(y)] = lambda t: (
-                    (max([0, (self.memoize(inputstream, t) if (initial is None) else initial)])) if (t <= self.starttime) else (
-                                mem("stock{}".format(y), t - dt) + dt * (mem('changeInStock{}'.format(y), t - dt))))
-                s['changeInStock{}'.format(y)] = lambda t: (mem("stock{}".format(y - 1), t) - mem("stock{}".format(y),
-                                                                                                  t)) / (averaging_time / upper)
-        n = int(n)
-
-        for i in list(range(0, n + 1)): addEquation(i, n)
-
-        return s['stock{}'.format(n)](t)
-
-    def forcst(self,inputstream, averaging_time, horizon, initial, t):
-        memo = {"change_in_input": {}, "average_input": {}, "trend_in_input": {}, "forecast_input": {}}
-
-        def mem(eq, t):
-            """
-            Internal memo for equations
-            :param eq:
-            :param t:
-            :return:
-            """
-            mymemo = memo[eq]
-            if t in mymemo.keys(): return mymemo[t]
-            else:
-                mymemo[t] = s[eq](t)
-                return mymemo[t]
-
-        s = {
-            "change_in_input": lambda t: max([0, (self.memoize(inputstream,t) - mem('average_input', t)) / averaging_time]),
-            "average_input": lambda t: ((self.memoize(inputstream,t)) if (t <= self.starttime) else (
-                        mem("average_input", t - self.dt) + self.dt * (mem("change_in_input", t - self.dt)))),
-            "trend_in_input": lambda t: (((self.memoize(inputstream,t) - self.memoize('averageInput', t)) / (
-                        self.memoize('averageInput', t) * self.memoize('averagingTime', t))) if (
-                        self.memoize('averageInput', t) > 0.0) else (np.nan)),
-            "forecast_input": lambda t: self.memoize(inputstream,t) * (1.0 + mem("trend_in_input", t) * horizon)
-        }
+        def next_state(average, t):
+            return average + self.dt * max([0, (self.memoize(inputstream, t) - average) / self.argument(averaging_time, t)])
 
-        return s["forecast_input"](t)
+        average = self.step_state(("forcst", call_site), t, initial_state, next_state)
+        value = self.memoize(inputstream, t)
+        trend = ((value - average) / (average * self.argument(averaging_time, t))) if (average > 0.0) else (np.nan)
+        return value * (1.0 + trend * horizon)
 
     #Helpers for Dimensions (Arrays)
 
@@ -552,42 +828,43 @@ class simulation_model():
         if len(stockdimensions.keys()) == 1:
             return [stock + "[{}]".format(x) for x in stockdimensions[list(stockdimensions.keys())[0]]]
 
+    def label_index(self, dimension, label):
+        """
+        Index of a label within a dimension, for subscripts that are only known at runtime
+        """
+        labels = self.label_indices[dimension]
+        if str(label) in labels:
+            return labels[str(label)]
+        if isinstance(label, float) and label.is_integer() and str(int(label)) in labels:
+            return labels[str(int(label))]
+        raise KeyError("Label '{}' not found in dimension '{}'".format(label, dimension))
+
+    def array(self, equation, t, index=()):
+        """
+        Values of the elements of an arrayed equation (or of the elements selected by index) as an ndarray in the shape of its dimensions
+        """
+        elements = self.arrays[equation][index]
+        if not isinstance(elements, np.ndarray):
+            return self.memoize(elements, t)
+        return np.array([self.memoize(element, t) for element in elements.flat]).reshape(elements.shape)
+
     def get_dimensions(self, equation, t):
-        re_find_indices = r'\[([^)]+)\]'
-        group = re.search(re_find_indices, equation).group(0).replace("[", "").replace("]", "")
-        equation_basic = equation.replace(group, "").replace("[]", "")
-        labels = []
+        equation_basic, group = equation[:-1].split("[", 1)
+        order = self.dimensions_order[equation_basic]
+        indices = []
         for index, elem in enumerate(group.split(",")):
+            labels = self.label_indices[order[index]]
             if len(elem.split(":")) > 1: # List operator
-                try:
-                    bounds = [int(x) for x in elem.split(":")]
-                except ValueError as e:
-                    logging.error(e)
-                    continue
-                bounds = sorted(bounds)
+                bounds = sorted(labels[bound.strip()] for bound in elem.split(":"))
                 if len(bounds) > 2:
                     logging.error("Too many arguments for list operator. Expecting 2, got {}".format(len(bounds)))
-
-                labels += [list(range(bounds[0], bounds[1]+1))]
-
+                indices += [list(range(bounds[0], bounds[-1] + 1))]
             elif elem == "*": # Star operator
-                dim = self.dimensions_order[equation_basic][index]
-                labels += [self.dimensions[dim]["labels"]]
+                indices += [list(range(len(labels)))]
             else:
-                if not type(elem) is list:
-                    labels += [[elem]]
-                else:
-                    labels += [elem]
+                indices += [[self.label_index(order[index], elem)]]
 
-        products = cartesian_product(labels)
-
-        return_list = []
-
-        for product in products:
-            prod = str(product).replace("(", "").replace(")", "").replace("[", "").replace("]", "").replace("'", "").replace(" ", "")
-            return_list += [self.memoize(equation_basic + "[{}]".format(prod), t)]
-            
-        return np.array(return_list)
+        return self.array(equation_basic, t, np.ix_(*indices)).ravel()
 
 
     #Access equations API
@@ -619,13 +896,24 @@ class simulation_model():
             else:
                 logging.error("Equation '{}' not found!".format(equation))
 
-        mymemo = self.memo[equation]
+        memo = self.memo
+        mymemo = memo[equation]
+        index = memo.grid.index(arg)
 
-        if arg in mymemo.keys():
-            return mymemo[arg]
-        else:
+        if index is None:
+            # timesteps that are not on the time grid, e.g. for delays
+            if arg in mymemo.outside and mymemo.outside[arg][0] == memo.generation:
+                return mymemo.outside[arg][1]
             result = self.equations[equation](arg)
-            mymemo[arg] = result
+            mymemo.outside[arg] = (memo.generation, result)
+            return result
+
+        stamps = mymemo.stamps
+        if index < len(stamps) and stamps[index] == memo.generation:
+            return mymemo.values[index]
+
+        result = self.equations[equation](memo.grid.times[index])
+        mymemo.set_value(index, result)
 
         return result
 
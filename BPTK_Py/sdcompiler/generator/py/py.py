@@ -15,16 +15,144 @@ import logging
 
 from ..contextBuilder import remove_nesting
 
-def generate(IR):
+def generate(IR, template=None, **variables):
     """
     The generator for python. Hands over the template and parseExpression function to the generic generator
 
     :param IR:
+    :param template: Jinja template, defaults to the template of the py target. Other targets that build on the python code (e.g. numpy) hand over their own
+    :param variables: Additional variables for the template (and the export context, see contextBuilder.generate)
     :return:
     """
-    from .jinja_template import template
+    from .jinja_template import template as py_template
     from ..contextBuilder import generate
-    return generate(IR, template=template, parseExpression=parseExpression)
+    resolve_dimensions(IR)
+    resolve_call_sites(IR)
+    return generate(IR, template=template if template is not None else py_template, parseExpression=parseExpression, **variables)
+
+
+def resolve_dimensions(IR):
+    '''
+    Annotate each array reference of the IR with the dimensions of the arrayed variable it refers to (key "subscript_dimensions": list of (dimension, labels) in the order of the subscripts).
+    The subscripts are resolved from the annotation at compile time (see array_index), so the dimensions are handed over with the IR of each generator run instead of being kept in the module
+    :param IR: Intermediate Representation of the model
+    :return: None
+    '''
+    dimensions = IR["dimensions"]
+    order = dimensions.get("order", {})
+
+    stack = [value for key, value in IR.items() if key != "dimensions"]
+    while stack:
+        value = stack.pop()
+        if type(value) is dict:
+            if value.get("type") == "array" and value.get("name") in order:
+                value["subscript_dimensions"] = [(dimension, [str(label) for label in dimensions[dimension]["labels"]]) for dimension in order[value["name"]]]
+            stack += value.values()
+        elif type(value) is list or type(value) is tuple:
+            stack += value
+
+
+'''
+Builtins that keep a hidden state between calls (see builtin_state of the generated model)
+'''
+state_builtins = ["delay1", "delay3", "delayn", "smth3", "smthn", "forcst"]
+
+
+def resolve_call_sites(IR):
+    '''
+    Annotate each call of a builtin that keeps a hidden state with its call site (key "call_site": name of the equation and position of the call in it, e.g. "smooth#0").
+    The generated model keeps the state per call site, the arguments of the call may change over time
+    :param IR: Intermediate Representation of the model
+    :return: None
+    '''
+    for model in IR["models"].values():
+        for entities in model["entities"].values():
+            for entity in entities:
+                labels = entity.get("labels", [])
+                labels = [str(label) for label in (labels if type(labels) is list else [labels]) if str(label) != ""]
+                name = entity["name"] + ("[{}]".format(",".join(labels)) if labels else "")
+                position = 0
+
+                stack = [entity["equation_parsed"]]
+                while stack:
+                    value = stack.pop()
+                    if type(value) is dict:
+                        if value.get("type") == "call" and str(value.get("name")).lower() in state_builtins:
+                            value["call_site"] = "{}#{}".format(name, position)
+                            position += 1
+                        stack += reversed(list(value.values()))
+                    elif type(value) is list or type(value) is tuple:
+                        stack += reversed(value)
+
+
+def time_varying(argument):
+    '''
+    Hand over an argument of a builtin that keeps a hidden state as function of t, so the builtin can read it at the timesteps it steps its state through. Numbers are handed over as they are
+    :param argument: Code of the argument
+    :return: Code
+    '''
+    try:
+        float(argument)
+        return str(argument)
+    except (TypeError, ValueError):
+        return "None" if argument == "None" else "lambda t: {}".format(argument)
+
+
+def array_index(name, args, subscript_dimensions):
+    '''
+    Resolve the subscripts of an array reference to integer indices into the ndarray of its elements (see self.arrays of the generated model).
+    Labels and ranges are resolved at compile time, only subscripts that are expressions are looked up at runtime via self.label_index
+    :param name: Name of the arrayed variable
+    :param args: Subscripts
+    :param subscript_dimensions: Dimensions of the arrayed variable and their labels (see resolve_dimensions), None if the variable is not arrayed
+    :return: Code for the reference or None if the array or one of its subscripts is unknown
+    '''
+    if type(args) is not list:
+        args = [args]
+    args = [arg for arg in args if arg != ","]
+
+    if not subscript_dimensions or len(subscript_dimensions) != len(args):
+        return None
+
+    indices = []
+    wildcard = False
+    static = True
+
+    for (dimension, labels), arg in zip(subscript_dimensions, args):
+
+        if arg == "*" or (type(arg) is dict and arg.get("type") == "asterisk"):
+            indices += [":"]
+            wildcard = True
+
+        elif type(arg) is dict and arg.get("type") == "label":
+            if not str(arg["name"]) in labels:
+                return None
+            indices += [str(labels.index(str(arg["name"])))]
+
+        elif type(arg) is dict and arg.get("type") == "range":
+            bounds = [str(bound["name"]) if type(bound) is dict else str(bound) for bound in arg["args"]]
+            if not all(bound in labels for bound in bounds):
+                return None
+            bounds = sorted([labels.index(bound) for bound in bounds])
+            indices += ["{}:{}".format(bounds[0], bounds[-1] + 1)]
+            wildcard = True
+
+        elif type(arg) is int or type(arg) is float:
+            if not str(arg) in labels:
+                return None
+            indices += [str(labels.index(str(arg)))]
+
+        else:
+            indices += ["self.label_index(\'{}\', {})".format(dimension, parseExpression(arg))]
+            static = False
+
+    if wildcard:
+        return "self.array(\'{}\', t, np.s_[{}])".format(name, ", ".join(indices))
+
+    if static:
+        return None
+
+    return "self.memoize(self.arrays[\'{}\'][{}], t)".format(name, ", ".join(indices))
 
 
 def parseExpression(expression):
@@ -84,6 +212,8 @@ def parseExpression(expression):
     if expression["type"] == 'call':
         try:
             macro = builtins[expression["name"].lower()]
+            if "call_site" in expression.keys():
+                return macro(expression["args"], call_site=expression["call_site"])
             return macro(expression["args"])
         except TypeError as e:
             raise e
@@ -111,6 +241,10 @@ def parseExpression(expression):
     Array functions
     '''
     if expression["type"] == 'array':
+        index = array_index(expression["name"], expression["args"], expression.get("subscript_dimensions"))
+        if index is not None:
+            return index
+
         def array(name, args):
 
             vargs = []
@@ -324,7 +458,7 @@ def size_(*args):
                 length = float(parseExpression(args[0]))
                 return length
             except:
-                return "(len({}))".format(parseExpression(args[0]))
+                return "(np.size({}))".format(parseExpression(args[0]))
         else:
             return '(len([' + " , ".join([str(parseExpression(x)) for x in args]) + ']))'
 
@@ -773,7 +907,7 @@ def irr_(*args):
         logging.error("First Argument of IRR needs to be a Stock or Flow identifier! No terms are supported here.")
         return "0"
 
-def smth3_(*args):
+def smth3_(*args, call_site=None):
     args = remove_nesting(args)
     inputstream = parseExpression(args[0])
     try:
@@ -781,12 +915,12 @@ def smth3_(*args):
     except:
         pass
 
-    averaging_time = parseExpression(args[1])
-    initial = "None" if len(args) < 3 else parseExpression(args[2])
+    averaging_time = time_varying(parseExpression(args[1]))
+    initial = "None" if len(args) < 3 else time_varying(parseExpression(args[2]))
 
-    return "self.smthn({}, {}, {}, 3, t)".format(inputstream,averaging_time,initial)
+    return "self.smthn({}, {}, {}, {}, 3, t)".format(call_site_key(call_site, "smthn", inputstream, averaging_time, initial, 3), inputstream,averaging_time,initial)
 
-def smth1_(*args):
+def smth1_(*args, call_site=None):
     args = remove_nesting(args)
     inputstream = parseExpression(args[0])
     try:
@@ -794,12 +928,12 @@ def smth1_(*args):
     except:
         pass
 
-    averaging_time = parseExpression(args[1])
-    initial = "None" if len(args) < 3 else parseExpression(args[2])
+    averaging_time = time_varying(parseExpression(args[1]))
+    initial = "None" if len(args) < 3 else time_varying(parseExpression(args[2]))
 
-    return "self.smthn({}, {}, {}, 1, t)".format(inputstream,averaging_time,initial)
+    return "self.smthn({}, {}, {}, {}, 1, t)".format(call_site_key(call_site, "smthn", inputstream, averaging_time, initial, 1), inputstream,averaging_time,initial)
 
-def smthn_(*args):
+def smthn_(*args, call_site=None):
     args = remove_nesting(args)
     inputstream = parseExpression(args[0])
     try:
@@ -807,21 +941,36 @@ def smthn_(*args):
     except:
         pass
 
-    averaging_time = parseExpression(args[1])
-    n = parseExpression(args[2])
-    initial = "None" if len(args) < 4 else parseExpression(args[3])
+    averaging_time = time_varying(parseExpression(args[1]))
+    n = time_varying(parseExpression(args[2]))
+    initial = "None" if len(args) < 4 else time_varying(parseExpression(args[3]))
 
-    return "self.smthn({}, {}, {}, {}, t)".format(inputstream,averaging_time,initial,n)
+    return "self.smthn({}, {}, {}, {}, {}, t)".format(call_site_key(call_site, "smthn", inputstream, averaging_time, initial, n), inputstream,averaging_time,initial,n)
 
-def forcst_(*args):
+def forcst_(*args, call_site=None):
     args = remove_nesting(args)
 
     inputstream = parseExpression(args[0])
-    averaging_time = parseExpression(args[1])
+    try:
+        inputstream = "\"{}\"".format(args[0]["name"])
+    except:
+        pass
+
+    averaging_time = time_varying(parseExpression(args[1]))
     horizon = parseExpression(args[2])
-    initial = 0 if len(args) < 4 else parseExpression(args[3])
+    initial = 0 if len(args) < 4 else time_varying(parseExpression(args[3]))
+
+    return "(self.forcst({},{},{},{},{},t))".format(call_site_key(call_site, "forcst", inputstream, averaging_time, initial), inputstream,averaging_time,horizon, initial)
 
-    return "(self.forcst({},{},{},{},t))".format(inputstream,averaging_time,horizon, initial)
+def call_site_key(call_site, builtin, *arguments):
+    '''
+    Code of the key the hidden state of a builtin call is kept under. Calls that are not annotated with their call site (see resolve_call_sites) are keyed by the code of their arguments
+    :param call_site: Call site of the call or None
+    :param builtin: Name of the builtin
+    :param arguments: Code of the arguments the state depends on
+    :return: Code
+    '''
+    return repr(call_site if call_site is not None else "{}({})".format(builtin, ", ".join([str(argument) for argument in arguments])))
 
 
 builtins = {
@@ -905,15 +1054,15 @@ builtins = {
 
     'exp': operators['exp'],
 
-    'delay1': lambda *args : smth1_(args),
+    'delay1': lambda *args, **kwargs : smth1_(args, **kwargs),
 
-    'delay3' : lambda *args:  smth3_(args),
+    'delay3' : lambda *args, **kwargs:  smth3_(args, **kwargs),
 
-    'delayn' :lambda *args:  smthn_(args),
+    'delayn' :lambda *args, **kwargs:  smthn_(args, **kwargs),
 
-    'smth3' : lambda *args:  smth3_(args),
+    'smth3' : lambda *args, **kwargs:  smth3_(args, **kwargs),
 
-    'smthn' : lambda *args:  smthn_(args),
+    'smthn' : lambda *args, **kwargs:  smthn_(args, **kwargs),
 
     # Data builtins
     # http://www.iseesystems.com/Helpv10/Content/Reference/Builtins/Data_builtins.htm
@@ -998,13 +1147,13 @@ builtins = {
     # Misc Builtins
     # https://www.iseesystems.com/resources/help/v1-9/default.htm#08-Reference/07-Builtins/Miscellaneous_builtins.htm#kanchor419
     
-    'forcst' : lambda *args: forcst_(args),
+    'forcst' : lambda *args, **kwargs: forcst_(args, **kwargs),
 
     'lookup' : lambda *args : "( self.memoize(\"{}\", {}) )".format(remove_nesting(args)[0]["name"],parseExpression(remove_nesting(args)[1])),
 
     'lookupinv' : lambda *args : "( self.lookupinv(\"{}\", {}) )".format(remove_nesting(args)[0]["name"],parseExpression(remove_nesting(args)[1])),
 
-    'lookuparea' : lambda *args : "(np.trapezoid([LERP(  i , self.points[\"{}\"]) for i in np.arange(self.starttime,{} + self.dt,self.dt)], dx=self.dt)) ".format(remove_nesting(args)[0]["name"],parseExpression(remove_nesting(args)[1])),
+    'lookuparea' : lambda *args : "(np.trapezoid([LERP(  i , self.points.table(\"{}\")) for i in np.arange(self.starttime,{} + self.dt,self.dt)], dx=self.dt)) ".format(remove_nesting(args)[0]["name"],parseExpression(remove_nesting(args)[1])),
 
     'ramp' : lambda *args : ramp_(args),
 
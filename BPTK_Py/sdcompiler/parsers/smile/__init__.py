@@ -10,4 +10,5 @@
 # MIT License
 
 
-from .grammar import SMILEVisitor, grammar
\ No newline at end of file
+from .grammar import SMILEVisitor, grammar
+from .parser import SMILEParser, SMILEParseError, parse_smile
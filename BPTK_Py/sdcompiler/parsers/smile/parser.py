@@ -0,0 +1,488 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import re
+from functools import lru_cache
+
+from .grammar import SMILEVisitor, grammar
+
+try:
+    from ...plugins import sanitizeName
+except: # Standalone Mode
+    from plugins import sanitizeName
+
+'''
+Hand-written recursive descent parser for SMILE equations. Each method parses one rule of the PEG grammar in grammar.py and directly returns what the SMILEVisitor returns for it, hence both produce the same IR.
+Only Sentence, Expression and Identifier are memoized per position, which is where the grammar backtracks. Equations the parser rejects are parsed by the grammar, which then reports the error
+'''
+
+_WHITESPACE = re.compile("[\t\v\f\r\n \u00A0\u2028\uFEFF]*")
+_WHITESPACE_CHARS = "\t\v\f\r\n \u00A0\u2028\uFEFF"
+_NAME = re.compile(r"[\w_%$€£¥&§#']+")
+_NAME_WITH_SPECIAL_CHARS = re.compile(r'''([\w_%$€£¥&§#'+\-*#<>\\.,;:–()]|(\\\"))+''')
+_DIGITS = re.compile(r"[\d]+")
+_COMMENT = re.compile(r"[\w\s]*", re.I)
+_MOD = re.compile("MOD", re.I)
+_NOT = re.compile("NOT", re.I)
+_SPECIAL_FUNCTION = re.compile("starttime|stoptime|time|dt|pi|clocktime|nan|inf", re.I)
+_IF, _THEN, _ELSE, _AND, _OR = [re.compile(keyword, re.I) for keyword in ["IF", "THEN", "ELSE", "AND", "OR"]]
+_KEYWORDS = [_IF, _THEN, _ELSE, _AND, _OR]
+_COMPARISON_OPERATORS = ['>=', '=', '<=', '<>', '<', '>']
+
+
+class SMILEParseError(ValueError):
+    """
+    Raised if the parser cannot parse an equation, or if the grammar would fail to visit it
+    """
+    pass
+
+
+class SMILEParser():
+    """
+    Parses SMILE equations into the IR structure of the SMILEVisitor
+    """
+
+    def parse(self, text):
+        """
+        Parse one equation
+        :param text: equation string
+        :return: IR of the equation
+        """
+        self.text = text
+        self.sentences = {}
+        self.expressions = {}
+        self.identifiers = {}
+
+        value, end = self.sentence(0)
+        if end != len(text):
+            raise SMILEParseError("Unexpected input at position {} of equation {}".format(end, text))
+        return value
+
+    '''
+    Helpers
+    '''
+
+    def ws(self, pos):
+        return _WHITESPACE.match(self.text, pos).end()
+
+    def separator(self, pos):
+        return pos < len(self.text) and (self.text[pos] in _WHITESPACE_CHARS or self.text[pos] == '(')
+
+    def keyword(self, regex, pos):
+        match = regex.match(self.text, pos)
+        if match and self.separator(match.end()):
+            return match.end()
+        return None
+
+    def is_keyword(self, pos):
+        return any(self.keyword(regex, pos) is not None for regex in _KEYWORDS)
+
+    def digits(self, pos):
+        match = _DIGITS.match(self.text, pos)
+        return match.group() if match else None
+
+    def operator(self, pos, operators):
+        start = self.ws(pos)
+        for operator in operators:
+            if self.text.startswith(operator, start):
+                end = self.ws(start + len(operator))
+                return self.text[pos:end], end
+        return None
+
+    '''
+    Sentences and conditions
+    '''
+
+    def sentence(self, pos):
+        if pos in self.sentences:
+            return self.sentences[pos]
+
+        start = self.ws(pos)
+        value, end = self.comment(start) or self.conditional_expression(start) or self.conditional_statement(start) or self.expression(start)
+        result = (value, self.ws(end))
+
+        self.sentences[pos] = result
+        return result
+
+    def comment(self, pos):
+        start = self.ws(pos)
+        if not self.text.startswith("{", start):
+            return None
+        end = _COMMENT.match(self.text, start + 1).end()
+        if not self.text.startswith("}", end):
+            return None
+        return "0.0", self.ws(end + 1)
+
+    def conditional_expression(self, pos):
+        end = self.keyword(_IF, pos)
+        if end is None:
+            return None
+        condition, end = self.sentence(self.ws(end))
+
+        end = self.keyword(_THEN, self.ws(end))
+        if end is None:
+            return None
+        then, end = self.sentence(self.ws(end))
+
+        else_end = self.keyword(_ELSE, self.ws(end))
+        if else_end is not None:
+            else_, end = self.sentence(self.ws(else_end))
+            return {"name": "if", "type": "call", "args": [condition, then, else_]}, end
+
+        return {"name": "if", "type": "call", "args": [condition, then]}, end
+
+    def conditional_statement(self, pos):
+        comparison = self.comparison_expression(pos)
+        if comparison is None:
+            return None
+        left, end = comparison
+
+        operator = self.boolean_operator(end)
+        if operator is not None:
+            statement = self.conditional_statement(operator[1])
+            if statement is not None:
+                return {"name": operator[0].strip(), "type": 'operator', "args": [left, statement[0]]}, statement[1]
+
+        return {"name": left["name"].strip(), "type": 'operator', "args": left["args"]}, end
+
+    def boolean_operator(self, pos):
+        start = self.ws(pos)
+        end = self.keyword(_AND, start)
+        if end is None:
+            end = self.keyword(_OR, start)
+        if end is None:
+            return None
+        end = self.ws(end)
+        return self.text[pos:end], end
+
+    def comparison_expression(self, pos):
+        left, end = self.expression(pos)
+        operator = self.operator(end, _COMPARISON_OPERATORS)
+        if operator is not None:
+            right, end = self.expression(operator[1])
+            return {"name": operator[0].replace(" ", "").lower(), "type": "operator", "args": [left, right]}, end
+
+        # NOT (x=10)
+        match = _NOT.match(self.text, pos)
+        if match is None or not self.text.startswith("(", match.end()):
+            return None
+        left, end = self.expression(match.end() + 1)
+        operator = self.operator(end, _COMPARISON_OPERATORS)
+        if operator is None:
+            return None
+        right, end = self.expression(operator[1])
+        if not self.text.startswith(")", end):
+            return None
+
+        comparison = {"name": operator[0].replace(" ", "").lower(), "type": "operator", "args": [left, right]}
+        return {"type": "operator", "name": "not", "args": [comparison]}, end + 1
+
+    '''
+    Expressions
+    '''
+
+    def expression(self, pos):
+        if pos in self.expressions:
+            return self.expressions[pos]
+
+        result = left, end = self.term(pos)
+        operator = self.operator(end, ['+', '-'])
+        if operator is not None:
+            right, end = self.sentence(operator[1])
+            result = {"name": operator[0].strip(), "type": 'operator', "args": [left, right]}, end
+
+        self.expressions[pos] = result
+        return result
+
+    def multiplicative_operator(self, pos):
+        operator = self.operator(pos, ['*', '/', '^'])
+        if operator is not None:
+            return operator
+
+        start = self.ws(pos)
+        match = _MOD.match(self.text, start)
+        if match is None:
+            return None
+        end = self.ws(match.end())
+        return self.text[pos:end], end
+
+    def term(self, pos):
+        left, end = self.atom(pos)
+        operator = self.multiplicative_operator(end)
+        if operator is not None:
+            right, end = self.term(operator[1])
+            return {"name": operator[0].strip().lower(), "type": 'operator', "args": [left, right]}, end
+        return left, end
+
+    def atom(self, pos):
+        result = self.numeric_literal(pos) or self.function_expression(pos) or self.special_function(pos) or self.array_expression(pos) or self.identifier(pos)
+        if result is not None:
+            return result
+
+        if self.text.startswith("(", pos):
+            sentence, end = self.sentence(pos + 1)
+            if self.text.startswith(")", end):
+                return {"name": '()', "type": 'operator', "args": [sentence]}, end + 1
+
+        return '', pos
+
+    '''
+    Numbers
+    '''
+
+    def significant(self, pos):
+        if self.text.startswith("-", pos):
+            digits = self.digits(self.ws(pos + 1))
+            if digits is not None:
+                return '-' + digits, _DIGITS.match(self.text, self.ws(pos + 1)).end()
+            return None
+
+        digits = self.digits(pos)
+        if digits is None:
+            return None
+        return digits, pos + len(digits)
+
+    def fraction(self, pos):
+        if not self.text.startswith(".", pos):
+            return None
+        digits = self.digits(pos + 1)
+        if digits is None:
+            return None
+        return '.' + digits, pos + 1 + len(digits)
+
+    def exponent(self, pos):
+        for e in ['e-', 'e']:
+            if self.text.startswith(e, pos) and self.digits(pos + len(e)) is not None:
+                return True
+        return False
+
+    def numeric_literal(self, pos):
+        significant = self.significant(pos)
+        if significant is not None:
+            fraction = self.fraction(significant[1])
+            if fraction is not None:
+                if self.exponent(fraction[1]):
+                    raise SMILEParseError("Exponents are not supported")
+                return float(significant[0] + fraction[0]), fraction[1]
+
+        if self.text.startswith("-", pos) and self.fraction(pos + 1) is not None:
+            raise SMILEParseError("Negative fractions without leading digits are not supported")
+
+        fraction = self.fraction(pos)
+        if fraction is not None:
+            return float(fraction[0]), fraction[1]
+
+        if significant is not None:
+            if self.exponent(significant[1]):
+                raise SMILEParseError("Exponents are not supported")
+            return float(significant[0]), significant[1]
+
+        return None
+
+    '''
+    Functions
+    '''
+
+    def function_expression(self, pos):
+        identifier = self.identifier(pos)
+        if identifier is None or not self.text.startswith("(", identifier[1]):
+            return None
+
+        arguments = self.function_arguments(identifier[1] + 1)
+        if arguments is None or not self.text.startswith(")", arguments[1]):
+            return None
+
+        return {"name": sanitizeName(identifier[0]["name"].lower()), "type": 'call', "args": arguments[0]}, arguments[1] + 1
+
+    def function_arguments(self, pos):
+        first, end = self.function_argument(pos)
+        arguments = [first]
+        groups = 0
+
+        separator = self.operator(end, [','])
+        while separator is not None:
+            argument, end = self.function_argument(separator[1])
+            arguments += argument if type(argument) is list else [argument]
+            groups += 1
+            separator = self.operator(end, [','])
+
+        if groups:
+            return arguments, end
+
+        sentence, end = self.sentence(pos)
+        if type(sentence) is float:
+            return str(sentence), end
+        if type(sentence) is dict:
+            return [sentence], end
+        if type(sentence) is str:
+            return (sentence if len(sentence) == 1 else [sentence]), end
+
+        raise SMILEParseError("Unexpected function argument {}".format(sentence))
+
+    def function_argument(self, pos):
+        array = self.array_expression(pos)
+        left = array or self.expression(pos)
+
+        operator = self.operator(left[1], ['+', '-']) or self.multiplicative_operator(left[1])
+        if operator is not None:
+            right, end = self.term(operator[1])
+            return {"name": operator[0].replace(" ", "").lower(), "type": "operator", "args": [[left[0]], right]}, end
+
+        if array is not None:
+            return array
+
+        return self.sentence(pos)
+
+    def special_function(self, pos):
+        start = self.ws(pos)
+        match = _SPECIAL_FUNCTION.match(self.text, start)
+        if match is None or _NAME.match(self.text, match.end()):
+            return None
+        return {"name": self.text[pos:match.end()].lower(), "type": 'call', "args": []}, match.end()
+
+    '''
+    Arrays
+    '''
+
+    def array_expression(self, pos):
+        identifier = self.identifier(pos)
+        if identifier is None or not self.text.startswith("[", identifier[1]):
+            return None
+
+        indices = self.array_indices(identifier[1] + 1)
+        if indices is None or not self.text.startswith("]", indices[1]):
+            return None
+
+        return {"name": identifier[0]["name"], "type": 'array', "args": indices[0]}, indices[1] + 1
+
+    def array_indices(self, pos):
+        first = self.array_index(pos)
+        if first is None:
+            return None
+        first, end = first
+        indices = [first]
+        groups = 0
+
+        while True:
+            separator = self.operator(end, [','])
+            index = self.array_index(separator[1]) if separator is not None else None
+            if index is None:
+                break
+            indices += index[0] if type(index[0]) is list else [index[0]]
+            end = index[1]
+            groups += 1
+
+        if groups:
+            return indices, end
+
+        if type(first) is dict:
+            return [first], end
+        if type(first) is str and len(first) == 1:
+            return first, end
+
+        raise SMILEParseError("Unexpected array index {}".format(first))
+
+    def array_index(self, pos):
+        result = self.function_expression(pos)
+        if result is not None:
+            return result
+
+        if self.text.startswith("*", pos):
+            return "*", pos + 1
+
+        label = self.label(pos)
+        if label is not None:
+            separator = self.operator(label[1], [':'])
+            to_ = self.label(separator[1]) if separator is not None else None
+            if to_ is not None:
+                return {"name": separator[0].replace(" ", "").lower(), "type": 'range', "args": [label[0], to_[0]]}, to_[1]
+            return label
+
+        return self.identifier(pos)
+
+    def label(self, pos):
+        if self.namespaced_identifier(pos) is not None:
+            return None
+        match = _NAME.match(self.text, pos)
+        if match is None:
+            return None
+        return {"name": sanitizeName(match.group().lower()), "type": 'label'}, match.end()
+
+    '''
+    Identifier
+    '''
+
+    def identifier(self, pos):
+        if pos not in self.identifiers:
+            self.identifiers[pos] = self.enclosed_identifier(pos) or self.namespaced_identifier(pos) or self.simple_identifier(pos)
+        return self.identifiers[pos]
+
+    def enclosed_identifier(self, pos):
+        if not self.text.startswith('"', pos):
+            return None
+        match = _NAME_WITH_SPECIAL_CHARS.match(self.text, pos + 1)
+        if match is None or not self.text.startswith('"', match.end()):
+            return None
+        return {"name": sanitizeName(self.text[pos:match.end() + 1].lower()), "type": 'identifier'}, match.end() + 1
+
+    def namespaced_identifier(self, pos):
+        if self.is_keyword(pos):
+            return None
+
+        end = None
+        match = _NAME.match(self.text, pos)
+        if match is not None and self.text.startswith(".", match.end()):
+            name = _NAME.match(self.text, match.end() + 1)
+            if name is not None:
+                end = name.end()
+
+        if end is None and self.text.startswith(".", pos):
+            name = _NAME.match(self.text, pos + 1)
+            if name is not None:
+                end = name.end()
+
+        if end is None:
+            return None
+        return {"name": sanitizeName(self.text[pos:end].lower()), "type": 'identifier'}, end
+
+    def simple_identifier(self, pos):
+        if self.is_keyword(pos):
+            return None
+        match = _NAME.match(self.text, pos)
+        if match is None:
+            return None
+        return {"name": sanitizeName(match.group().lower()), "type": 'identifier'}, match.end()
+
+
+def _copy(value):
+    if type(value) is dict:
+        return {key: _copy(item) for key, item in value.items()}
+    if type(value) is list:
+        return [_copy(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=4096)
+def _parse(equation):
+    try:
+        return SMILEParser().parse(equation)
+    except (SMILEParseError, RecursionError):
+        return SMILEVisitor().visit(grammar.parse(equation))
+
+
+def parse_smile(equation):
+    """
+    Parse a SMILE equation into the IR. Identical equations (e.g. of the cells of arrayed elements) are parsed only once
+    :param equation: equation string
+    :return: IR of the equation. A copy, the IR can be modified by the caller
+    """
+    return _copy(_parse(equation))
@@ -13,11 +13,11 @@ from collections import OrderedDict
 from copy import deepcopy
 
 try: # Relative imports in case you are using me inside BPTK or any other library
-    from ...parsers.smile.grammar import SMILEVisitor, grammar
+    from ...parsers.smile.parser import parse_smile
     from ...plugins import sanitizeName
     from ...plugins import makeExpressionAbsolute
 except: # Absolute imports, in case you are using me standalone
-    from parsers.smile.grammar import SMILEVisitor, grammar
+    from parsers.smile.parser import parse_smile
     from plugins import sanitizeName, makeExpressionAbsolute
 
 
@@ -242,7 +242,6 @@ def parse_xmile(filename):
 
 
     ## ENTITIES
-    visitor = SMILEVisitor()
     table = []
 
     models = document["xmile"]["model"] if type(document["xmile"]["model"]) is list else [document["xmile"]["model"]]
@@ -284,7 +283,7 @@ def parse_xmile(filename):
     for name, model in IR["models"].items():
         for entity_type, entity in model["entities"].items():
             for elem in entity:
-                elem["equation_parsed"] = [makeExpressionAbsolute(name,visitor.visit(grammar.parse(x)),connects=IR["assignments"],entity=entity,dimensions=IR["dimensions"]) for x in elem["equation"]]
+                elem["equation_parsed"] = [makeExpressionAbsolute(name,parse_smile(x),connects=IR["assignments"],entity=entity,dimensions=IR["dimensions"]) for x in elem["equation"]]
 
                 # Handle Non-Negative stocks
                 if elem["non_negative"]:
@@ -20,4 +20,5 @@ from .resolveSelf import resolveSelf
 from .resolveAsterisk import resolveAsterisk
 from .fixLabels import fixLabels
 from .filterGhosts import filterGhosts
-from .replaceDimensionNames import replaceDimensionNames
\ No newline at end of file
+from .replaceDimensionNames import replaceDimensionNames
+from .dependencyGraph import dependencyGraph
@@ -0,0 +1,107 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+'''
+Builtins that read their inputs at earlier timesteps only
+'''
+time_shifting = ["previous", "delay", "delay1", "delay3", "delayn", "smth1", "smth3", "smthn", "trend", "forcst", "history"]
+
+
+def equation_name(entity):
+    '''
+    Name of the equation the generator creates for an entity, e.g. "stock[1,2]" for arrayed entities
+    '''
+    labels = entity["labels"]
+    if type(labels) is str or type(labels) is float or type(labels) is int:
+        labels = [labels]
+    if len(labels) == 0:
+        return entity["name"]
+    return "{}[{}]".format(entity["name"], ",".join([str(label) for label in labels]))
+
+
+def collect(expression, shifted, references):
+    '''
+    Traverse the AST of an equation and collect all references to other entities
+    :param expression: (Sub-)Expression
+    :param shifted: True if the expression is read at an earlier timestep
+    :param references: List of (name, same_step) tuples, filled by collect
+    '''
+    if type(expression) is list or type(expression) is tuple:
+        for elem in expression:
+            collect(elem, shifted, references)
+        return
+
+    if type(expression) is not dict or "type" not in expression.keys():
+        return
+
+    name_ = expression.get("name")
+    type_ = expression["type"]
+    args = expression.get("args", [])
+
+    if type_ == "identifier":
+        references += [(name_[:1].lower() + name_[1:], not shifted)]
+        return
+
+    if type_ == "array":
+        labels = [arg["name"] for arg in (args if type(args) is list else [args]) if type(arg) is dict and arg.get("type") == "label"]
+        references += [("{}[{}]".format(name_, ",".join(labels)), not shifted)]
+
+    if type_ == "call" and str(name_).lower() in time_shifting:
+        shifted = True
+
+    collect(args, shifted, references)
+
+
+def resolve(reference, names):
+    '''
+    Map a reference to the equations it reads. Arrayed references with wildcards read all elements, references to unknown elements of arrays fall back to the array itself (just as the generated memoize does)
+    '''
+    if reference in names:
+        return [reference]
+
+    base = reference.split("[")[0]
+
+    if "*" in reference or ":" in reference:
+        return [name for name in names if name.startswith(base + "[")]
+
+    return [base] if base in names else []
+
+
+def dependencyGraph(IR):
+    '''
+    This plugin adds the dependency graph to the IR. For each equation, IR["dependencies"] holds the equations it reads and IR["same_step_dependencies"] the equations it reads at the same timestep
+    '''
+    entities = [entity for name, model in IR["models"].items() for entity_type, entities in model["entities"].items() for entity in entities]
+    names = set([equation_name(entity) for entity in entities])
+
+    dependencies = {}
+    same_step_dependencies = {}
+
+    for entity in entities:
+        references = []
+        collect(entity["equation_parsed"], False, references)
+
+        name = equation_name(entity)
+        dependencies[name] = []
+        same_step_dependencies[name] = []
+
+        for reference, same_step in references:
+            for dependency in resolve(reference, names):
+                if dependency not in dependencies[name]:
+                    dependencies[name] += [dependency]
+                if same_step and dependency not in same_step_dependencies[name]:
+                    same_step_dependencies[name] += [dependency]
+
+    IR["dependencies"] = dependencies
+    IR["same_step_dependencies"] = same_step_dependencies
+
+    return IR
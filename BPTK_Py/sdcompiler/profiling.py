@@ -0,0 +1,110 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import time
+import tracemalloc
+
+'''
+Instrumentation of the compiler stages. Pass a CompileProfile to compile_xmile to record the wall time, the allocations and the size of the result of each stage
+'''
+
+
+def ir_size(value):
+    '''
+    Size of an Intermediate Representation: the number of dicts, lists and values it consists of. The size of a string (e.g. generated code) is its length
+    :param value: IR or any part of it
+    :return: int
+    '''
+    if isinstance(value, str):
+        return len(value)
+
+    size = 0
+    stack = [value]
+    seen = set()
+    while stack:
+        value = stack.pop()
+        size += 1
+        if isinstance(value, (dict, list, tuple, set)):
+            if id(value) in seen:
+                continue
+            seen.add(id(value))
+        if isinstance(value, dict):
+            stack += value.values()
+        elif isinstance(value, (list, tuple, set)):
+            stack += value
+    return size
+
+
+class CompileProfile():
+    '''
+    Records one entry per compiler stage: {"stage": name, "seconds": wall time, "allocated": bytes allocated and still held after the stage, "peak": peak of the bytes allocated during the stage, "size": ir_size of the result}.
+    Allocations are traced with tracemalloc, which slows down the stages. Pass trace_allocations=False to measure the wall time only
+    '''
+
+    def __init__(self, trace_allocations=True):
+        self.trace_allocations = trace_allocations
+        self.stages = []
+
+    def run(self, stage, function, *args):
+        '''
+        Run one stage and record it
+        :param stage: Name of the stage
+        :param function: Function of the stage
+        :param args: Arguments of the function
+        :return: Result of the function
+        '''
+        started_tracing = self.trace_allocations and not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start()
+
+        if self.trace_allocations:
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+
+        start = time.perf_counter()
+        try:
+            result = function(*args)
+        finally:
+            seconds = time.perf_counter() - start
+            allocated = peak = None
+            if self.trace_allocations:
+                current, peak = tracemalloc.get_traced_memory()
+                allocated, peak = current - before, peak - before
+            if started_tracing:
+                tracemalloc.stop()
+
+        self.stages += [{"stage": stage, "seconds": seconds, "allocated": allocated, "peak": peak, "size": ir_size(result)}]
+        return result
+
+    @property
+    def seconds(self):
+        '''
+        Wall time of all stages
+        :return: float
+        '''
+        return sum(entry["seconds"] for entry in self.stages)
+
+    def report(self):
+        '''
+        Table of the recorded stages
+        :return: str
+        '''
+        lines = ["{:<24} {:>10} {:>12} {:>12} {:>10}".format("stage", "ms", "allocated kB", "peak kB", "size")]
+        for entry in self.stages:
+            lines += ["{:<24} {:>10.2f} {:>12} {:>12} {:>10}".format(
+                entry["stage"],
+                entry["seconds"] * 1000,
+                "-" if entry["allocated"] is None else "{:.1f}".format(entry["allocated"] / 1024),
+                "-" if entry["peak"] is None else "{:.1f}".format(entry["peak"] / 1024),
+                entry["size"])]
+        lines += ["{:<24} {:>10.2f}".format("total", self.seconds * 1000)]
+        return "\n".join(lines)
@@ -185,15 +185,32 @@ class SDModel():
     def irr(self, stock_name, missing, t,myname):
         """
         Approximate IRR (Internal Rate of Return)
+        The values of the stock are collected into an array once and kept, each NPV is then computed over the values up to t. Each NPV still takes time linear in the number of steps up to t, as the rate changes between the approximation steps
         :param stock_name: Identifier of Stock to approximate for
         :param missing: Replace missing values with this value
         :param t:
         :return:
         """
-
-        def compute_npv(stock_name, t, i, missing):
-            I = missing if missing else self.equation(stock_name, self.starttime)
-            return I + sum( [self.memoize(stock_name, t) / (1 + i) ** t for t in timerange(self.starttime+self.dt , t, self.dt)])
+        state = self.builtin_state(("irr", stock_name))
+        start = self.starttime + self.dt
+        count = max(0, int(np.ceil((t - start) / self.dt))) # Length of np.arange(start, t, self.dt)
+
+        if "times" not in state:
+            state.update(times=np.empty(0), flows=np.empty(0), count=0)
+        if len(state["times"]) < count:
+            # room for the values up to the stoptime (or t), the values collected so far are kept
+            state["times"] = np.arange(start, max(t, self.stoptime + self.dt), self.dt)
+            state["flows"] = np.resize(state["flows"], len(state["times"]))
+        while state["count"] < count:
+            state["flows"][state["count"]] = self.memoize(stock_name, state["times"][state["count"]])
+            state["count"] += 1
+
+        times = state["times"][:count]
+        flows = state["flows"][:count]
+        I = missing if missing else self.equation(stock_name, self.starttime)
+
+        def compute_npv(i):
+            return I + np.sum(flows / (1 + i) ** times)
 
         i = 0
         try:
@@ -203,10 +220,10 @@ class SDModel():
 
         if t == self.starttime: return None
 
-        best_kw = {i : compute_npv(stock_name, t, i, missing)}
+        best_kw = {i : compute_npv(i)}
         for _ in range(0, 300):
             # Here we approximate the IRR
-            kw = compute_npv(stock_name, t, i, missing)
+            kw = compute_npv(i)
 
             change = 0.001
 
@@ -263,6 +280,43 @@ class SDModel():
         return 1 if rndnumber < (probability*self.dt) else 0
 
 
+    def builtin_state(self, key):
+        """
+        Persistent state of a builtin call, e.g. the hidden stocks of SMTHN. It is kept in the memo, so it is dropped together with the memo
+        :param key: Key of the call, the builtin and its call site (or the equation it reads)
+        :return: dict
+        """
+        return self.memo.setdefault(("builtin",) + key, {})
+
+    def argument(self, value, t):
+        """
+        Value of a builtin argument at t. Arguments that vary over time are handed over as functions of t
+        :param value: Number or function of t
+        :param t: current t
+        :return: Value
+        """
+        return value(t) if callable(value) else value
+
+    def step_state(self, key, t, initial_state, next_state):
+        """
+        Hidden state of a builtin at t. States are computed forward from the start time or the latest known state and kept per call
+        :param key: Key of the call
+        :param t: current t
+        :param initial_state: Function t -> state at the start time
+        :param next_state: Function (state, t) -> state at t + dt
+        :return: State at t
+        """
+        states = self.builtin_state(key) # {t: state}
+        times = [t]
+        while not times[-1] in states and times[-1] > self.starttime:
+            times.append(times[-1] - self.dt)
+
+        if not times[-1] in states:
+            states[times[-1]] = initial_state(times[-1])
+        for index in range(len(times) - 1, 0, -1):
+            states[times[index - 1]] = next_state(states[times[index]], times[index])
+        return states[t]
+
     def derivn(self, equation, order, t):
         """
         nth derivative of an equation
@@ -271,112 +325,73 @@ class SDModel():
         :param t: current t
         :return:
         """
-        memo = {}
+        if order < 1:
+            raise ValueError("DERIVN requires an order of at least 1, got {}".format(order))
         dt = 0.25
+        memo = self.builtin_state(("derivn", equation)) # {(n, t): value}, shared by the calls of all orders
+
+        def derivative(n, t):
+            if not (n, t) in memo:
+                if t <= self.starttime:
+                    memo[(n, t)] = 0
+                elif n == 1:
+                    memo[(n, t)] = (self.memoize(equation, t) - self.memoize(equation, t - dt)) / dt
+                else:
+                    memo[(n, t)] = (derivative(n - 1, t) - derivative(n - 1, t - dt)) / dt
+            return memo[(n, t)]
 
-        def mem(eq, t):
-            """
-            Memo for internal equations
-            :param eq:
-            :param t:
-            :return:
-            """
-            if not eq in memo.keys(): memo[eq] = {}
-            mymemo = memo[eq]
-            if t in mymemo.keys(): return mymemo[t]
-            else:
-                mymemo[t] = s[eq](t)
-                return mymemo[t]
-
-        s = {}
-        s[1] = lambda t: 0 if t <= self.starttime else (self.memoize(equation, t) - self.memoize(equation, t - dt)) / dt
-
-        def addEquation(n):
-            s[n] = lambda t: 0 if t <= self.starttime else (mem(n - 1, t) - mem(n - 1, t - dt)) / dt
-
-        for n in list(range(2, order + 1)): addEquation(n)
-
-        return s[order](t) if ( t >= self.starttime + (dt * order) ) else 0
+        return derivative(order, t) if ( t >= self.starttime + (dt * order) ) else 0
 
-    def smthn(self, inputstream, averaging_time, initial, n, t):
+    def smthn(self, call_site, inputstream, averaging_time, initial, n, t):
         """
-        Pretty complex operator. Actually we are building a whole model here and have it run
+        nth order exponential smooth, also used for the delay builtins. The smooth is a chain of n hidden stocks, which are stepped forward once per timestep and kept per call site
         Find info in https://www.iseesystems.com/resources/help/v1-9/default.htm#08-Reference/07-Builtins/Delay_builtins.htm#kanchor364
+        :param call_site: Key of the call site
         :param inputstream:
-        :param averaging_time:
-        :param initial:
-        :param n:
+        :param averaging_time: Number or function of t
+        :param initial: Number or function of t
+        :param n: Number or function of t
         :param t:
         :return:
         """
-        memo = {}
-        dt = self.dt
-        from copy import deepcopy
+        def initial_state(t):
+            initial_value = self.argument(initial, t)
+            return [max([0, (self.memoize(inputstream, t) if (initial_value is None) else initial_value)])] * int(self.argument(n, t))
+
+        def next_state(stocks, t):
+            order = int(self.argument(n, t))
+            stocks = stocks[:order] + stocks[-1:] * (order - len(stocks))
+            averaging_time_t = self.argument(averaging_time, t)
+            inflow = self.memoize(inputstream, t)
+            result = []
+            for stock in stocks:
+                result.append(stock + self.dt * ((inflow - stock) / (averaging_time_t / order)))
+                inflow = stock
+            return result
+
+        return self.step_state(("smthn", call_site), t, initial_state, next_state)[-1]
+
+    def forcst(self, call_site, inputstream, averaging_time, horizon, initial, t):
+        """
+        Forecast of the input, extrapolated by its trend over the horizon. The average of the input is a hidden stock, which is stepped forward once per timestep and kept per call site
+        :param call_site: Key of the call site
+        :param inputstream:
+        :param averaging_time: Number or function of t
+        :param horizon:
+        :param initial: Initial trend, number or function of t
+        :param t:
+        :return:
+        """
+        def initial_state(t):
+            return self.memoize(inputstream, t) / (1 + self.argument(initial, t) * self.argument(averaging_time, t))
 
-        def mem(eq, t):
-            """
-            Internal memo for equations
-            :param eq:
-            :param t:
-            :return:
-            """
-            if not eq in memo.keys(): memo[eq] = {}
-            mymemo = memo[eq]
-            if t in mymemo.keys():return mymemo[t]
-            else:
-                mymemo[t] = s[eq](t)
-                return mymemo[t]
-
-        s = {}
-
-        def addEquation(n, upper):
-            y = deepcopy(n)
-            if y == 1:
-                s["stock1"] = lambda t: (
-                    (max([0, (self.memoize(inputstream, t) if (initial is None) else initial)])) if (
-                                t <= self.starttime) else (
-                                mem('stock1', t - dt) + dt * (mem('changeInStock1', t - dt))))
-                s['changeInStock1'] = lambda t: (self.memoize(inputstream, t) - mem('stock1', t)) / (
-                            averaging_time / upper)
-            if y > 1:
-                s["stock{}".format(y)] = lambda t: (
-                    (max([0, (self.memoize(inputstream, t) if (initial is None) else initial)])) if (t <= self.starttime) else (
-                                mem("stock{}".format(y), t - dt) + dt * (mem('changeInStock{}'.format(y), t - dt))))
-                s['changeInStock{}'.format(y)] = lambda t: (mem("stock{}".format(y - 1), t) - mem("stock{}".format(y),
-                                                                                                  t)) / (averaging_time / upper)
-        n = int(n)
-
-        for i in list(range(0, n + 1)): addEquation(i, n)
-
-        return s['stock{}'.format(n)](t)
-
-    def forcst(self,inputstream, averaging_time, horizon, initial, t):
-        memo = {"change_in_input": {}, "average_input": {}, "trend_in_input": {}, "forecast_input": {}}
-
-        def mem(eq, t):
-            """
-            Internal memo for equations
-            :param eq:
-            :param t:
-            :return:
-            """
-            mymemo = memo[eq]
-            if t in mymemo.keys(): return mymemo[t]
-            else:
-                mymemo[t] = s[eq](t)
-                return mymemo[t]
-
-        s = {
-            "change_in_input": lambda t: max([0, (self.memoize(inputstream,t) - mem('average_input', t)) / averaging_time]),
-            "average_input": lambda t: ((self.memoize(inputstream,t)) if (t <= self.starttime) else (
-                        mem("average_input", t - self.dt) + self.dt * (mem("change_in_input", t - self.dt)))),
-            "trend_in_input": lambda t: (((self.memoize(inputstream,t) - self.memoize('averageInput', t)) / (
-                        self.memoize('averageInput', t) * self.memoize('averagingTime', t))) if (
-                        self.memoize('averageInput', t) > 0.0) else (np.nan)),
-            "forecast_input": lambda t: self.memoize(inputstream,t) * (1.0 + mem("trend_in_input", t) * horizon)
-        }
-
-        return s["forecast_input"](t)
+        def next_state(average, t):
+            return average + self.dt * max([0, (self.memoize(inputstream, t) - average) / self.argument(averaging_time, t)])
+
+        average = self.step_state(("forcst", call_site), t, initial_state, next_state)
+        value = self.memoize(inputstream, t)
+        trend = ((value - average) / (average * self.argument(averaging_time, t))) if (average > 0.0) else (np.nan)
+        return value * (1.0 + trend * horizon)
 
     '''
     Helpers for Dimensions (Arrays)
@@ -10,7 +10,9 @@
 # MIT License
 
 
-from .element import ArrayedEquation, Element
+import numpy as np
+
+from .element import ArrayedEquation, Element, _array_term
 from .element import ElementError
 
 
@@ -36,17 +38,23 @@ class Constant(Element):
 
     @equation.setter
     def equation(self, equation):
+        if isinstance(equation, list):
+            equation = np.asarray(equation, dtype=np.float64)
+
         if not self._handle_arrayed(equation):
             self._equation = equation
             if isinstance(equation, (float, int)):
                 self._function_string = "lambda model, t: {}".format(equation)
+            elif isinstance(equation, np.ndarray):
+                self._function_string = "lambda model, t: {}".format(_array_term(equation))
             elif equation == None:
                 self._equation = None
             else:
                 raise ElementError(
-                    "Constants can only contain floating point values")
+                    "Constants can only contain floating point values or arrays of them")
         else:
             self._equation = None
 
-        self.model.reset_cache()
+        self._equation_changed(self._equation)
+        self.model.invalidate_cache([self.name])
         self.generate_function()
@@ -11,7 +11,9 @@
 
 
 import logging
+from functools import lru_cache
 from .operators import *
+from .operators import _contains_ndarray, _ndarray_shape
 
 import BPTK_Py.config.config as config
 import pandas as pd
@@ -26,6 +28,20 @@ from scipy.stats import norm
 from BPTK_Py.util import timerange
 
 
+@lru_cache(maxsize=16384)
+def _compile_function(function_string):
+    """Compile a function string into a function of (model, t).
+
+    The function only depends on its string, so it is shared by all elements with the same function string, e.g. the elements of models that are cloned for each scenario.
+    """
+    return eval(function_string)
+
+
+def _array_term(value):
+    """Term of a NumPy array value, the array is rebuilt from a list literal when the function is evaluated."""
+    return "np.array({})".format(np.asarray(value, dtype=np.float64).tolist())
+
+
 class Element:
     """Generic element in a SD DSL model.
 
@@ -73,6 +89,8 @@ class Element:
 
     def __getitem__(self, key):
         if(not self.arrayed):
+            if self.shape is not None:
+                return ArrayIndexOperator(self, key)
             raise Exception("Element is not arrayed")
         return self._elements[key]
 
@@ -86,13 +104,69 @@ class Element:
         return "lambda model, t: 0.0"
 
     def generate_function(self):
-        fn = eval(self._function_string)
-        self.model.equations[self.name] = lambda t: fn(self.model, t)
+        """Generate the function of the element from its function string and register it with the model.
+
+        While the model is being built (see Model.build), the function is generated when the model is frozen.
+        """
+        if self.model._defer(self):
+            return
+        fn = _compile_function(self._function_string)
+        self._function = lambda t: fn(self.model, t)
+        self.model.equations[self.name] = self._function
         self.model.memo[self.name] = {}
 
+    def build_function_string(self):
+        """Build the function string from the equation."""
+        equation = _array_term(self.equation) if isinstance(self.equation, np.ndarray) else self.equation
+        self._function_string = "lambda model, t: {}".format(equation)
+
+    def update_function(self):
+        """Rebuild the function string from the equation and generate the function.
+
+        While the model is being built (see Model.build), both are deferred until the model is frozen, so equations that are set several times are only compiled once.
+        """
+        if self.model._defer(self, build=True):
+            return
+        self.build_function_string()
+        self.generate_function()
+
+    def _deferred_function(self, t):
+        # placeholder for the function while the model is being built, evaluating it freezes the model
+        self.model.freeze()
+        return self.model.equations[self.name](t)
+
     def term(self, time="t"):
         return "model.memoize('{}',{})".format(self.name, time)
 
+    @property
+    def shape(self):
+        """
+        Returns the shape of the values of the element if they are NumPy arrays (see setup_array), None for elements with scalar values.
+
+        The shape is resolved from the equation of the element, elements whose values are arrays turn the equations they are used in into arrays. Until an equation of the model introduces array values, all shapes are None without looking at the equations. After that, shapes are resolved on demand and kept until an equation changes.
+        """
+        if not self.model._array_values:
+            return None
+
+        shapes = self.model._shapes
+        if self.name not in shapes:
+            shapes[self.name] = _ndarray_shape(self)
+        return shapes[self.name]
+
+    def _equation_changed(self, equation):
+        """
+        Called when the equation or initial value of the element changes. Records whether it introduces NumPy array values and forgets the shapes resolved so far (see shape).
+        """
+        if not self.model._array_values and _contains_ndarray(equation):
+            self.model._array_values = True
+        self.model._shapes.clear()
+
+    def shape_operands(self):
+        """
+        Returns the operands the shape of the element's values is resolved from (see shape).
+        """
+        return [self._equation]
+
     @property
     def equation(self):
         """
@@ -205,14 +279,16 @@ class Element:
             self._equation = equation
         else:
             self._equation = None
-        self.model.reset_cache()
-        self._function_string = "lambda model, t: {}".format(self.equation)
-        self.generate_function()
+        self._equation_changed(self._equation)
+        self.model.invalidate_cache([self.name])
+        self.update_function()
 
     @property
     def function_string(self):
         """Returns a string representation of the underlying function.
         """
+        if self.model._is_deferred(self):
+            self.model.freeze()
         return self._function_string
 
     @function_string.setter
@@ -256,6 +332,11 @@ class Element:
                         element.model.starttime, element.model.stoptime+dt, dt)}
 
             df = pd.DataFrame(dict)
+        elif self.shape is not None:
+            # one column per entry of the NumPy array values
+            times = timerange(starttime, stoptime+dt, dt)
+            values = np.array([np.broadcast_to(self.model.memoize(self.name, t), self.shape) for t in times])
+            df = pd.DataFrame({"{}{}".format(self.name, list(index)): values[(slice(None),) + index] for index in np.ndindex(*self.shape)}, index=times)
         else:
             try:
                 df = pd.DataFrame({self.name: {t: self.model.memoize(
@@ -396,6 +477,28 @@ class Element:
         from BPTK_Py.visualizations import visualizer
         return visualizer().update_plot_formats(ax)
 
+    def setup_array(self, shape, default_value=0.0):
+        """
+        Makes the value of this element a NumPy array with the given shape at every timestep.
+
+        Unlike setup_vector and setup_matrix, no sub-elements are created: the element has a single equation, element-wise operators, functions and the array functions (arr_sum, dot, ...) are evaluated as NumPy operations on the whole array. Entries are read via element[index].
+
+        Parameters:
+            shape: int | tuple(int) - Shape of the array
+            default_value: float | array-like - The default value or values of the array. Sets the initial value of stocks and the equation of all other elements.
+        """
+        shape = (shape,) if isinstance(shape, int) else tuple(shape)
+        values = np.asarray(default_value, dtype=np.float64)
+        if values.ndim > 0 and values.shape != shape:
+            raise Exception("The passed shape of the array {} does not match the shape of the default values {}.".format(
+                list(shape), list(values.shape)))
+
+        values = np.array(np.broadcast_to(values, shape))
+        if self.type == "Stock":
+            self.initial_value = values
+        else:
+            self.equation = values
+
     def setup_vector(self, size, default_value=0.0, set_stack_equation = False):
         """
         Creates sub-elements for this element.
@@ -36,11 +36,15 @@ class Flow(Element):
     def equation(self, equation):
         if not self._handle_arrayed(equation):
             self._equation = equation
-        self.model.reset_cache()
-        self.build_function_string()
-        self.generate_function()
+        self._equation_changed(self._equation)
+        self.model.invalidate_cache([self.name])
+        self.update_function()
 
     def build_function_string(self):
         from .operators import Operator
         right_term = self._equation.term("t-model.dt") if type(self._equation) is Operator else self._equation
-        self._function_string = "lambda model, t : max( {},{})".format(0,right_term) # A flow never gets negative
+        if self.shape is not None:
+            # flows whose values are NumPy arrays are clipped element-wise
+            self._function_string = "lambda model, t : np.maximum( {},{})".format(0,right_term)
+        else:
+            self._function_string = "lambda model, t : max( {},{})".format(0,right_term) # A flow never gets negative
@@ -8,6 +8,8 @@
 #
 # Copyright (c) 2018 transentis labs GmbH
 # MIT License
+import numpy as np
+
 import BPTK_Py.sddsl.element
 
 
@@ -53,6 +55,37 @@ class OperatorError(Exception):
         return repr(self.value)
 
 
+def render_term(parts):
+    """
+        Renders the parts of a term (see Operator.term_parts) into a string.
+
+        Parts are strings or (operand, time) pairs. Operands that are operators with term parts are expanded in place, all other operands render via their term method (numbers via str). The tree is walked with an explicit stack and the strings are joined once, so rendering is linear in the size of the term and deeply nested equations (e.g. sums over many elements) do not exceed the recursion limit.
+    """
+    rendered = []
+    stack = list(reversed(parts))
+    while stack:
+        part = stack.pop()
+        if isinstance(part, str):
+            rendered.append(part)
+            continue
+        operand, time = part
+        operand_parts = operand.term_parts(time) if isinstance(operand, Operator) else None
+        if operand_parts is not None:
+            stack.extend(reversed(operand_parts))
+        elif hasattr(operand, "term"):
+            rendered.append(operand.term(time))
+        else:
+            rendered.append(str(operand))
+    return "".join(rendered)
+
+
+def _extracted(obj, time):
+    """
+        Term part of an operand that is rendered like extractTerm followed by str: operators at the given time, all other operands (e.g. elements) via str.
+    """
+    return (obj, time) if isinstance(obj, Operator) else str(obj)
+
+
 class Operator:
     """
         Genereric SD DSL Operator
@@ -63,7 +96,17 @@ class Operator:
         self.index = None
 
     def term(self, time="t"):
-        pass
+        """
+            Returns the term as a Python expression, rendered from the term parts. Operators without term parts override this method.
+        """
+        parts = self.term_parts(time)
+        return None if parts is None else render_term(parts)
+
+    def term_parts(self, time="t"):
+        """
+            Returns the term as a list of parts: strings and (operand, time) pairs for the sub-terms (see render_term), or None if the operator renders its term directly.
+        """
+        return None
 
     def arrayed_term(self, index, time="t"):
         """
@@ -105,6 +148,26 @@ class Operator:
         """
         return False
 
+    def operands(self):
+        """
+            Returns the operands of the operator: elements, operators and values.
+        """
+        operands = []
+        for value in vars(self).values():
+            if isinstance(value, (list, tuple)):
+                operands += [operand for operand in value if isinstance(operand, (Operator, BPTK_Py.sddsl.element.Element, np.ndarray))]
+            elif isinstance(value, (Operator, BPTK_Py.sddsl.element.Element, np.ndarray)):
+                operands.append(value)
+        return operands
+
+    def ndarray_shape(self):
+        """
+            Returns the shape of the value of the operator if it is a NumPy array (see Element.setup_array), None if the value is a scalar.
+
+            By default the shapes of all operands are broadcast, as the operators and functions that are rendered into the term operate element-wise on NumPy arrays.
+        """
+        return _ndarray_shape(*self.operands())
+
     def index_to_string(self, index):
         """
             This function returns the name of the index of an operator. This will be equal to the index in not named vectors and matrices.
@@ -179,8 +242,65 @@ class Function(Operator):
     Generic SD DSL function.
     """
 
-    def term(self, time="t"):
-        super().__init__()
+
+def _ndarray_shape(*operands):
+    """
+        Helper function returns the broadcast shape of the values of the operands if any of them is a NumPy array (see Element.setup_array), None if all values are scalars.
+
+        Elements resolve the shape of their equation, operators that keep the default shape resolution are expanded in place. The operands are walked with an explicit stack, so deeply nested equations do not exceed the recursion limit, and elements are only visited once. The walk stops at elements of models without array values and at elements whose shape is already known (see Element.shape).
+    """
+    shapes = []
+    visited = set()
+    stack = list(operands)
+    while stack:
+        operand = stack.pop()
+        if isinstance(operand, np.ndarray):
+            shapes.append(operand.shape)
+        elif isinstance(operand, BPTK_Py.sddsl.element.Element):
+            if id(operand) not in visited and not operand.arrayed and operand.model._array_values:
+                visited.add(id(operand))
+                if operand.name in operand.model._shapes:
+                    # shapes that were resolved since the last change of an equation are complete
+                    if operand.model._shapes[operand.name] is not None:
+                        shapes.append(operand.model._shapes[operand.name])
+                else:
+                    stack.extend(operand.shape_operands())
+        elif isinstance(operand, Operator):
+            if type(operand).ndarray_shape is Operator.ndarray_shape:
+                stack.extend(operand.operands())
+            else:
+                shape = operand.ndarray_shape()
+                if shape is not None:
+                    shapes.append(shape)
+        elif isinstance(operand, (list, tuple)):
+            stack.extend(operand)
+
+    if not shapes:
+        return None
+    return tuple(np.broadcast_shapes(*shapes))
+
+
+def _contains_ndarray(equation):
+    """
+        Helper function returns true if an equation contains a NumPy array value. Only the equation itself is searched, not the equations of the elements it refers to.
+    """
+    stack = [equation]
+    while stack:
+        value = stack.pop()
+        if isinstance(value, np.ndarray):
+            return True
+        if isinstance(value, Operator):
+            stack.extend(value.operands())
+        elif isinstance(value, (list, tuple)):
+            stack.extend(value)
+    return False
+
+
+def _is_ndarray(*operands):
+    """
+        Helper function returns true if the value of any of the operands is a NumPy array.
+    """
+    return any(_ndarray_shape(operand) is not None for operand in operands)
 
 
 def _get_element_dimensions(element):
@@ -250,6 +370,35 @@ def _matrix_element_to_string(element, time, flat=False):
     return "[" + rec_resolve(element, 0) + "]"
 
 
+def _ndarray_term(element, time):
+    """
+    Term of an element or operator whose value is a NumPy array.
+    """
+    return render_term([(element, time)])
+
+
+class ArrayIndexOperator(Operator):
+    """
+    Returns the entry or sub-array at the given index of a NumPy array value.
+    Example: [[1,2],[3,4]][1] => [3,4]
+    """
+
+    def __init__(self, element, key):
+        super().__init__()
+        self.element = element
+        self.key = key
+
+    def ndarray_shape(self):
+        shape = _ndarray_shape(self.element)
+        if shape is None:
+            raise OperatorError("Only NumPy array values can be indexed")
+        shape = np.broadcast_to(0.0, shape)[self.key].shape
+        return tuple(shape) if shape else None
+
+    def term_parts(self, time="t"):
+        return ["(", _extracted(self.element, time), ")[{}]".format(repr(self.key))]
+
+
 class ArrayProductOperator(Operator):
     """
     Returns the product of an array (element-wise). 
@@ -261,7 +410,12 @@ class ArrayProductOperator(Operator):
         self.element = element
         self.dimensions = dimensions
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return "np.prod({})".format(_ndarray_term(self.element, time))
         return _array_resolve("*", self.element, time, self.dimensions)
 
     def clone_with_index(self, index):
@@ -282,7 +436,12 @@ class ArraySumOperator(Operator):
         self.element = element
         self.dimensions = dimensions
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return "np.sum({})".format(_ndarray_term(self.element, time))
         return _array_resolve("+", self.element, time, self.dimensions)
 
     def clone_with_index(self, index):
@@ -300,7 +459,12 @@ class ArraySizeOperator(Operator):
         super().__init__()
         self.element = element
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return str(_ndarray_shape(self.element)[0])
         vector_size = self.element._elements.vector_size()
         if vector_size == 0:
             return "0.0"
@@ -323,7 +487,12 @@ class ArrayRankOperator(Operator):
         self.element = element
         self.rank = rank
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return "np.sort({arr}, axis=None)[::-1][({count}-1 if ({rank} < 0 or {rank} > {count}) else {rank}-1)]".format(arr=_ndarray_term(self.element, time), rank=self.rank, count=int(np.prod(_ndarray_shape(self.element))))
         if self.element._elements.vector_size() == 0:
             return "0.0"
 
@@ -350,7 +519,12 @@ class ArrayMeanOperator(Operator):
         super().__init__()
         self.element = element
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return "np.mean({})".format(_ndarray_term(self.element, time))
         if self.element._elements.vector_size() == 0:
             return "0.0"
 
@@ -373,7 +547,12 @@ class ArrayMedianOperator(Operator):
         super().__init__()
         self.element = element
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return "np.median({})".format(_ndarray_term(self.element, time))
         if self.element._elements.vector_size() == 0:
             return "0.0"
 
@@ -396,7 +575,12 @@ class ArrayStandardDeviationOperator(Operator):
         super().__init__()
         self.element = element
 
+    def ndarray_shape(self):
+        return None
+
     def term(self, time="t"):
+        if _is_ndarray(self.element):
+            return "np.std({})".format(_ndarray_term(self.element, time))
         if self.element._elements.vector_size() == 0:
             return "0.0"
 
@@ -437,14 +621,20 @@ class BinaryOperator(Operator):
             type(element_2), (int, float)) else element_2
         self.index = index
 
-    def term(self, time="t"):
-        pass
-
     def _is_arrayed(self, element):
         return self.arrayed or (isinstance(element, BPTK_Py.sddsl.element.Element) and element._elements.vector_size() > 0) or (isinstance(element, Operator) and element.is_any_subelement_arrayed())
 
     def is_any_subelement_arrayed(self):
-        return self._is_arrayed(self.element_1) or self._is_arrayed(self.element_2)
+        # nested binary operators are walked with a stack, deeply nested equations would exceed the recursion limit
+        operators = [self]
+        while operators:
+            operator = operators.pop()
+            for element in [operator.element_1, operator.element_2]:
+                if isinstance(element, BinaryOperator) and not operator.arrayed:
+                    operators.append(element)
+                elif operator._is_arrayed(element):
+                    return True
+        return False
 
 
 class UnaryOperator(Operator):
@@ -456,11 +646,11 @@ class UnaryOperator(Operator):
         super().__init__(arrayed)
         self.element = element
 
-    def term(self, time="t"):
+    def term_parts(self, time="t"):
         if isinstance(self.element, (float, int)):
-            return str(self.element)
+            return [str(self.element)]
         else:
-            return self.element.term(time)
+            return [(self.element, time)]
 
 
 class PowerOperator(Operator):
@@ -469,12 +659,8 @@ class PowerOperator(Operator):
         self.element = element
         self.power = power
 
-    def term(self, time="t"):
-
-        element = extractTerm(self.element, time)
-        power = extractTerm(self.power, time)
-
-        return "({} ** {} )".format(element, power)
+    def term_parts(self, time="t"):
+        return ["(", _extracted(self.element, time), " ** ", _extracted(self.power, time), " )"]
 
 
 class ComparisonOperator(BinaryOperator):
@@ -486,10 +672,8 @@ class ComparisonOperator(BinaryOperator):
         self.sign = sign
         super().__init__(element_1, element_2)
 
-    def term(self, time="t"):
-        element_1 = extractTerm(self.element_1, time)
-        element_2 = extractTerm(self.element_2, time)
-        return str(element_1) + "{}".format(self.sign) + str(element_2)
+    def term_parts(self, time="t"):
+        return [_extracted(self.element_1, time), self.sign, _extracted(self.element_2, time)]
 
     def resolve_dimensions(self):
         return -1
@@ -502,60 +686,53 @@ class NaryOperator(Operator):
         self.name = name
         self.args = args
 
-    def term(self,  time="t"):
-        fn_str = "model.fn['{}'](model, {}".format(self.name, time)
-
-        num_args = len(self.args)
+    def term_parts(self,  time="t"):
+        parts = ["model.fn['{}'](model, {}".format(self.name, time)]
 
-        if num_args:
-            fn_str += ","
-
-        count = 0
         for arg in self.args:
-            fn_str += str(arg)
-            count += 1
-            if count < num_args:
-                fn_str += ","
+            parts += [",", _extracted(arg, "t")]
 
-        fn_str += ")"
+        parts.append(")")
 
-        return fn_str
+        return parts
 
 
 class ModOperator(BinaryOperator):
-    def term(self, time="t"):
-        return self.element_1.term(time) + "%" + self.element_2.term(time)
+    def term_parts(self, time="t"):
+        return [(self.element_1, time), "%", (self.element_2, time)]
 
 
 class AdditionOperator(BinaryOperator):
-    def term(self, time="t"):
+    def term_parts(self, time="t"):
         if self.arrayed:
-            if self.index == None:  # Can not resolve arrayed equations without index
-                return "0.0"
+            return [self._arrayed_term(time)]
+        return [(self.element_1, time), "+", (self.element_2, time)]
 
-            el1_arrayed = isinstance(
-                self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
-            el2_arrayed = isinstance(
-                self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+    def _arrayed_term(self, time):
+        if self.index == None:  # Can not resolve arrayed equations without index
+            return "0.0"
 
-            if(el1_arrayed):
-                cur_el1 = self.element_1
-                for i in self.index:
-                    cur_el1 = cur_el1[i]
-                if(el2_arrayed):
-                    cur_el2 = self.element_2
-                    for i in self.index:
-                        cur_el2 = cur_el2[i]
-                    return "{} + {}".format(cur_el1.term(time), cur_el2.term(time))
-                else:
-                    return "{} + {}".format(cur_el1.term(time), self.element_2.term(time))
-            elif(el2_arrayed):
+        el1_arrayed = isinstance(
+            self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
+        el2_arrayed = isinstance(
+            self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+
+        if(el1_arrayed):
+            cur_el1 = self.element_1
+            for i in self.index:
+                cur_el1 = cur_el1[i]
+            if(el2_arrayed):
                 cur_el2 = self.element_2
                 for i in self.index:
                     cur_el2 = cur_el2[i]
-                return "{} + {}".format(self.element_1.term(time), cur_el2.term(time))
+                return "{} + {}".format(cur_el1.term(time), cur_el2.term(time))
             else:
-                return self.element_1.term(time) + "+" + self.element_2.term(time)
+                return "{} + {}".format(cur_el1.term(time), self.element_2.term(time))
+        elif(el2_arrayed):
+            cur_el2 = self.element_2
+            for i in self.index:
+                cur_el2 = cur_el2[i]
+            return "{} + {}".format(self.element_1.term(time), cur_el2.term(time))
         else:
             return self.element_1.term(time) + "+" + self.element_2.term(time)
 
@@ -601,34 +778,36 @@ class AdditionOperator(BinaryOperator):
 
 class SubtractionOperator(BinaryOperator):
     #TODO implement for named arrays - float and float - named arrays 
-    def term(self, time="t"):
+    def term_parts(self, time="t"):
         if self.arrayed:
-            if self.index == None:  # Can not resolve arrayed equations without index
-                return "0.0"
+            return [self._arrayed_term(time)]
+        return [(self.element_1, time), "-", (self.element_2, time)]
 
-            el1_arrayed = isinstance(
-                self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
-            el2_arrayed = isinstance(
-                self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+    def _arrayed_term(self, time):
+        if self.index == None:  # Can not resolve arrayed equations without index
+            return "0.0"
 
-            if(el1_arrayed):
-                cur_el1 = self.element_1
-                for i in self.index:
-                    cur_el1 = cur_el1[i]
-                if(el2_arrayed):
-                    cur_el2 = self.element_2
-                    for i in self.index:
-                        cur_el2 = cur_el2[i]
-                    return "{} - {}".format(cur_el1.term(time), cur_el2.term(time))
-                else:
-                    return "{} - {}".format(cur_el1.term(time), self.element_2.term(time))
-            elif(el2_arrayed):
+        el1_arrayed = isinstance(
+            self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
+        el2_arrayed = isinstance(
+            self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+
+        if(el1_arrayed):
+            cur_el1 = self.element_1
+            for i in self.index:
+                cur_el1 = cur_el1[i]
+            if(el2_arrayed):
                 cur_el2 = self.element_2
                 for i in self.index:
                     cur_el2 = cur_el2[i]
-                return "{} - {}".format(self.element_1.term(time), cur_el2.term(time))
+                return "{} - {}".format(cur_el1.term(time), cur_el2.term(time))
             else:
-                return self.element_1.term(time) + "-" + self.element_2.term(time)
+                return "{} - {}".format(cur_el1.term(time), self.element_2.term(time))
+        elif(el2_arrayed):
+            cur_el2 = self.element_2
+            for i in self.index:
+                cur_el2 = cur_el2[i]
+            return "{} - {}".format(self.element_1.term(time), cur_el2.term(time))
         else:
             return self.element_1.term(time) + "-" + self.element_2.term(time)
 
@@ -672,34 +851,36 @@ class SubtractionOperator(BinaryOperator):
         return (e1_named or e2_named)
 
 class DivisionOperator(BinaryOperator):
-    def term(self, time="t"):
+    def term_parts(self, time="t"):
         if self.arrayed:
-            if self.index == None:  # Can not resolve arrayed equations without index
-                return "0.0"
+            return [self._arrayed_term(time)]
+        return ["(", (self.element_1, time), ") / (", (self.element_2, time), ")"]
 
-            el1_arrayed = isinstance(
-                self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
-            el2_arrayed = isinstance(
-                self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+    def _arrayed_term(self, time):
+        if self.index == None:  # Can not resolve arrayed equations without index
+            return "0.0"
 
-            if(el1_arrayed):
-                cur_el1 = self.element_1
-                for i in self.index:
-                    cur_el1 = cur_el1[i]
-                if(el2_arrayed):
-                    cur_el2 = self.element_2
-                    for i in self.index:
-                        cur_el2 = cur_el2[i]
-                    return "({}) / ({})".format(cur_el1.term(time), cur_el2.term(time))
-                else:
-                    return "({}) / ({})".format(cur_el1.term(time), self.element_2.term(time))
-            elif(el2_arrayed):
+        el1_arrayed = isinstance(
+            self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
+        el2_arrayed = isinstance(
+            self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+
+        if(el1_arrayed):
+            cur_el1 = self.element_1
+            for i in self.index:
+                cur_el1 = cur_el1[i]
+            if(el2_arrayed):
                 cur_el2 = self.element_2
                 for i in self.index:
                     cur_el2 = cur_el2[i]
-                return "({}) / ({})".format(self.element_1.term(time), cur_el2.term(time))
+                return "({}) / ({})".format(cur_el1.term(time), cur_el2.term(time))
             else:
-                return "(" + self.element_1.term(time) + ") / (" + self.element_2.term(time) + ")"
+                return "({}) / ({})".format(cur_el1.term(time), self.element_2.term(time))
+        elif(el2_arrayed):
+            cur_el2 = self.element_2
+            for i in self.index:
+                cur_el2 = cur_el2[i]
+            return "({}) / ({})".format(self.element_1.term(time), cur_el2.term(time))
         else:
             return "(" + self.element_1.term(time) + ") / (" + self.element_2.term(time) + ")"
 
@@ -743,22 +924,24 @@ class DivisionOperator(BinaryOperator):
         return (e1_named or e2_named)
     
 class NumericalMultiplicationOperator(BinaryOperator):
-    def term(self, time="t"):
+    def term_parts(self, time="t"):
         if self.arrayed:
-            if self.index == None:  # Can not resolve arrayed equations without index
-                return "0.0"
+            return [self._arrayed_term(time)]
+        return ["(", (self.element_2, "t"), ") * (", (self.element_1, time), ")"]
+
+    def _arrayed_term(self, time):
+        if self.index == None:  # Can not resolve arrayed equations without index
+            return "0.0"
 
-            self.el1_arrayed = isinstance(
-                self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
+        self.el1_arrayed = isinstance(
+            self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
 
-            if(self.el1_arrayed):
-                cur_el1 = self.element_1
-                for i in self.index:
-                    cur_el1 = cur_el1[i]
-                return "({}) * ({})".format(str(self.element_2), cur_el1.term(time))
+        if(self.el1_arrayed):
+            cur_el1 = self.element_1
+            for i in self.index:
+                cur_el1 = cur_el1[i]
+            return "({}) * ({})".format(str(self.element_2), cur_el1.term(time))
 
-            else:
-                return "(" + str(self.element_2) + ") * (" + self.element_1.term(time) + ")"
         else:
             return "(" + str(self.element_2) + ") * (" + self.element_1.term(time) + ")"
 
@@ -805,34 +988,36 @@ class NumericalMultiplicationOperator(BinaryOperator):
             return False
 
 class MultiplicationOperator(BinaryOperator):
-    def term(self, time="t"):
+    def term_parts(self, time="t"):
         if self.arrayed:
-            if self.index == None:  # Can not resolve arrayed equations without index
-                return "0.0"
+            return [self._arrayed_term(time)]
+        return ["(", (self.element_1, time), ") * (", (self.element_2, time), ")"]
 
-            el1_arrayed = isinstance(
-                self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
-            el2_arrayed = isinstance(
-                self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+    def _arrayed_term(self, time):
+        if self.index == None:  # Can not resolve arrayed equations without index
+            return "0.0"
 
-            if(el1_arrayed):
-                cur_el1 = self.element_1
-                for i in self.index:
-                    cur_el1 = cur_el1[i]
-                if(el2_arrayed):
-                    cur_el2 = self.element_2
-                    for i in self.index:
-                        cur_el2 = cur_el2[i]
-                    return "({}) * ({})".format(cur_el1.term(time), cur_el2.term(time))
-                else:
-                    return "({}) * ({})".format(cur_el1.term(time), self.element_2.term(time))
-            elif(el2_arrayed):
+        el1_arrayed = isinstance(
+            self.element_1, BPTK_Py.sddsl.element.Element) and self.element_1._elements.vector_size()
+        el2_arrayed = isinstance(
+            self.element_2, BPTK_Py.sddsl.element.Element) and self.element_2._elements.vector_size()
+
+        if(el1_arrayed):
+            cur_el1 = self.element_1
+            for i in self.index:
+                cur_el1 = cur_el1[i]
+            if(el2_arrayed):
                 cur_el2 = self.element_2
                 for i in self.index:
                     cur_el2 = cur_el2[i]
-                return "({}) * ({})".format(self.element_1.term(time), cur_el2.term(time))
+                return "({}) * ({})".format(cur_el1.term(time), cur_el2.term(time))
             else:
-                return "(" + self.element_1.term(time) + ") * (" + self.element_2.term(time) + ")"
+                return "({}) * ({})".format(cur_el1.term(time), self.element_2.term(time))
+        elif(el2_arrayed):
+            cur_el2 = self.element_2
+            for i in self.index:
+                cur_el2 = cur_el2[i]
+            return "({}) * ({})".format(self.element_1.term(time), cur_el2.term(time))
         else:
             return "(" + self.element_1.term(time) + ") * (" + self.element_2.term(time) + ")"
 
@@ -935,6 +1120,9 @@ class DotOperator(BinaryOperator):
             if isinstance(element, Operator):
                 return element.arrayed_term(index, time)
 
+        if self.index == None and _is_ndarray(self.element_1, self.element_2):
+            return "np.dot({}, {})".format(_ndarray_term(self.element_1, time), _ndarray_term(self.element_2, time))
+
         dim1 = _get_element_dimensions(self.element_1)
         dim2 = _get_element_dimensions(self.element_2)
 
@@ -1035,6 +1223,21 @@ class DotOperator(BinaryOperator):
 
         return super().term(time)
 
+    def ndarray_shape(self):
+        """
+            Shape of the dot product of NumPy arrays, following the rules of np.dot.
+        """
+        shape1 = _ndarray_shape(self.element_1)
+        shape2 = _ndarray_shape(self.element_2)
+        if shape1 is None or shape2 is None:
+            return shape1 if shape2 is None else shape2
+
+        inner = shape2[-2] if len(shape2) > 1 else shape2[-1]
+        if shape1[-1] != inner:
+            raise Exception("Attempted invalid dot product (shapes {} and {})".format(list(shape1), list(shape2)))
+        shape = shape1[:-1] + shape2[:-2] + shape2[-1:] if len(shape2) > 1 else shape1[:-1]
+        return shape if shape else None
+
     def resolve_dimensions(self):
         """
             Resolving multiplication dimensions is more complex than other resolves.
@@ -1116,20 +1319,24 @@ class AbsOperator(UnaryOperator):
     Abs Function
     """
 
-    def term(self, time="t"):
-        return "abs("+self.element.term(time)+")"
+    def term_parts(self, time="t"):
+        return ["abs(", (self.element, time), ")"]
 
 
 class MaxOperator(BinaryOperator):
 
-    def term(self, time="t"):
-        return "max( " + self.element_1.term(time)+", " + self.element_2.term(time)+")"
+    def term_parts(self, time="t"):
+        if _is_ndarray(self.element_1, self.element_2):
+            return ["np.maximum( ", (self.element_1, time), ", ", (self.element_2, time), ")"]
+        return ["max( ", (self.element_1, time), ", ", (self.element_2, time), ")"]
 
 
 class MinOperator(BinaryOperator):
 
-    def term(self, time="t"):
-        return "min( " + self.element_1.term(time)+", " + self.element_2.term(time)+")"
+    def term_parts(self, time="t"):
+        if _is_ndarray(self.element_1, self.element_2):
+            return ["np.minimum( ", (self.element_1, time), ", ", (self.element_2, time), ")"]
+        return ["min( ", (self.element_1, time), ", ", (self.element_2, time), ")"]
 
 
 class Exp(UnaryOperator):
@@ -1137,8 +1344,8 @@ class Exp(UnaryOperator):
     Exp Function
     """
 
-    def term(self, time="t"):
-        return "np.exp("+self.element.term(time)+")"
+    def term_parts(self, time="t"):
+        return ["np.exp(", (self.element, time), ")"]
 
 
 class DT(Function):
@@ -1323,8 +1530,8 @@ class Round(Function):
         self.operator = operator
         self.digits = digits
 
-    def term(self, time="t"):
-        return "(round( {}, {} ) )".format(extractTerm(self.operator, time), extractTerm(self.digits, time))
+    def term_parts(self, time="t"):
+        return ["(round( ", _extracted(self.operator, time), ", ", _extracted(self.digits, time), " ) )"]
 
 
 class If(Function):
@@ -1333,11 +1540,10 @@ class If(Function):
         self.then_ = then_
         self.else_ = else_
 
-    def term(self, time="t"):
-        if_ = extractTerm(self.if_, time)
-        then_ = extractTerm(self.then_, time)
-        else_ = extractTerm(self.else_, time)
-        return "( ({}) if ({}) else ({})  )".format(then_, if_, else_)
+    def term_parts(self, time="t"):
+        if _is_ndarray(self.if_, self.then_, self.else_):
+            return ["np.where( ", _extracted(self.if_, time), ", ", _extracted(self.then_, time), ", ", _extracted(self.else_, time), ")"]
+        return ["( (", _extracted(self.then_, time), ") if (", _extracted(self.if_, time), ") else (", _extracted(self.else_, time), ")  )"]
 
 
 class And(Function):
@@ -1345,11 +1551,10 @@ class And(Function):
         self.lhs = lhs
         self.rhs = rhs
 
-    def term(self, time="t"):
-        lhs = extractTerm(self.lhs, time)
-        rhs = extractTerm(self.rhs, time)
-
-        return "( ({}) and ({}) )".format(lhs, rhs)
+    def term_parts(self, time="t"):
+        if _is_ndarray(self.lhs, self.rhs):
+            return ["np.logical_and( ", _extracted(self.lhs, time), ", ", _extracted(self.rhs, time), ")"]
+        return ["( (", _extracted(self.lhs, time), ") and (", _extracted(self.rhs, time), ") )"]
 
 
 class Or(Function):
@@ -1357,21 +1562,20 @@ class Or(Function):
         self.lhs = lhs
         self.rhs = rhs
 
-    def term(self, time="t"):
-        lhs = extractTerm(self.lhs, time)
-        rhs = extractTerm(self.rhs, time)
-
-        return "( ({}) or ({}) )".format(lhs, rhs)
+    def term_parts(self, time="t"):
+        if _is_ndarray(self.lhs, self.rhs):
+            return ["np.logical_or( ", _extracted(self.lhs, time), ", ", _extracted(self.rhs, time), ")"]
+        return ["( (", _extracted(self.lhs, time), ") or (", _extracted(self.rhs, time), ") )"]
 
 
 class Not(Function):
     def __init__(self, condition):
         self.condition = condition
 
-    def term(self, time="t"):
-        condition = extractTerm(self.condition, time)
-
-        return "( not ({}) )".format(condition)
+    def term_parts(self, time="t"):
+        if _is_ndarray(self.condition):
+            return ["np.logical_not( ", _extracted(self.condition, time), ")"]
+        return ["( not (", _extracted(self.condition, time), ") )"]
 
 
 class Nan(Function):
@@ -10,7 +10,9 @@
 # MIT License
 
 
-from .element import ArrayedEquation, Element
+import numpy as np
+
+from .element import ArrayedEquation, Element, _array_term
 from .element import ElementError
 from .constant import Constant
 from .converter import Converter
@@ -35,13 +37,17 @@ class Stock(Element):
 
     @initial_value.setter
     def initial_value(self, initial_value):
-        if isinstance(initial_value, (float, Constant, Converter)):
+        if isinstance(initial_value, list):
+            initial_value = np.asarray(initial_value, dtype=np.float64)
+
+        if isinstance(initial_value, (float, Constant, Converter, np.ndarray)):
             self.__initial_value = initial_value
-            self.build_function_string()
-            self.generate_function()
+            self._equation_changed(initial_value)
+            self.model.invalidate_cache([self.name])
+            self.update_function()
         else:
             raise ElementError(
-                "Initial values must be floating point values, constants or converters")
+                "Initial values must be floating point values, arrays of them, constants or converters")
 
     def add_arr_equation(self, name, value):
         s = self.model.stock(self.name + "[" + name + "]")
@@ -61,13 +67,17 @@ class Stock(Element):
     def equation(self, equation):
         if not self._handle_arrayed(equation):
             self._equation = equation
-        self.model.reset_cache()
-        self.build_function_string()
-        self.generate_function()
+        self._equation_changed(self._equation)
+        self.model.invalidate_cache([self.name])
+        self.update_function()
+
+    def shape_operands(self):
+        return [self.__initial_value, self._equation]
 
     def build_function_string(self):
+        initial_value = _array_term(self.__initial_value) if isinstance(self.__initial_value, np.ndarray) else self.__initial_value
         start_string = "lambda model, t : ( ("
-        start_string += str(self.__initial_value) + \
+        start_string += str(initial_value) + \
             ") if (t <= model.starttime) else (model.memoize('{}',t-model.dt))".format(self.name)
 
         if self.equation is not None:
@@ -75,6 +85,9 @@ class Stock(Element):
             if isinstance(self._equation, (float, int)):
                 self._function_string = start_string + \
                     str(self._equation) + ") )"
+            elif isinstance(self._equation, np.ndarray):
+                self._function_string = start_string + \
+                    _array_term(self._equation) + ") )"
             else:
                 self._function_string = start_string + \
                     self._equation.term("t-model.dt") + ") )"
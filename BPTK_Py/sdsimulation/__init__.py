@@ -1 +1,2 @@
-from .sd_simulation import SdSimulation
\ No newline at end of file
+from .sd_simulation import SdSimulation
+from .ensemble import Ensemble, run_ensemble
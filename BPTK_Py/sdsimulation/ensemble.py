@@ -0,0 +1,150 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+
+import numpy as np
+import pandas as pd
+
+from ..logger import log
+from ..modeling.forwardStepper import ForwardStepper
+from ..modeling.stepCompiler import vector_max, vector_min
+from ..modeling.model import Model
+from ..util import timerange
+
+
+class Ensemble():
+    """
+    Runs an ensemble of parameter sets of one SD model (SD DSL or XMILE).
+
+    The constants given in the parameter table are set to NumPy vectors holding the values of all members, so every equation is evaluated once per timestep for all members via broadcasting. SD DSL models are evaluated via a compiled step function in which max and min compare element-wise. If an equation cannot be evaluated for vectors (e.g. a condition that depends on a constant), the members are run one by one instead.
+
+    Random functions draw one value per timestep that is shared by all members of a vectorized run.
+    The model's equations and memo are restored after the run.
+    """
+
+    def __init__(self, model, parameters, equations):
+        """
+        :param model: the model object (Model or XMILE simulation_model)
+        :param parameters: DataFrame or dict with one column per constant and one row per member
+        :param equations: names of the equations to return
+        """
+        self.model = model
+        self.parameters = pd.DataFrame(parameters)
+        self.equations = list(equations)
+        self.size = len(self.parameters)
+        self.times = timerange(model.starttime, model.stoptime, model.dt, exclusive=False)
+        self.values = {}
+
+        for constant in self.parameters.columns:
+            if constant not in model.equations:
+                log("[ERROR] Ensemble: Model has no equation {}".format(constant))
+
+    def run(self):
+        """
+        Run all members of the ensemble
+        :return: float64 array of shape (members x timesteps x equations)
+        """
+        model = self.model
+        equations = dict(model.equations)
+        memo = model.memo
+
+        try:
+            try:
+                return self.__run_vectorized()
+            except (TypeError, ValueError) as e:
+                log("[WARN] Ensemble: Model {} cannot be evaluated for all members at once ({}), running members one by one".format(getattr(model, "name", ""), str(e)))
+                model.equations.clear()
+                model.equations.update(equations)
+                return self.__run_members()
+        finally:
+            model.equations.clear()
+            model.equations.update(equations)
+            model.memo = memo
+
+    def __set_constants(self, values):
+        """
+        Replace the equations of the constants by functions returning the given values. The functions read the values from a dict, so the values can be changed without replacing the equations again
+        :param values: dict constant -> value (number or vector)
+        :return: None
+        """
+        self.values = values
+        for constant in values.keys():
+            if constant in self.model.equations:
+                self.model.equations[constant] = (lambda constant: lambda t: self.values[constant])(constant)
+
+    def __stepper(self, namespace=None):
+        """
+        Forward stepper for SD DSL models, None for XMILE models
+        """
+        if isinstance(self.model, Model):
+            return ForwardStepper(self.model, compiled=True, namespace=namespace)
+        return None
+
+    def __collect(self, stepper, size):
+        """
+        Evaluate the equations for all timesteps
+        :param stepper: ForwardStepper or None
+        :param size: number of members the values are computed for
+        :return: float64 array of shape (timesteps x equations x size)
+        """
+        if stepper is not None:
+            stepper.run()
+
+        result = np.empty((len(self.times), len(self.equations), size), dtype=np.float64)
+
+        for column, t in enumerate(self.times):
+            for row, equation in enumerate(self.equations):
+                result[column, row] = np.broadcast_to(np.asarray(self.model.memoize(equation, t), dtype=np.float64), (size,))
+
+        return result
+
+    def __run_vectorized(self):
+        if isinstance(self.model, Model) and any(element.shape is not None for elements in [self.model.stocks, self.model.flows, self.model.converters, self.model.constants] for element in elements.values()):
+            # the member vectors would be broadcast against the NumPy arrays of arrayed elements
+            raise ValueError("Elements with NumPy array values are evaluated member by member")
+
+        self.__set_constants({constant: self.parameters[constant].to_numpy(dtype=np.float64) for constant in self.parameters.columns})
+        self.model.memo = {equation: {} for equation in self.model.equations}
+
+        result = self.__collect(self.__stepper(namespace={"max": vector_max, "min": vector_min}), self.size)
+
+        return np.ascontiguousarray(result.transpose(2, 0, 1))
+
+    def __run_members(self):
+        result = np.empty((self.size, len(self.times), len(self.equations)), dtype=np.float64)
+
+        self.__set_constants({constant: None for constant in self.parameters.columns})
+        self.model.memo = {equation: {} for equation in self.model.equations}
+        stepper = self.__stepper()
+
+        for member, (_, values) in enumerate(self.parameters.iterrows()):
+            self.values.update(values.to_dict())
+
+            # invalidate the values of the previous member
+            if hasattr(self.model.memo, "reset"):
+                self.model.memo.reset()
+            else:
+                self.model.memo = {equation: {} for equation in self.model.equations}
+
+            result[member] = self.__collect(stepper, 1)[:, :, 0]
+
+        return result
+
+
+def run_ensemble(model, parameters, equations):
+    """
+    Run an ensemble of parameter sets of one SD model in a single pass
+    :param model: the model object (Model or XMILE simulation_model)
+    :param parameters: DataFrame or dict with one column per constant and one row per member
+    :param equations: names of the equations to return
+    :return: float64 array of shape (members x timesteps x equations)
+    """
+    return Ensemble(model, parameters, equations).run()
@@ -12,14 +12,13 @@
 
 import datetime
 import os
-from threading import Thread
 
 import numpy as np
 import pandas as pd
 
 from ..logger import log
 
-from ..util import timerange
+from ..util import timerange, compile_constant, compile_points
 
 class SdSimulation():
     """Wraps the SimulationModel (XMILE) or Model (SD DSL) class and applies the scenario to it. 
@@ -41,11 +40,10 @@ class SdSimulation():
         self.starttime = self.mod.starttime
         self.dt = self.mod.dt
 
-        # self.results will store the results. Structure is a dict of a dict:
-        # { 'equation' : {0 : result, 1 : result ... t: result }
+        # self.results will store the results. Structure is a dict of columns, one value per timestep in self.times:
+        # { 'equation' : [result, result ... result] }
         self.results = {}
-
-        self.threads = []  # List of threads for the simulations
+        self.times = []
 
         # Setting a None object for my result_frame.
         self.result_frame = None
@@ -66,8 +64,8 @@ class SdSimulation():
         """
         # ensure all internal variables are initialised (important for run_step)
         self.results={}
+        self.times=[]
         self.result_frame = None
-        self.threads=[]
         self.finished_simulations_count = 0
 
         # Take Values from model if not given
@@ -80,8 +78,6 @@ class SdSimulation():
                     self.name))
             return None
 
-        ### Store the simulation threads in a list
-        self.threads = []
         log("[INFO] Starting simulation of model {}. starttime={}, stoptime={}".format(self.name, str(start),
                                                                                        str(until)))
 
@@ -90,17 +86,20 @@ class SdSimulation():
 
         log("[INFO] {}: Starting {} simulations".format(self.name, (until - start) * len(equations)))
 
-        # Starting the simulations equation-wise
-        self.__simulate_equations(start=start, until=until, equations=equations)
+        # Models using the forward or compiled engine compute all equations in one pass, the simulations below then only read the results
+        if getattr(self.mod, "engine", "memo") in ["forward", "compiled"]:
+            self.mod.run_forward(until=until, equations=equations)
+        elif hasattr(self.mod, "prepare_run"):
+            # time-invariant equations are evaluated once, time-only equations for all timesteps at once
+            self.mod.prepare_run(until)
 
-        # Waiting for the simulation threads to finish before I continue
-        for thread in self.threads:  #
-            thread.join()
+        # Simulating all equations in one pass through time
+        self.__simulate_equations(start=start, until=until, equations=equations)
 
         ## Results stored in a dataFrame in case the user decided to
 
         if not output is None:
-            self.result_frame = pd.DataFrame(self.results)
+            self.result_frame = pd.DataFrame(self.results, index=self.times if self.results else None)
             self.result_frame.index.name = "t"
 
             ## If you supplied "csv", I will output a CSV file with all results
@@ -114,52 +113,38 @@ class SdSimulation():
 
     def __simulate_equations(self, start=0, until=0, equations=[]):
         """
-        Private method that coordinates the equation simulation
+        Private method that simulates the equations in a single pass: time is advanced once and the results of all equations are recorded per timestep into preallocated columns
         :param start: the model's start time (usually t=1)
         :param until: the model's stop time
         :param equations: equation(s) to simulate
         :return: None
         """
-        
-        # TODO: does it make sense to run this in separate threads - in most cases the equations will be inderdependent. Do some performance tests.
-        for equation in equations:  # Start one thread for each equation
-            t = Thread(target=self.__simulate, args=(equation, until, start))
-            t.start()
-            self.threads += [t]
-
-    ## Actual Simulation. Simply call the equation in the simulation model!
-    def __simulate(self, equation, until, start):
-        """
-        This method runs as a thread and simulates
-        :param equation: equation to simulate
-        :param until: stoptime
-        :param start: starttime
-        :return:
-        """
+        self.times = timerange(start, until+self.mod.dt, self.mod.dt)
 
-        ## To avoid tail-recursion, start at 0 and use memoization to store the results and build results from the bottom
-        for i in timerange(start, until+self.mod.dt, self.mod.dt):
-            try:
-                result = self.mod.equation(equation, i)
-            except KeyError:
-                log("[WARN] Unable to simulate equation \"{}\". Doesn't seem like it's part of the model.".format(equation))
+        # columns are None until a result is recorded, the DataFrame infers their types (and turns None into NaN)
+        columns = {equation: [None] * len(self.times) for equation in equations}
+        simulated = list(columns.keys())
 
-                break
-                pass
-
-            if "*" in equation: # Fix for *: compute the sum
-                result = sum(result)
-
-            if not equation in self.results.keys():
-                self.results[equation] = {}
-            dic_t = self.results[equation]
-
-            ## For the current t, set the value to my result!
-            ## On parsing, Pandas will use the structure to automatically set the index.
-            dic_t[i] = result
-
-        self.finished_simulations_count += 1
-        log("[INFO] Finished simulation of stock {} for t={} to {}".format(str(equation), str(start), str(until)))
+        ## To avoid tail-recursion, start at 0 and use memoization to store the results and build results from the bottom
+        for step, t in enumerate(self.times):
+            for equation in list(simulated):
+                try:
+                    result = self.mod.equation(equation, t)
+                except KeyError:
+                    log("[WARN] Unable to simulate equation \"{}\". Doesn't seem like it's part of the model.".format(equation))
+                    simulated.remove(equation)
+                    if step == 0:
+                        del columns[equation]
+                    continue
+
+                if "*" in equation: # Fix for *: compute the sum
+                    result = sum(result)
+
+                columns[equation][step] = result
+
+        self.results = columns
+        self.finished_simulations_count = len(simulated)
+        log("[INFO] Finished simulation of equations {} for t={} to {}".format(", ".join(simulated), str(start), str(until)))
 
     def __write_results_to_csv(self, df):
         """
@@ -181,9 +166,13 @@ class SdSimulation():
         :return: None
         """
 
-        # Store numeric values
+        # Store numeric values, compiled once into a function that returns the bound value
         if not callable(value):
-            self.mod.equations[name] = lambda t: eval(str(value))
+            try:
+                self.mod.equations[name] = compile_constant(value)
+            except ValueError as e:
+                log("[ERROR] {}: {}".format(self.name, str(e)))
+                return
             log("[INFO] {}: Changed constant {} to {}".format(self.name, name, str(value)))
 
         ## Store new lambda methods
@@ -201,10 +190,10 @@ class SdSimulation():
         if name in self.mod.points.keys():
             log("[WARN] Overwriting existing set of points for {}".format(str(name)))
 
-        if type(value) == list:
-            self.mod.points[name] = value
-        else:
-            self.mod.points[name] = eval(str(value))
+        try:
+            self.mod.points[name] = compile_points(value)
+        except ValueError as e:
+            log("[ERROR] {}: {}".format(self.name, str(e)))
 
     def change_runspecs(self,starttime,stoptime,dt):
         """
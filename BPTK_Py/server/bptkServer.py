@@ -381,8 +381,17 @@ class BptkServer(Flask):
             for scenario_manager_name, scenario_manager_data in settings.items():
                 
                 for scenario_name, scenario_settings in scenario_manager_data.items():
-                    self._bptk.reset_scenario_cache(scenario_manager=scenario_manager_name,scenario=scenario_name)
                     scenario = self._bptk.get_scenario(scenario_manager_name,scenario_name)
+                    if any(key in scenario_settings for key in ["runspecs", "properties", "agents"]):
+                        self._bptk.reset_scenario_cache(scenario_manager=scenario_manager_name,scenario=scenario_name)
+                    else:
+                        # only results that depend on changed constants or points need to be recomputed
+                        self._bptk.reset_scenario_cache(
+                            scenario_manager=scenario_manager_name,
+                            scenario=scenario_name,
+                            constants=[name for name, value in scenario_settings.get("constants", {}).items() if scenario.constants.get(name) != value],
+                            points=[name for name, value in scenario_settings.get("points", {}).items() if scenario.points.get(name) != value]
+                        )
                     if "constants" in scenario_settings:
                         constants = scenario_settings["constants"]
                         for constant_name, constant_settings in constants.items():
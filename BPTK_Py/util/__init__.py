@@ -1,4 +1,7 @@
 ## This package contains methods for supporting the execution and would bloat the code unneccessarily
 
 from .lookup_data import lookup_data
-from .floating_point import normalize, timerange
\ No newline at end of file
+from .floating_point import normalize, timerange
+from .step_memo import MemoStore, StepMemo, TimeGrid
+from .lookup_table import LookupTable, PointsStore
+from .overrides import ConstantOverride, compile_constant, compile_points
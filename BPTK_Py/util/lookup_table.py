@@ -0,0 +1,120 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+from bisect import bisect_right
+
+import numpy as np
+
+
+class LookupTable:
+    """Compiled graphical function.
+
+    The points are sorted by x once and kept as float64 arrays (and as lists for single values). Lookups interpolate linearly between the points and return the first or last y value for x outside of the points, just as the interpolation with scipy's interp1d did.
+
+    Single values are looked up via binary search, NumPy arrays of values are looked up at once via np.interp (batched evaluation, e.g. for ensembles).
+
+    Args:
+        points: List.
+            The points of the graphical function, [[x, y], [x, y], ...].
+    """
+
+    def __init__(self, points):
+        points = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+        order = np.argsort(points[:, 0], kind="stable")
+
+        self.x = np.ascontiguousarray(points[order, 0])
+        self.y = np.ascontiguousarray(points[order, 1])
+        self._x = self.x.tolist()
+        self._y = self.y.tolist()
+
+    def __call__(self, x):
+        """Look up the y value(s) for x.
+
+        Args:
+            x: Float or NumPy array.
+                The x value(s).
+
+        Returns:
+            Float for single values, NumPy array of the same shape for arrays.
+        """
+        if isinstance(x, np.ndarray):
+            return np.interp(x, self.x, self.y)
+
+        xs = self._x
+        ys = self._y
+
+        if x <= xs[0]:
+            return ys[0]
+        if x >= xs[-1]:
+            return ys[-1]
+
+        # same formula as np.interp, so single and batched lookups agree
+        i = bisect_right(xs, x)
+        return (ys[i] - ys[i - 1]) / (xs[i] - xs[i - 1]) * (x - xs[i - 1]) + ys[i - 1]
+
+    def __len__(self):
+        return len(self._x)
+
+
+class PointsStore(dict):
+    """Points of the graphical functions of a model, a dictionary {name: points}.
+
+    Lookup tables are compiled from the points when they are first used and discarded when the points are replaced, e.g. via SdSimulation.change_points. Changes to a list of points in place are not detected, assign a new list instead.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tables = {}
+
+    def __setitem__(self, name, points):
+        super().__setitem__(name, points)
+        self.tables.pop(name, None)
+
+    def __delitem__(self, name):
+        super().__delitem__(name)
+        self.tables.pop(name, None)
+
+    def setdefault(self, name, points=None):
+        if name not in self:
+            self[name] = points
+        return self[name]
+
+    def update(self, *args, **kwargs):
+        for name, points in dict(*args, **kwargs).items():
+            self[name] = points
+
+    def pop(self, name, *default):
+        self.tables.pop(name, None)
+        return super().pop(name, *default)
+
+    def popitem(self):
+        name, points = super().popitem()
+        self.tables.pop(name, None)
+        return name, points
+
+    def clear(self):
+        super().clear()
+        self.tables.clear()
+
+    def table(self, name):
+        """Get the compiled lookup table of a graphical function.
+
+        Args:
+            name: String.
+                Name of the graphical function.
+
+        Returns:
+            LookupTable.
+        """
+        table = self.tables.get(name)
+        if table is None:
+            table = self.tables[name] = LookupTable(self[name])
+        return table
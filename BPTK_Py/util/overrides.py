@@ -0,0 +1,107 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+import math
+from numbers import Number
+
+import numpy as np
+
+# names available to the expressions of scenario constants and points
+_namespace = {"math": math, "np": np}
+
+
+class ConstantOverride:
+    """Equation of a constant set by a scenario, returns the bound value for every t.
+
+    Args:
+        value: Number.
+            The value of the constant.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __call__(self, t):
+        return self.value
+
+    def __eq__(self, other):
+        return isinstance(other, ConstantOverride) and other.value == self.value
+
+    def __hash__(self):
+        return hash(self.value)
+
+    def __repr__(self):
+        return "ConstantOverride({!r})".format(self.value)
+
+
+def _compile_expression(expression, kind):
+    try:
+        return compile(expression.strip(), "<{}>".format(kind), "eval")
+    except SyntaxError as e:
+        raise ValueError("Invalid {} \"{}\": {}".format(kind, expression, e.msg)) from None
+
+
+def compile_constant(value):
+    """Compile the value of a constant set by a scenario into an equation.
+
+    Numbers and expressions that do not refer to any names (e.g. "0.5" or "1/12") are evaluated once and bound to a ConstantOverride. Expressions that refer to names (e.g. "t*2" or "math.sqrt(2)") are compiled once into a function of t.
+
+    Args:
+        value: Number or String.
+            The value or expression of the constant.
+
+    Returns:
+        Function of t.
+
+    Raises:
+        ValueError: The value is neither a number nor a valid expression.
+    """
+    if isinstance(value, Number):
+        return ConstantOverride(value)
+
+    if not isinstance(value, str):
+        raise ValueError("Invalid type for constant: {}".format(str(value)))
+
+    code = _compile_expression(value, "constant")
+
+    if code.co_names:
+        return eval(compile("lambda t: ({})".format(value.strip()), "<constant>", "eval"), dict(_namespace))
+
+    try:
+        return ConstantOverride(eval(code, {"__builtins__": {}}))
+    except Exception as e:
+        raise ValueError("Invalid constant \"{}\": {}".format(value, e)) from None
+
+
+def compile_points(value):
+    """Evaluate the points of a graphical function set by a scenario.
+
+    Args:
+        value: List or String.
+            The points or an expression that evaluates to the points, e.g. "[[0, 1], [1, 2]]".
+
+    Returns:
+        The points.
+
+    Raises:
+        ValueError: The value is neither a list nor a valid expression.
+    """
+    if isinstance(value, list):
+        return value
+
+    code = _compile_expression(str(value), "points")
+
+    try:
+        return eval(code, dict(_namespace))
+    except Exception as e:
+        raise ValueError("Invalid points \"{}\": {}".format(value, e)) from None
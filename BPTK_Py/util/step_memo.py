@@ -0,0 +1,300 @@
+#                                                       /`-
+# _                                  _   _             /####`-
+# | |                                | | (_)           /########`-
+# | |_ _ __ __ _ _ __  ___  ___ _ __ | |_ _ ___       /###########`-
+# | __| '__/ _` | '_ \/ __|/ _ \ '_ \| __| / __|   ____ -###########/
+# | |_| | | (_| | | | \__ \  __/ | | | |_| \__ \  |    | `-#######/
+# \__|_|  \__,_|_| |_|___/\___|_| |_|\__|_|___/  |____|    `- # /
+#
+# Copyright (c) 2026 transentis labs GmbH
+# MIT License
+
+from collections.abc import MutableMapping
+
+from .floating_point import scale
+
+
+class TimeGrid:
+    """Time grid of a simulation run.
+
+    Maps timesteps to integer step indices and back. Step i is the time starttime + i*dt, normalized in the same way as floating_point.normalize, so the times of the grid are identical to the times produced by timerange.
+
+    Args:
+        starttime: Float.
+            Start time of the run.
+        stoptime: Float.
+            Stop time of the run.
+        dt: Float.
+            The timestep.
+    """
+
+    def __init__(self, starttime, stoptime, dt):
+        self.starttime = starttime * 1.0
+        self.stoptime = stoptime * 1.0
+        self.dt = dt * 1.0
+        self.precision = max(scale(self.starttime), scale(self.dt))
+        self.size = max(0, round((self.stoptime - self.starttime) / self.dt) + 1) if self.dt > 0 else 0
+        self.times = [self.time(index) for index in range(self.size)]
+
+    def index(self, t):
+        """Get the step index of the timestep closest to t."""
+        return round((t - self.starttime) / self.dt)
+
+    def time(self, index):
+        """Get the (normalized) time of the step with the given index."""
+        return 1.0 * round(self.dt * index + self.starttime, self.precision)
+
+    def matches(self, starttime, stoptime, dt):
+        return (self.starttime, self.stoptime, self.dt) == (starttime, stoptime, dt)
+
+
+class StepMemo(MutableMapping):
+    """Memo of the values of one equation.
+
+    Values are stored in lists indexed by step, which are preallocated for the whole time grid when the first value is stored. Each slot is stamped with the generation of the MemoStore it was written in, slots with an older stamp are considered empty. Timesteps outside of the grid are kept in a separate dictionary indexed by step.
+
+    The memo of a time-invariant equation (see set_invariant) keeps a single slot instead, which holds the value for all timesteps. Its value and stamp lists stay empty. The memo remembers the last step the value was used for, so the value can be turned back into the values of the steps up to it.
+
+    The memo behaves like the dictionary {t: value} it replaces.
+
+    Args:
+        store: MemoStore.
+            The store the memo belongs to.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.values = []
+        self.stamps = []
+        self.outside = {}
+        self.invariant = False
+        self.slot = None
+        self.slot_stamp = 0
+        self.slot_until = -1
+
+    def allocate(self):
+        """Preallocate the value and stamp lists for the whole time grid."""
+        if not self.stamps and not self.invariant:
+            self.values = [None] * self.store.grid.size
+            self.stamps = [0] * self.store.grid.size
+
+    def set_invariant(self, invariant=True):
+        """Switch between a single slot for all timesteps and one slot per timestep.
+
+        Only memos without values switch to a single slot, values stored per step might differ (e.g. if the equation was changed during a run). Switching back keeps the value of the single slot for the steps up to the last step it was used for.
+
+        Args:
+            invariant: Boolean (Default=True).
+                True if the equation has the same value at every timestep.
+
+        Returns:
+            True if the memo keeps a single slot.
+        """
+        if invariant == self.invariant:
+            return self.invariant
+
+        if invariant:
+            if self._indices():
+                return False
+            self.values = []
+            self.stamps = []
+            self.outside = {}
+            self.slot_stamp = 0
+            self.slot_until = -1
+            self.invariant = True
+        else:
+            valid = self.slot_stamp == self.store.generation
+            self.invariant = False
+            if valid and self.slot_until >= 0:
+                self.set_values([self.slot] * min(self.slot_until + 1, self.store.grid.size))
+            self.slot = None
+            self.slot_stamp = 0
+            self.slot_until = -1
+
+        return self.invariant
+
+    def set_value(self, index, value):
+        """Store the value for the step with the given index."""
+        if self.invariant:
+            self.slot = value
+            self.slot_stamp = self.store.generation
+            self.slot_until = index
+        elif 0 <= index < self.store.grid.size:
+            self.allocate()
+            self.values[index] = value
+            self.stamps[index] = self.store.generation
+        else:
+            self.outside[index] = (self.store.generation, value)
+
+    def set_values(self, values):
+        """Store the values for the first len(values) steps of the time grid."""
+        if self.invariant:
+            if values:
+                self.set_value(len(values) - 1, values[-1])
+            return
+
+        self.allocate()
+        size = len(values)
+        self.values[:size] = values
+        self.stamps[:size] = [self.store.generation] * size
+
+    def written(self):
+        """Check whether values were stored in the memo. Per step values count once their lists are allocated, the single slot of a time-invariant equation while it holds a valid value."""
+        return bool(self.stamps or self.outside) or (self.invariant and self.slot_stamp == self.store.generation)
+
+    def has_value(self, index):
+        """Check whether a value is stored for the step with the given index."""
+        if 0 <= index < len(self.stamps):
+            return self.stamps[index] == self.store.generation
+        if self.invariant:
+            return self.slot_stamp == self.store.generation
+        return index in self.outside and self.outside[index][0] == self.store.generation
+
+    def get_value(self, index):
+        """Get the value stored for the step with the given index, check has_value first."""
+        if 0 <= index < len(self.stamps):
+            return self.values[index]
+        if self.invariant:
+            if index > self.slot_until:
+                self.slot_until = index
+            return self.slot
+        return self.outside[index][1]
+
+    def __getitem__(self, t):
+        index = self.store.grid.index(t)
+        if not self.has_value(index):
+            raise KeyError(t)
+        return self.get_value(index)
+
+    def __setitem__(self, t, value):
+        self.set_value(self.store.grid.index(t), value)
+
+    def __delitem__(self, t):
+        index = self.store.grid.index(t)
+        if not self.has_value(index):
+            raise KeyError(t)
+        if self.invariant:
+            self.slot_stamp = 0
+            self.slot = None
+            self.slot_until = -1
+        elif 0 <= index < len(self.stamps):
+            self.stamps[index] = 0
+            self.values[index] = None
+        else:
+            del self.outside[index]
+
+    def __contains__(self, t):
+        return self.has_value(self.store.grid.index(t))
+
+    def clear(self):
+        """Invalidate all values of the equation. The value and stamp lists keep their identity, so compiled step functions bound to them stay valid."""
+        self.stamps[:] = [0] * len(self.stamps)
+        self.outside.clear()
+        self.slot_stamp = 0
+        self.slot_until = -1
+
+    def _indices(self):
+        generation = self.store.generation
+        if self.invariant:
+            # the steps the value was used for, as these are the values that are turned back into per step values
+            return list(range(min(self.slot_until + 1, self.store.grid.size))) if self.slot_stamp == generation else []
+        inside = [index for index, stamp in enumerate(self.stamps) if stamp == generation]
+        outside = [index for index, (stamp, _) in self.outside.items() if stamp == generation]
+        return sorted(outside + inside)
+
+    def __iter__(self):
+        grid = self.store.grid
+        return iter([grid.time(index) for index in self._indices()])
+
+    def __len__(self):
+        return len(self._indices())
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+class MemoStore(dict):
+    """Memo of all equations of a model, a dictionary {equation: StepMemo}.
+
+    Plain dictionaries {t: value} that are assigned to the store are converted into StepMemos, so existing code that resets a memo via memo[equation] = {} keeps working. Resetting the whole store only increments its generation, which invalidates all values in O(1).
+
+    Args:
+        starttime: Float.
+            Start time of the model.
+        stoptime: Float.
+            Stop time of the model.
+        dt: Float.
+            The timestep of the model.
+    """
+
+    def __init__(self, starttime, stoptime, dt):
+        super().__init__()
+        self.generation = 1
+        self.grid = TimeGrid(starttime, stoptime, dt)
+
+    def _to_step_memo(self, memo):
+        if isinstance(memo, StepMemo) and memo.store is self:
+            return memo
+        step_memo = StepMemo(self)
+        step_memo.update(memo)
+        return step_memo
+
+    def __setitem__(self, equation, memo):
+        super().__setitem__(equation, self._to_step_memo(memo))
+
+    def setdefault(self, equation, memo=None):
+        if equation not in self:
+            self[equation] = memo if memo is not None else {}
+        return self[equation]
+
+    def update(self, *args, **kwargs):
+        for equation, memo in dict(*args, **kwargs).items():
+            self[equation] = memo
+
+    def reset(self):
+        """Invalidate the memos of all equations."""
+        self.generation += 1
+
+    def set_invariant(self, equations):
+        """Keep the values of the given equations in a single slot (see StepMemo.set_invariant), all other equations get one slot per timestep.
+
+        Args:
+            equations: Iterable.
+                Names of the time-invariant equations.
+
+        Returns:
+            Set of the names of the equations that keep a single slot.
+        """
+        equations = set(equations)
+        return set(equation for equation, memo in self.items() if memo.set_invariant(equation in equations))
+
+    def invalidate(self, equations):
+        """Invalidate the memos of the given equations, the memos of all other equations are kept.
+
+        Args:
+            equations: Iterable.
+                Names of the equations to invalidate.
+        """
+        for equation in equations:
+            if equation in self:
+                self[equation].clear()
+
+    def set_grid(self, starttime, stoptime, dt):
+        """Change the time grid. Values for times that are part of the new grid are kept."""
+        if self.grid.matches(starttime * 1.0, stoptime * 1.0, dt * 1.0):
+            return
+
+        memos = {equation: dict(memo.items()) for equation, memo in self.items()}
+        self.grid = TimeGrid(starttime, stoptime, dt)
+
+        for equation, memo in memos.items():
+            self[equation] = {t: value for t, value in memo.items() if t == self.grid.time(self.grid.index(t))}
+
+    def __reduce__(self):
+        return (_restore_memo_store, (self.grid.starttime, self.grid.stoptime, self.grid.dt, {equation: dict(memo.items()) for equation, memo in self.items()}))
+
+
+def _restore_memo_store(starttime, stoptime, dt, memos):
+    store = MemoStore(starttime, stoptime, dt)
+    store.update(memos)
+    return store
@@ -835,6 +835,23 @@ def test_arrray_3dimensional():
         assert sim.equation("arrayProduct", t) == 1.0
 
 
+def test_array_elements():
+    from test_models.test_array_3dimensional import simulation_model
+    sim = simulation_model()
+
+    assert sim.arrays["inventory"].shape == (3, 4, 3)
+    assert sim.arrays["inventory"][1, 0, 2] == "inventory[2,germany,producer3]"
+    assert sim.label_index("products", 2.0) == 1
+
+    t = sim.stoptime
+    inventory = sim.array("inventory", t)
+    assert inventory.shape == (3, 4, 3)
+    assert inventory[1, 0, 2] == sim.equation("inventory[2,germany,producer3]", t)
+    assert np.array_equal(sim.equation("inventory[*,germany,*]", t), inventory[:, 0, :].ravel())
+    assert np.array_equal(sim.equation("inventory[1:2,*,producer1]", t), inventory[0:2, :, 0].ravel())
+    assert sim.equation("countryInventory[germany]", t) == np.sum(inventory[:, 0, :])
+
+
 def test_counter_his():
     from test_models.test_clocktime import simulation_model
 
@@ -887,6 +904,30 @@ def test_financials():
     assert round(sim.equation('internalRateOfReturn', sim.stoptime),2) == 0.08
 
 
+def test_irr_600_periods():
+    from test_models.test_financials import simulation_model
+
+    sim = simulation_model()
+    sim.dt = 1.0
+    sim.stoptime = sim.starttime + 600.0
+    times = np.arange(sim.starttime, sim.stoptime + sim.dt, sim.dt)
+
+    irr = [sim.equation('internalRateOfReturn', t) for t in times]
+
+    # the values of the stock are collected once, for the steps before the stoptime
+    state = sim.memo.builtin_states[("irr", "converter2")]
+    assert state["count"] == len(times) - 2
+
+    # the rate of return of paying 10000 once and receiving 200 per period
+    flow_times = times[1:-1]
+    npv = lambda rate: -10000.0 + np.sum(200.0 / (1 + rate) ** flow_times)
+    low, high = 0.0, 0.1
+    for _ in range(60):
+        low, high = ((low + high) / 2, high) if npv((low + high) / 2) > 0 else (low, (low + high) / 2)
+
+    assert irr[-1] == pytest.approx(low, abs=1e-3)
+
+
 
 def test_percent():
     from test_models.test_percent import simulation_model
@@ -1149,6 +1190,52 @@ def test_smthn():
     assert res == smthn_expected
 
 
+def test_smthn_state():
+    from test_models.test_smthn import simulation_model
+    sim = simulation_model()
+    times = np.arange(sim.starttime, sim.stoptime + sim.dt, sim.dt)
+
+    # the hidden stocks are stepped forward once and kept, in any order of evaluation
+    backwards = [sim.equation("smt", t) for t in times[::-1]][::-1]
+    assert len(sim.memo.builtin_states) == 1
+    sim.memo.reset()
+    assert sim.memo.builtin_states == {}
+    assert [sim.equation("smt", t) for t in times] == backwards
+
+    # invalidating the input drops the hidden stocks
+    sim.equations["input"] = lambda t: 5.0
+    sim.memo.invalidate(["input", "smt"])
+    assert [round(sim.equation("smt", t), 3) for t in times] == [5.0] * len(times)
+
+    # timesteps that are not on the grid are stepped from the start time
+    assert sim.equation("smt", sim.starttime + sim.dt / 3) == 5.0
+
+
+def test_smthn_time_varying_averaging_time():
+    from test_models.test_smthn import simulation_model
+    sim = simulation_model()
+    times = np.arange(sim.starttime, sim.stoptime + sim.dt, sim.dt)
+
+    sim.equations["averagingTime"] = lambda t: 1.0 + t
+    sim.memo.invalidate(["averagingTime", "smt"])
+
+    # the hidden stocks read the averaging time of each step
+    stocks = [5.0] * 5
+    expected = []
+    for t in times:
+        expected += [stocks[-1]]
+        inflow = sim.equation("input", t)
+        for index, stock in enumerate(stocks):
+            stocks[index] = stock + sim.dt * ((inflow - stock) / ((1.0 + t) / 5))
+            inflow = stock
+
+    assert [sim.equation("smt", t) for t in times] == pytest.approx(expected)
+
+    # the state is kept once per call site, one state per step
+    assert list(sim.memo.builtin_states.keys()) == [("smthn", "smt#0")]
+    assert len(sim.memo.builtin_states[("smthn", "smt#0")]["steps"]) == len(times)
+
+
 def test_delayn():
     from test_models.test_delayn import simulation_model
     sim = simulation_model()
@@ -1393,6 +1480,61 @@ def test_doublequote(test_models_path):
         assert sim.equation("otherconverter(fooBar)",t) == 2*t
 
 
+def test_numpy_target(test_models_path):
+    import importlib
+    from BPTK_Py.sdsimulation import SdSimulation
+
+    for name in ["test_array_3dimensional", "test_smth3"]:
+        src = test_models_path / "{}.stmx".format(name)
+        dest = test_models_path / "{}_numpy.py".format(name)
+
+        compile_xmile(src, dest, "numpy")
+        assert dest.is_file()
+
+        memo_model = importlib.import_module("test_models.{}".format(name)).simulation_model()
+        forward_model = importlib.import_module("test_models.{}_numpy".format(name)).simulation_model()
+        assert forward_model.engine == "forward"
+
+        forward_model.run_forward()
+        for equation in forward_model.order:
+            for t in forward_model.memo.grid.times:
+                assert forward_model.memo[equation][t] == memo_model.equation(equation, t)
+
+    # equations changed by scenarios are called by the step function
+    compile_xmile(test_models_path / "test_array.stmx", test_models_path / "test_array_numpy.py", "numpy")
+    forward_model = importlib.import_module("test_models.test_array_numpy").simulation_model()
+
+    simulation = SdSimulation(model=forward_model)
+    simulation.change_equation("rate[1]", 2.0)
+    result = simulation.start(output=["frame"], equations=["stock[1]", "inflow[*]"])
+
+    assert result["stock[1]"][forward_model.stoptime] == 2 * (forward_model.stoptime - forward_model.starttime)
+    assert result["inflow[*]"][forward_model.stoptime] == 7
+
+
+def test_generator_runs_keep_their_dimensions(test_models_path):
+    from BPTK_Py.sdcompiler.compile import stages
+    from BPTK_Py.sdcompiler.generator.contextBuilder import generate
+    from BPTK_Py.sdcompiler.generator.py import py
+    from BPTK_Py.sdcompiler.generator.py.jinja_template import template
+
+    def intermediate_representation(name):
+        IR = str(test_models_path / "{}.stmx".format(name))
+        for _, function in stages:
+            IR = function(IR)
+        return IR
+
+    expected = py.generate(intermediate_representation("test_array"))
+
+    # another model generated in between does not change how the subscripts of the first model are resolved
+    IR = intermediate_representation("test_array")
+    py.resolve_dimensions(IR)
+    py.generate(intermediate_representation("test_array_3dimensional"))
+
+    assert generate(IR, template=template, parseExpression=py.parseExpression) == expected
+    assert "self.arrays[" in expected
+
+
 def test_teardown(test_models_path):
 
     for file_path in test_models_path.glob("*.py"):
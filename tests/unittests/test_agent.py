@@ -37,6 +37,36 @@ class TestAgent(unittest.TestCase):
         model = Model()
         self.assertEqual(Agent(agent_id=1, model=model, properties={"name": {"type" : "String", "value": "testName"}}, agent_type="testAgent").serialize(), {'name': 'testName', 'id': 1, 'state': 'active', 'type': 'testAgent'})
 
+    def test_clone(self):
+        model = Model()
+
+        class Counter(Agent):
+            def initialize(self):
+                self.received = []
+                self.register_event_handler(["active"], "ping", self.handle_ping)
+
+            def handle_ping(self, event):
+                self.received.append(event.data)
+
+        prototype = Counter(agent_id=1, model=model, properties={"count": {"type": "Integer", "value": 1}, "tags": {"type": "List", "value": ["a"]}}, agent_type="counter")
+        prototype.initialize()
+        clone = prototype.clone(2)
+
+        self.assertIsInstance(clone, Counter)
+        self.assertEqual(clone.id, 2)
+        self.assertIs(clone.model, model)
+        self.assertEqual(clone.properties, prototype.properties)
+
+        clone.count = 5
+        clone.tags.append("b")
+        self.assertEqual(prototype.count, 1)
+        self.assertEqual(prototype.tags, ["a"])
+
+        # event handlers and containers belong to the clone
+        clone.receive_instantaneous_event(Event(name="ping", sender_id=1, receiver_id=2, data="x"))
+        self.assertEqual(clone.received, ["x"])
+        self.assertEqual(prototype.received, [])
+
     def testAgentRegister_event_handler(self):
         from BPTK_Py import Event
         model = Model()
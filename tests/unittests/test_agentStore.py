@@ -0,0 +1,178 @@
+import copy
+import unittest
+
+from BPTK_Py import Agent, Model
+from BPTK_Py.modeling.agentStore import AgentIds, AgentStore, AgentTypeMap
+
+
+class TestAgentIds(unittest.TestCase):
+    def test_behaves_like_list(self):
+        ids = AgentIds([3, 1])
+        ids.append(2)
+        ids += [5]
+
+        self.assertEqual(ids, [3, 1, 2, 5])
+        self.assertEqual(len(ids), 4)
+        self.assertEqual(ids[0], 3)
+        self.assertEqual(ids[-1], 5)
+        self.assertIn(2, ids)
+
+        ids.remove(1)
+        self.assertEqual(ids, [3, 2, 5])
+        self.assertEqual(ids[1], 2)
+        self.assertRaises(ValueError, ids.remove, 1)
+
+        ids.discard(1)
+        ids.append(3)
+        self.assertEqual(ids, [3, 2, 5])
+
+    def test_iterate_while_changing(self):
+        ids = AgentIds([0, 1, 2])
+        visited = []
+        for agent_id in ids:
+            visited.append(agent_id)
+            if agent_id == 0:
+                ids.remove(1)
+                ids.append(3)
+
+        self.assertEqual(visited, [0, 1, 2])
+        self.assertEqual(ids, [0, 2, 3])
+
+    def test_type_map_converts_lists(self):
+        type_map = AgentTypeMap({"a": [1, 2]})
+        type_map["b"] = []
+        type_map.setdefault("c").append(7)
+
+        self.assertIsInstance(type_map["a"], AgentIds)
+        self.assertEqual(type_map, {"a": [1, 2], "b": [], "c": [7]})
+
+
+class TestAgentStore(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        self.agents = [Agent(agent_id=agent_id, model=self.model, properties={}, agent_type="a") for agent_id in range(3)]
+
+    def test_behaves_like_list(self):
+        store = AgentStore(self.agents)
+
+        self.assertEqual(store, self.agents)
+        self.assertEqual(list(store), self.agents)
+        self.assertEqual(store[1], self.agents[1])
+        self.assertEqual(len(store), 3)
+        self.assertIn(self.agents[2], store)
+        self.assertEqual(AgentStore(), [])
+
+    def test_lookup_and_remove(self):
+        store = AgentStore()
+        store.append(self.agents[0], "registered")
+        store += self.agents[1:]
+
+        self.assertIs(store.get(2), self.agents[2])
+        self.assertIsNone(store.get(7))
+        self.assertEqual(store.agent_types, {0: "registered", 1: "a", 2: "a"})
+
+        self.assertIs(store.pop(1), self.agents[1])
+        self.assertIsNone(store.pop(1, None))
+        self.assertRaises(KeyError, store.pop, 1)
+        self.assertEqual(store, [self.agents[0], self.agents[2]])
+        self.assertEqual(list(store.ids()), [0, 2])
+        self.assertNotIn(self.agents[1], store)
+
+    def test_copy(self):
+        store = AgentStore(self.agents)
+        copied = copy.deepcopy(store)
+
+        self.assertEqual([agent.id for agent in copied], [0, 1, 2])
+        self.assertIs(copied.get(1), copied[1])
+
+
+class TestModelRegistry(unittest.TestCase):
+    def setUp(self):
+        self.model = Model()
+        self.model.register_agent_factory("a", lambda agent_id, model, properties: Agent(agent_id, model, properties, "a"))
+        self.model.register_agent_factory("b", lambda agent_id, model, properties: Agent(agent_id, model, properties, "b"))
+        for agent_type in ["a", "b", "a", "b", "a"]:
+            self.model.create_agent(agent_type, None)
+
+    def test_assignments_are_converted(self):
+        self.model.agents = list(self.model.agents)
+        self.model.agent_type_map = {"a": [0, 2, 4]}
+
+        self.assertIsInstance(self.model.agents, AgentStore)
+        self.assertIsInstance(self.model.agent_type_map, AgentTypeMap)
+        self.assertIs(self.model.agent(4), self.model.agents[4])
+
+    def test_delete_agents(self):
+        self.model.delete_agents([1, 2, 42])
+
+        self.assertEqual([agent.id for agent in self.model.agents], [0, 3, 4])
+        self.assertEqual(self.model.agent_type_map, {"a": [0, 4], "b": [3]})
+        self.assertIsNone(self.model.agent(2))
+        self.assertEqual(self.model.agent(3).agent_type, "b")
+        self.assertEqual(self.model.agent_count_per_state("a", "active"), 2)
+
+        # new agents get new ids
+        agent = self.model.create_agent("b", None)
+        self.assertEqual(agent.id, 5)
+        self.assertEqual(self.model.agent_ids("b"), [3, 5])
+
+    def test_state_index(self):
+        agents = list(self.model.agents)
+
+        self.assertEqual(self.model.agent_state_counts("a"), {"active": 3})
+        self.assertIs(self.model.next_agent("a", "active"), agents[0])
+
+        agents[0].state = "busy"
+        agents[4].state = "busy"
+        agents[3].state = "busy"
+
+        self.assertIs(self.model.next_agent("a", "active"), agents[2])
+        self.assertIs(self.model.next_agent("a", "busy"), agents[0])
+        self.assertIs(self.model.next_agent("b", "busy"), agents[3])
+        self.assertIsNone(self.model.next_agent("b", "idle"))
+        self.assertEqual(self.model.agent_count_per_state("a", "busy"), 2)
+        self.assertEqual(self.model.agent_state_counts("a"), {"active": 1, "busy": 2})
+        self.assertEqual(self.model.agent_state_counts("b"), {"active": 1, "busy": 1})
+        self.assertEqual(sorted(agent.id for agent in self.model.agents.in_state("a", "busy")), [0, 4])
+
+        # agents are found in the order they were created in, whatever the order of their state changes
+        agents[0].state = "active"
+        self.assertIs(self.model.next_agent("a", "active"), agents[0])
+        self.assertIs(self.model.next_agent("a", "busy"), agents[4])
+
+        self.model.delete_agents([0, 3])
+        self.assertIs(self.model.next_agent("a", "active"), agents[2])
+        self.assertEqual(self.model.agent_state_counts("b"), {"active": 1})
+
+        # agents that are not part of the model do not change the index
+        agents[0].state = "busy"
+        self.assertEqual(self.model.agent_count_per_state("a", "busy"), 1)
+
+    def test_state_index_many_changes(self):
+        for _ in range(100):
+            for agent in self.model.agents:
+                agent.state = "busy" if agent.state == "active" else "active"
+
+        self.assertEqual(self.model.agent_count_per_state("a", "active"), 3)
+        self.assertIs(self.model.next_agent("b", "active"), self.model.agent(1))
+        self.assertLess(len(self.model.agents.state_index["a"]["active"].heap), 64)
+
+    def test_events_after_deletion(self):
+        from BPTK_Py import Event, SimultaneousScheduler
+
+        received = []
+        self.model.scheduler = SimultaneousScheduler()
+        self.model.stoptime = 1
+        for agent in self.model.agents:
+            agent.register_event_handler(["active"], "ping", lambda event: received.append((event.receiver_id, event.data)))
+
+        self.model.delete_agents([0, 1])
+        self.model.enqueue_event(Event("ping", 2, 3, "to 3"))
+        self.model.enqueue_event(Event("ping", 2, 1, "to deleted agent"))
+        self.model.run_step(0)
+
+        self.assertEqual(received, [(3, "to 3")])
+
+
+if __name__ == '__main__':
+    unittest.main()
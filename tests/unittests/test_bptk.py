@@ -160,6 +160,29 @@ class TestBptk(unittest.TestCase):
         self.assertEqual(testBptk2.run_step(flat=False),{'testManager': {'testScenario': {'stock': {0.0: 0.0}, 'flow': {0.0: 2.0}}}})
         self.assertEqual(testBptk2.run_step(flat=True),{'testManager': {'testScenario': {'stock': 1.0, 'flow': 2.0}}})
 
+    def testBptk_run_ensemble(self):
+        testBptk = bptk()
+
+        from BPTK_Py import Model
+        model = Model(starttime=0.0,stoptime=5.0,dt=1.0,name='test')
+        stock = model.stock("stock")
+        flow = model.flow("flow")
+        rate = model.constant("rate")
+        stock.initial_value = 0.0
+        rate.equation = 1.0
+        flow.equation = rate
+        stock.equation = flow
+        scenario_manager = {"testManager": {"model": model}}
+
+        testBptk.register_scenario_manager(scenario_manager)
+        testBptk.register_scenarios(scenarios ={"testScenario": {}},scenario_manager="testManager")
+
+        result = testBptk.run_ensemble(scenario_manager="testManager",scenario="testScenario",parameter_table={"rate": [1.0, 2.0]},equations=["stock","flow"])
+
+        self.assertEqual(result.shape,(2,6,2))
+        self.assertEqual(list(result[:,5,0]),[5.0,10.0])
+        self.assertEqual(list(result[:,5,1]),[1.0,2.0])
+
     def testBptk_session_results(self):
         testBptk = bptk()
 
@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from BPTK_Py.sdcompiler.cache import CompileCache, compiler_version, file_digest
+from BPTK_Py.sdcompiler.compile import compile_xmile, compile_xmile_parallel
+
+
+class TestCompileCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_models", "test_abs.stmx")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_key(self):
+        cache = CompileCache(os.path.join(self.directory, "cache"))
+        copy = os.path.join(self.directory, "copy.stmx")
+        shutil.copy(self.source, copy)
+
+        self.assertEqual(cache.key(self.source, "py"), cache.key(copy, "py"))
+        self.assertNotEqual(cache.key(self.source, "py"), cache.key(self.source, "numpy"))
+        self.assertEqual(compiler_version(), compiler_version())
+        self.assertIsNone(file_digest(os.path.join(self.directory, "missing.stmx")))
+
+        with open(copy, "a") as outfile:
+            outfile.write(" ")
+        self.assertNotEqual(cache.key(self.source, "py"), cache.key(copy, "py"))
+
+    def test_get_put(self):
+        cache = CompileCache(os.path.join(self.directory, "cache"))
+
+        self.assertIsNone(cache.get("key"))
+        cache.put("key", "code")
+        self.assertEqual(cache.get("key"), "code")
+        self.assertEqual(os.listdir(cache.directory), ["key"])
+
+    def test_compile_xmile(self):
+        cache_dir = os.path.join(self.directory, "cache")
+        dest = os.path.join(self.directory, "model.py")
+
+        self.assertTrue(compile_xmile(self.source, dest, "py", cache_dir=cache_dir))
+        self.assertEqual(len(os.listdir(cache_dir)), 1)
+
+        # the destination is up to date, it is neither written nor is the source parsed again
+        with patch("BPTK_Py.sdcompiler.compile.parse_xmile", side_effect=AssertionError("parsed")):
+            self.assertFalse(compile_xmile(self.source, dest, "py", cache_dir=cache_dir))
+
+            os.remove(dest)
+            self.assertTrue(compile_xmile(self.source, dest, "py", cache_dir=cache_dir))
+
+        with open(dest, "r") as infile:
+            self.assertEqual(infile.read(), CompileCache(cache_dir).get(CompileCache(cache_dir).key(self.source, "py")))
+
+    def test_compile_xmile_parallel(self):
+        models = os.path.dirname(self.source)
+        jobs = [(os.path.join(models, name + ".stmx"), os.path.join(self.directory, name + ".py")) for name in ["test_abs", "test_cos", "test_tan"]]
+        jobs += [(os.path.join(self.directory, "missing.stmx"), os.path.join(self.directory, "missing.py"))]
+
+        results = compile_xmile_parallel(jobs, processes=2)
+
+        self.assertEqual(set(results.keys()), set(src for src, dest in jobs))
+        for src, dest in jobs[:-1]:
+            seconds, error = results[src]
+            self.assertIsNone(error)
+            self.assertGreater(seconds, 0)
+            self.assertTrue(os.path.isfile(dest))
+        self.assertIsNotNone(results[jobs[-1][0]][1])
+
+        # single models are compiled in the calling process
+        with patch("BPTK_Py.sdcompiler.compile.ProcessPoolExecutor", side_effect=AssertionError("pool")):
+            results = compile_xmile_parallel(jobs[:1], processes=4)
+        self.assertIsNone(results[jobs[0][0]][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
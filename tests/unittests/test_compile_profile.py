@@ -0,0 +1,63 @@
+import os
+import shutil
+import tempfile
+import tracemalloc
+import unittest
+
+from BPTK_Py.sdcompiler.benchmark import benchmark_compile, stage_totals, synthetic_model
+from BPTK_Py.sdcompiler.compile import compile_xmile, stages
+from BPTK_Py.sdcompiler.profiling import CompileProfile, ir_size
+
+
+class TestCompileProfile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_models", "test_array.stmx")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_ir_size(self):
+        self.assertEqual(ir_size("code"), 4)
+        self.assertEqual(ir_size({"a": [1, 2], "b": {"c": None}}), 6)
+
+        shared = [1]
+        self.assertEqual(ir_size([shared, shared]), 4)
+
+    def test_profile(self):
+        profile = CompileProfile()
+        compile_xmile(self.source, os.path.join(self.directory, "profiled.py"), "py", profile=profile)
+        compile_xmile(self.source, os.path.join(self.directory, "plain.py"), "py")
+
+        self.assertEqual([entry["stage"] for entry in profile.stages], [stage for stage, _ in stages] + ["py"])
+        for entry in profile.stages:
+            self.assertGreaterEqual(entry["seconds"], 0)
+            self.assertGreaterEqual(entry["peak"], 0)
+            self.assertGreater(entry["size"], 0)
+        self.assertAlmostEqual(profile.seconds, sum(entry["seconds"] for entry in profile.stages))
+        self.assertFalse(tracemalloc.is_tracing())
+        self.assertIn("ExpandArrays", profile.report())
+
+        # profiling does not change the generated code
+        with open(os.path.join(self.directory, "profiled.py")) as profiled, open(os.path.join(self.directory, "plain.py")) as plain:
+            self.assertEqual(profiled.read(), plain.read())
+
+    def test_profile_without_allocations(self):
+        profile = CompileProfile(trace_allocations=False)
+        compile_xmile(self.source, os.path.join(self.directory, "model.py"), "json", profile=profile)
+
+        self.assertEqual(profile.stages[-1]["stage"], "json")
+        self.assertTrue(all(entry["allocated"] is None and entry["peak"] is None for entry in profile.stages))
+
+    def test_benchmark_compile(self):
+        profiles = benchmark_compile([self.source], scales=[1, 2])
+
+        self.assertEqual(list(profiles.keys()), [self.source, "synthetic 1x", "synthetic 2x"])
+        expanded = [{entry["stage"]: entry["size"] for entry in profiles[model].stages}["ExpandArrays"] for model in ["synthetic 1x", "synthetic 2x"]]
+        self.assertGreater(expanded[1], expanded[0])
+        self.assertEqual(list(stage_totals(profiles.values()).keys()), [stage for stage, _ in stages] + ["py"])
+        self.assertIn('<dim name="Products" size="30"/>', synthetic_model(10))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,202 @@
+import unittest
+
+from BPTK_Py.modeling.dependencyGraph import DependencyGraph, _references, _scan, STATE, TIME_INVARIANT, TIME_ONLY
+from BPTK_Py.util import compile_constant
+from BPTK_Py.sdcompiler.plugins.dependencyGraph import dependencyGraph, equation_name
+
+from .test_forwardStepper import build_project_model
+
+
+class TestDependencyGraph(unittest.TestCase):
+    def test_references(self):
+        function_string = "lambda model, t: model.memoize('a',t) + model.memoize('b',t-model.dt)"
+        self.assertEqual(_references(function_string), [("a", True), ("b", False)])
+        self.assertEqual(_references("lambda model, t: ("), [])
+
+    def test_required(self):
+        graph = build_project_model().dependency_graph()
+
+        self.assertEqual(graph.required(["remainingTime"]), {"remainingTime", "deadline", "currentTime"})
+        self.assertIn("openTasks", graph.required(["productivity"]))
+        self.assertNotIn("closedTasks", graph.required(["productivity"]))
+        self.assertEqual(graph.required(["unknown"]), set())
+
+    def test_order(self):
+        graph = build_project_model().dependency_graph()
+        order = graph.order()
+
+        self.assertEqual(sorted(order), sorted(graph.dependencies))
+        for name in order:
+            for dependency in graph.same_step_dependencies[name]:
+                self.assertLess(order.index(dependency), order.index(name))
+
+    def test_cycles(self):
+        graph = DependencyGraph(
+            {"a": ["b"], "b": ["a"], "c": ["c"], "d": ["a"], "stock": ["stock", "d"]},
+            {"a": ["b"], "b": ["a"], "c": ["c"], "d": ["a"], "stock": []}
+        )
+
+        self.assertEqual(graph.cycles(), [["a", "b"], ["c"]])
+        self.assertEqual(graph.cycles(["a", "d"]), [])
+        self.assertEqual(sorted(graph.order()), ["a", "b", "c", "d", "stock"])
+        self.assertLess(graph.order().index("a"), graph.order().index("d"))
+
+    def test_dependents(self):
+        graph = build_project_model().dependency_graph()
+
+        self.assertEqual(graph.dependents(["initialStaff"]), {"initialStaff", "staff", "schedulePressure", "productivity", "completionRate", "openTasks", "closedTasks"})
+        self.assertEqual(graph.dependents(["closedTasks"]), {"closedTasks"})
+        self.assertEqual(graph.dependents(["unknown"]), set())
+
+    def test_affected(self):
+        graph = build_project_model().dependency_graph()
+
+        self.assertEqual(graph.readers(["productivity"]), ["productivity"])
+        self.assertEqual(graph.affected(points=["productivity"]), graph.dependents(["productivity"]))
+        self.assertEqual(graph.affected(["unknown"]), set())
+
+        # opaque equations might read anything, xmile graphical functions are read by their equations
+        graph = DependencyGraph({"a": [], "b": ["a"], "c": [], "d": ["c"], "gf[1]": []}, opaque=["c"])
+        self.assertEqual(graph.affected(["a"]), {"a", "b", "c", "d"})
+        self.assertEqual(graph.affected(points=["gf"]), {"gf[1]", "c", "d"})
+        self.assertEqual(graph.affected(), set())
+
+    def test_from_model(self):
+        class XmileModel:
+            equations = {"a": None, "b": None}
+            dependencies = {"a": ["b", "unknown"], "b": []}
+            same_step_dependencies = {"a": [], "b": []}
+
+        graph = DependencyGraph.from_model(XmileModel())
+
+        self.assertEqual(graph.dependencies, {"a": ["b"], "b": []})
+        self.assertEqual(graph.same_step_dependencies, {"a": [], "b": []})
+        self.assertEqual(graph.opaque, set())
+        self.assertEqual(len(DependencyGraph.from_model(build_project_model())), 12)
+
+    def test_graph_follows_model_changes(self):
+        model = build_project_model()
+        self.assertNotIn("doubleStaff", model.dependency_graph())
+
+        doubleStaff = model.converter("doubleStaff")
+        doubleStaff.equation = model.stocks["staff"] * 2.0
+
+        self.assertEqual(model.dependency_graph().required(["doubleStaff"]), {"doubleStaff", "staff", "initialStaff"})
+
+    def test_constants_are_not_opaque(self):
+        model = build_project_model()
+        graph = model.dependency_graph()
+
+        model.equations["deadline"] = lambda t: 80.0
+        model.add_equation("doubleStaff", lambda t: 2.0 * model.memoize("staff", t))
+
+        self.assertNotIn("deadline", model.dependency_graph().opaque)
+        self.assertEqual(model.dependency_graph().opaque, {"doubleStaff"})
+        # the graph is updated in place
+        self.assertIs(model.dependency_graph(), graph)
+        self.assertIn("doubleStaff", graph)
+        self.assertIn("doubleStaff", graph.affected(["staff"]))
+
+    def test_scan_kinds(self):
+        self.assertEqual(_scan("lambda model, t: 0.5")[2], TIME_INVARIANT)
+        self.assertEqual(_scan("lambda model, t: model.memoize('a',t) * model.dt")[2], TIME_INVARIANT)
+        self.assertEqual(_scan("lambda model, t: model._lookup(model.memoize('a',t), 'points')")[2], TIME_INVARIANT)
+        self.assertEqual(_scan("lambda model, t: (1.0 if t>5.0 else 0.0)")[2], TIME_ONLY)
+        self.assertEqual(_scan("lambda model, t: model.memoize('a',t-model.dt)")[2], STATE)
+        self.assertEqual(_scan("lambda model, t: (random.uniform(0,1) )")[2], STATE)
+        self.assertEqual(_scan("lambda model, t: (np.random.normal(0,1) )")[2], STATE)
+        self.assertEqual(_scan("lambda model, t: model.fn['f'](model, t)")[2], STATE)
+        self.assertEqual(_scan("lambda model, t: model.memoize('a',")[2], STATE)
+
+    def test_classify(self):
+        model = build_project_model()
+        kinds = model.equation_kinds()
+
+        self.assertEqual(kinds["deadline"], TIME_INVARIANT)
+        self.assertEqual(kinds["currentTime"], TIME_ONLY)
+        self.assertEqual(kinds["remainingTime"], TIME_ONLY)
+        for name in ["openTasks", "completionRate", "schedulePressure", "productivity"]:
+            self.assertEqual(kinds[name], STATE)
+
+        # constants set by a scenario keep their kind, functions of unknown kind are state
+        model.equations["deadline"] = compile_constant(80.0)
+        self.assertEqual(model.equation_kinds()["remainingTime"], TIME_ONLY)
+        model.equations["deadline"] = lambda t: 80.0
+        self.assertEqual(model.equation_kinds()["remainingTime"], STATE)
+
+    def test_classify_cycles(self):
+        graph = DependencyGraph(
+            {"a": ["b"], "b": ["a"], "c": ["a"], "d": [], "e": ["unknown"]},
+            kinds={"a": TIME_INVARIANT, "b": TIME_INVARIANT, "c": TIME_INVARIANT, "d": TIME_ONLY, "e": TIME_INVARIANT}
+        )
+
+        self.assertEqual(graph.classify(), {"a": STATE, "b": STATE, "c": STATE, "d": TIME_ONLY, "e": STATE})
+        self.assertEqual(graph.classify(["d"]), {"d": TIME_ONLY})
+
+    def test_pruned_run(self):
+        memo_model = build_project_model()
+        for engine in ["forward", "compiled"]:
+            model = build_project_model(engine=engine)
+            stepper = model.run_forward(equations=["remainingTime"])
+
+            self.assertEqual(set(stepper.order), {"remainingTime", "deadline", "currentTime"})
+            self.assertEqual(model.memoize("remainingTime", 50.0), memo_model.memoize("remainingTime", 50.0))
+
+            # requesting further equations extends the stepper
+            stepper = model.run_forward(equations=["productivity"])
+            self.assertIn("remainingTime", stepper.rows)
+            self.assertNotIn("closedTasks", stepper.rows)
+            self.assertEqual(model.memoize("productivity", 80.0), memo_model.memoize("productivity", 80.0))
+
+
+class TestDependencyGraphPlugin(unittest.TestCase):
+    def setUp(self):
+        self.IR = {
+            "models": {
+                "test": {
+                    "entities": {
+                        "stock": [
+                            {"name": "stock", "labels": [], "equation_parsed": [{"type": "identifier", "name": "Inflow"}]}
+                        ],
+                        "flow": [
+                            {"name": "inflow", "labels": [], "equation_parsed": [
+                                {"type": "operator", "name": "+", "args": [
+                                    {"type": "identifier", "name": "rate"},
+                                    {"type": "call", "name": "delay", "args": [{"type": "identifier", "name": "stock"}, {"type": "number", "name": "1"}]}
+                                ]}
+                            ]}
+                        ],
+                        "converter": [
+                            {"name": "rate", "labels": ["1"], "equation_parsed": [{"type": "number", "name": "1"}]},
+                            {"name": "rate", "labels": ["2"], "equation_parsed": [
+                                {"type": "array", "name": "rate", "args": [{"type": "label", "name": "1"}]}
+                            ]},
+                            {"name": "total", "labels": [], "equation_parsed": [
+                                {"type": "call", "name": "sum", "args": [
+                                    {"type": "array", "name": "rate", "args": [{"type": "label", "name": "*"}]}
+                                ]}
+                            ]}
+                        ]
+                    }
+                }
+            }
+        }
+
+    def test_equation_name(self):
+        self.assertEqual(equation_name({"name": "stock", "labels": []}), "stock")
+        self.assertEqual(equation_name({"name": "stock", "labels": "1"}), "stock[1]")
+        self.assertEqual(equation_name({"name": "stock", "labels": ["1", "2"]}), "stock[1,2]")
+
+    def test_dependency_graph(self):
+        IR = dependencyGraph(self.IR)
+
+        self.assertEqual(IR["dependencies"]["stock"], ["inflow"])
+        # rate only exists as arrayed elements, delay reads stock at earlier timesteps
+        self.assertEqual(IR["dependencies"]["inflow"], ["stock"])
+        self.assertEqual(IR["same_step_dependencies"]["inflow"], [])
+        self.assertEqual(IR["dependencies"]["rate[2]"], ["rate[1]"])
+        self.assertEqual(sorted(IR["dependencies"]["total"]), ["rate[1]", "rate[2]"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,11 +1,13 @@
 import unittest
 
 from BPTK_Py import Model
+from BPTK_Py import sd_functions as sd
 
 from BPTK_Py.sddsl.element import Element, ElementError
 from BPTK_Py.sddsl.stock import Stock
 from BPTK_Py.sddsl.operators import ArrayedEquation
 
+import numpy as np
 import pandas as pd
 
 class TestElement(unittest.TestCase):
@@ -211,6 +213,147 @@ class TestElement(unittest.TestCase):
         self.assertTrue(dataframe.equals(pd.DataFrame({"value1": [1.0, 5.0, 9.0], "value2": [1.0, 7.0, 13.0]}, index=[0.0, 1.0, 2.0])))
         self.assertIsNone(result.plot(starttime=0,stoptime=2,dt=1,return_df=False))
 
+    def testElement_setup_array(self):
+        model = Model(starttime=0.0, stoptime=2.0, dt=1.0, name="TestModel")
+
+        stock = model.stock("stock")
+        stock.setup_array((2, 3), 1.0)
+        rate = model.constant("rate")
+        rate.equation = [0.5, 1.0, 2.0]
+        flow = model.flow("flow")
+        flow.equation = stock * rate
+        stock.equation = flow
+        scalar = model.converter("scalar")
+        scalar.equation = 1.0
+
+        # no sub-elements are created, the values are NumPy arrays
+        self.assertFalse(stock.arrayed)
+        self.assertEqual(model.stocks.keys(), {"stock"})
+        self.assertEqual(stock.shape, (2, 3))
+        self.assertEqual(rate.shape, (3,))
+        self.assertEqual(flow.shape, (2, 3))
+        self.assertIsNone(scalar.shape)
+
+        self.assertTrue(np.array_equal(model.evaluate_equation("stock", 2.0), np.array([[2.25, 4.0, 9.0], [2.25, 4.0, 9.0]])))
+        entry = model.converter("entry")
+        entry.equation = stock[1, 2]
+        self.assertEqual(entry(2.0), 9.0)
+
+        self.assertRaises(Exception, stock.setup_array, (2, 2), [1.0, 2.0, 3.0])
+        self.assertRaises(Exception, scalar.__getitem__, 0)
+
+    def testElement_array_operators(self):
+        model = Model(starttime=0.0, stoptime=1.0, dt=1.0, name="TestModel")
+
+        values = model.constant("values")
+        values.equation = [[3.0, 6.0], [2.0, 4.0]]
+        vector = model.constant("vector")
+        vector.setup_array(2, [1.0, 2.0])
+        converter = model.converter("converter")
+
+        def evaluate(equation):
+            converter.equation = equation
+            return model.evaluate_equation("converter", 1.0)
+
+        self.assertEqual(evaluate(values.arr_sum()), 15.0)
+        self.assertEqual(evaluate(values.arr_prod()), 144.0)
+        self.assertEqual(evaluate(values.arr_mean()), 3.75)
+        self.assertEqual(evaluate(values.arr_median()), 3.5)
+        self.assertEqual(evaluate(values.arr_rank(2)), 4.0)
+        self.assertEqual(evaluate(values.arr_rank(-1)), 2.0)
+        self.assertEqual(evaluate(values.arr_size()), 2.0)
+        self.assertEqual(evaluate(vector.dot(vector)), 5.0)
+        self.assertTrue(np.array_equal(evaluate(values.dot(vector)), np.array([15.0, 10.0])))
+        self.assertEqual(converter.shape, (2,))
+        self.assertTrue(np.array_equal(evaluate(sd.max(values, 3.5)), np.array([[3.5, 6.0], [3.5, 4.0]])))
+        self.assertTrue(np.array_equal(evaluate(sd.If(sd.And(values > 2.0, values < 5.0), values, 0.0)), np.array([[3.0, 0.0], [0.0, 4.0]])))
+        self.assertEqual(evaluate(values[0, 1] + vector[1]), 8.0)
+
+        # scalar elements keep the Python builtins
+        self.assertEqual(evaluate(sd.max(vector[0], 3.5)), 3.5)
+        self.assertIn("max(", converter.function_string)
+
+        other = model.constant("other")
+        other.equation = [1.0, 2.0, 3.0]
+        self.assertRaises(Exception, values.dot(other).ndarray_shape)
+        self.assertRaises(ValueError, evaluate, values.dot(other))
+
+    def testElement_array_plot(self):
+        model = Model(starttime=0.0, stoptime=2.0, dt=1.0, name="TestModel")
+
+        stock = model.stock("stock")
+        stock.setup_array(2, [1.0, 2.0])
+        flow = model.flow("flow")
+        flow.equation = stock * 1.0
+        stock.equation = flow
+
+        dataframe = stock.plot(return_df=True)
+
+        self.assertTrue(dataframe.equals(pd.DataFrame({"stock[0]": [1.0, 2.0, 4.0], "stock[1]": [2.0, 4.0, 8.0]}, index=[0.0, 1.0, 2.0])))
+
+    def testElement_array_shape_cache(self):
+        model = Model(starttime=0.0, stoptime=2.0, dt=1.0, name="TestModel")
+
+        stock = model.stock("stock")
+        flow = model.flow("flow")
+        flow.equation = stock * 0.5
+        stock.equation = flow
+
+        # scalar models never resolve shapes
+        self.assertIsNone(flow.shape)
+        self.assertFalse(model._array_values)
+        self.assertEqual(model._shapes, {})
+
+        stock.initial_value = np.array([1.0, 2.0])
+        self.assertTrue(model._array_values)
+        self.assertEqual(flow.shape, (2,))
+        self.assertEqual(model._shapes, {"flow": (2,)})
+
+        # changing an equation forgets the resolved shapes
+        stock.initial_value = 1.0
+        self.assertEqual(model._shapes, {})
+        self.assertIsNone(flow.shape)
+
+        converter = model.converter("converter")
+        converter.equation = stock + np.array([[1.0], [2.0]])
+        self.assertEqual(converter.shape, (2, 1))
+
+    @staticmethod
+    def _chain_model(size):
+        model = Model(starttime=0.0, stoptime=2.0, dt=1.0, name="TestModel")
+        previous = None
+        for i in range(size):
+            stock = model.stock("stock{}".format(i))
+            flow = model.flow("flow{}".format(i))
+            converter = model.converter("converter{}".format(i))
+            stock.initial_value = 1.0
+            converter.equation = (previous if previous is not None else stock) * 0.1
+            flow.equation = converter + stock * 0.01
+            stock.equation = flow
+            previous = stock
+        return model
+
+    def testElement_scalar_model_construction(self):
+        from unittest import mock
+        from BPTK_Py.sddsl.operators import Operator
+
+        operands = Operator.operands
+        calls = []
+
+        def counting_operands(operator):
+            calls.append(operator)
+            return operands(operator)
+
+        # building a flow does not walk the upstream equations of scalar models, so the work per element is constant
+        with mock.patch.object(Operator, "operands", counting_operands):
+            self._chain_model(200)
+            small = len(calls)
+            calls.clear()
+            self._chain_model(400)
+            large = len(calls)
+
+        self.assertLessEqual(large, 2 * small)
+
 class TestElementError(unittest.TestCase):
     def setUp(self):
         pass
@@ -0,0 +1,100 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+
+from BPTK_Py import Model
+from BPTK_Py import sd_functions as sd
+from BPTK_Py.sdsimulation import Ensemble, run_ensemble
+from BPTK_Py.modeling.stepCompiler import vector_max, vector_min
+
+from .test_forwardStepper import build_project_model
+
+
+def build_growth_model(rate=0.1, capacity=1000.0):
+    model = Model(starttime=0.0, stoptime=50.0, dt=0.5, name="growth")
+
+    population = model.stock("population")
+    births = model.flow("births")
+    deaths = model.flow("deaths")
+    growthRate = model.constant("growthRate")
+    carryingCapacity = model.constant("carryingCapacity")
+    crowding = model.converter("crowding")
+
+    population.initial_value = 10.0
+    growthRate.equation = rate
+    carryingCapacity.equation = capacity
+    crowding.equation = sd.min(population / carryingCapacity, 1.0)
+    births.equation = growthRate * population * (1.0 - crowding)
+    deaths.equation = population * 0.01
+    population.equation = births - deaths
+
+    return model
+
+
+def member_results(model, equations):
+    return np.array([[model.evaluate_equation(equation, t) for equation in equations] for t in np.arange(model.starttime, model.stoptime + model.dt, model.dt)])
+
+
+class TestEnsemble(unittest.TestCase):
+    def test_vector_builtins(self):
+        self.assertEqual(vector_max(0, 2.0), 2.0)
+        self.assertEqual(vector_min([3.0, 1.0]), 1.0)
+        self.assertTrue(np.array_equal(vector_max(0.0, np.array([-1.0, 1.0])), np.array([0.0, 1.0])))
+        self.assertTrue(np.array_equal(vector_min(np.array([-1.0, 1.0]), 0.5), np.array([-1.0, 0.5])))
+
+    def test_vectorized_run(self):
+        equations = ["population", "births"]
+        parameters = pd.DataFrame({"growthRate": [0.05, 0.1, 0.2], "carryingCapacity": [500.0, 1000.0, 2000.0]})
+
+        result = run_ensemble(build_growth_model(), parameters, equations)
+
+        self.assertEqual(result.shape, (3, 101, 2))
+        for member, (rate, capacity) in enumerate(zip(parameters["growthRate"], parameters["carryingCapacity"])):
+            self.assertTrue(np.array_equal(result[member], member_results(build_growth_model(rate, capacity), equations)))
+
+    def test_vectorized_lookup(self):
+        equations = ["openTasks", "productivity"]
+        parameters = {"deadline": [80.0, 100.0]}
+
+        result = run_ensemble(build_project_model(), parameters, equations)
+
+        for member, deadline in enumerate(parameters["deadline"]):
+            model = build_project_model()
+            model.constants["deadline"].equation = deadline
+            self.assertTrue(np.array_equal(result[member], member_results(model, equations)))
+
+    def test_members_fallback(self):
+        # conditions are evaluated for scalars only, so this ensemble is run member by member
+        def build_model(threshold=50.0):
+            model = build_growth_model()
+            limit = model.constant("limit")
+            capped = model.converter("capped")
+            limit.equation = threshold
+            capped.equation = sd.If(model.stocks["population"] > limit, limit, model.stocks["population"])
+            return model
+
+        equations = ["population", "capped"]
+        parameters = {"limit": [20.0, 50.0]}
+
+        result = run_ensemble(build_model(), parameters, equations)
+
+        for member, threshold in enumerate(parameters["limit"]):
+            self.assertTrue(np.array_equal(result[member], member_results(build_model(threshold), equations)))
+
+    def test_model_is_restored(self):
+        model = build_growth_model()
+        births = model.equations["births"]
+        expected = model.evaluate_equation("population", 50.0)
+        memo = model.memo
+
+        Ensemble(model, {"growthRate": [0.3, 0.4]}, ["population"]).run()
+
+        self.assertIs(model.equations["births"], births)
+        self.assertIs(model.memo, memo)
+        self.assertEqual(model.evaluate_equation("population", 50.0), expected)
+        self.assertEqual(model.evaluate_equation("growthRate", 0.0), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
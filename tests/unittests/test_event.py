@@ -1,6 +1,6 @@
 import unittest
 
-from BPTK_Py import Event, DelayedEvent
+from BPTK_Py import Event, DelayedEvent, MulticastEvent
 
 class TestEvent(unittest.TestCase):
     def setUp(self):
@@ -20,5 +20,19 @@ class TestEvent(unittest.TestCase):
 
         self.assertRaises(ValueError, DelayedEvent, name="test", sender_id=1, receiver_id=0,delay="1", data=[0])
 
+    def testMulticastEventInit(self):
+        event = MulticastEvent(name="test", sender_id=1, data=[0], receiver_ids=[2, 3])
+        self.assertEqual(event.receiver_ids, (2, 3))
+        self.assertIsNone(event.receiver_id)
+        self.assertIsNone(event.agent_type)
+        self.assertRaises(AttributeError, setattr, event, "data", [1])
+
+        event = MulticastEvent(name="test", sender_id=1, agent_type="testAgent", state="active")
+        self.assertEqual((event.agent_type, event.state, event.receiver_ids), ("testAgent", "active", None))
+
+        self.assertRaises(ValueError, MulticastEvent, name="test", sender_id=1)
+        self.assertRaises(ValueError, MulticastEvent, name="test", sender_id=1, agent_type="testAgent", receiver_ids=[2])
+        self.assertRaises(ValueError, MulticastEvent, name="test", sender_id=1, state="active", receiver_ids=[2])
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,81 @@
+import unittest
+
+from BPTK_Py import DelayedEvent, Event, Model, MulticastEvent
+from BPTK_Py.modeling.eventBus import EventBus, delay_steps
+
+
+class TestEventBus(unittest.TestCase):
+    def test_delay_steps(self):
+        self.assertEqual(delay_steps(0, 1), 0)
+        self.assertEqual(delay_steps(-1, 1), 0)
+        self.assertEqual(delay_steps(2, 1), 2)
+        self.assertEqual(delay_steps(1.5, 1), 2)
+        self.assertEqual(delay_steps(0.3, 0.1), 3)
+
+    def test_behaves_like_list(self):
+        first = Event("a", 1, 2)
+        second = Event("b", 1, 3)
+        delayed = DelayedEvent("c", 1, 2, delay=1)
+
+        bus = EventBus([first])
+        bus.append(delayed)
+        bus += [second]
+
+        self.assertEqual(len(bus), 3)
+        self.assertEqual(bus, [first, second, delayed])
+        self.assertEqual(bus[0], first)
+        self.assertIn(delayed, list(bus))
+
+        bus.clear()
+        self.assertEqual(bus, [])
+        self.assertEqual(len(bus), 0)
+
+    def test_due(self):
+        bus = EventBus()
+        immediate = [Event("a", 1, 2, 0), Event("a", 1, 3, 1), Event("a", 1, 2, 2)]
+        delayed = [DelayedEvent("d", 1, 2, delay=2, data=3), DelayedEvent("d", 1, 3, delay=0, data=4)]
+        bus += delayed + immediate
+
+        # events that are not delayed, or whose delay is 0, are due in the next step
+        due = bus.due(1)
+        self.assertEqual({receiver: [event.data for event in events] for receiver, events in due.items()}, {2: [0, 2], 3: [1, 4]})
+        self.assertEqual(len(bus), 1)
+
+        self.assertEqual(bus.due(1), {})
+        self.assertEqual(bus.due(1)[2], [delayed[0]])
+        self.assertEqual(len(bus), 0)
+        self.assertEqual(delayed[0].delay, 2)
+
+    def test_delay_starts_when_seen(self):
+        bus = EventBus()
+        bus.due(1)
+        bus.due(1)
+
+        event = DelayedEvent("d", 1, 2, delay=1)
+        bus.append(event)
+
+        self.assertEqual(bus.due(1), {})
+        self.assertEqual(bus.due(1), {2: [event]})
+
+    def test_multicasts(self):
+        bus = EventBus()
+        multicast = MulticastEvent("m", 1, agent_type="a")
+        event = Event("a", 1, 2)
+        bus += [multicast, event]
+
+        self.assertEqual(len(bus), 2)
+        self.assertEqual(bus.due(1), {2: [event]})
+        self.assertEqual(bus.due_multicasts(), [multicast])
+        self.assertEqual(bus.due_multicasts(), [])
+        self.assertEqual(len(bus), 0)
+
+    def test_model_events(self):
+        model = Model()
+        model.events = [Event("a", 1, 2)]
+
+        self.assertIsInstance(model.events, EventBus)
+        self.assertEqual(len(model.events), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,5 @@
 import unittest
-from unittest.mock import mock_open, patch
+from unittest.mock import mock_open, patch, MagicMock
 from BPTK_Py.scenariomanager.scenario_manager_factory import ScenarioManagerFactory
 import os, json
 from BPTK_Py import Model
@@ -37,6 +37,23 @@ class TestScenarioManagerFactory(unittest.TestCase):
 
         self.assertIn(f"[ERROR] No parser available for file {testFile}. Skipping!", content)  
 
+    @patch("BPTK_Py.scenariomanager.scenario_manager_factory.compile_xmile_parallel")
+    def test_instantiate_models(self, mock_compile):
+        sm = ScenarioManagerFactory(start_model_monitor=False, start_scenario_monitor=False)
+
+        managers = [MagicMock(source="a.stmx", model_file="a"), MagicMock(source="b.stmx", model_file="b"), MagicMock(source="c.stmx", model_file="c")]
+        managers[0].needs_compilation.return_value = True
+        managers[1].needs_compilation.return_value = True
+        managers[2].needs_compilation.return_value = False
+        mock_compile.return_value = {"a.stmx": (0.5, None), "b.stmx": (0.25, "error")}
+
+        sm._ScenarioManagerFactory__instantiate_models(managers)
+
+        self.assertEqual(mock_compile.call_args[0][0], [("a.stmx", "a.py"), ("b.stmx", "b.py")])
+        self.assertEqual(sm.compile_timings, {"a.stmx": 0.5})
+        for manager in managers:
+            manager.instantiate_model.assert_called_once()
+
     def test_reset_scenarios(self):
         currentDir = os.path.abspath(os.getcwd())
         testDir = os.path.join(currentDir,"tests","unittests","test_factory_sd_runner","scenarios")
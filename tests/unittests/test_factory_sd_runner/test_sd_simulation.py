@@ -52,6 +52,25 @@ class TestSdRunner(unittest.TestCase):
         expected_filename = f"results/results_testSimulation_{datestring}.csv"
         mock_to_csv.assert_called_once_with(expected_filename)
 
+    def test_start_frame(self):
+        model = simulation_model()
+        sdSimulation = SdSimulation(model=model, name="testSimulation")
+
+        df = sdSimulation.start(output=["frame"], equations=["totalValue", "unknown", "interest", "interestRate"])
+
+        # all equations are simulated in one pass, unknown equations are skipped
+        self.assertEqual(list(df.columns), ["totalValue", "interest", "interestRate"])
+        self.assertEqual(list(df.index), [float(t) for t in range(16)])
+        self.assertEqual(df.index.name, "t")
+        for equation in df.columns:
+            for t in df.index:
+                self.assertEqual(df[equation][t], model.equation(equation, t))
+        self.assertEqual(sdSimulation.finished_simulations_count, 3)
+
+        df = sdSimulation.start(output=["frame"], start=5.0, until=5.0, equations=["totalValue"])
+        self.assertEqual(list(df.index), [5.0])
+        self.assertEqual(df["totalValue"][5.0], model.equation("totalValue", 5.0))
+
     def test_change_equation(self):
         model = simulation_model()
         sdSimulation = SdSimulation(model=model, name="testSimulation")  
@@ -62,6 +81,15 @@ class TestSdRunner(unittest.TestCase):
         self.assertEqual(sdSimulation.mod.equations["totalValue"](1),1000.0)
         self.assertEqual(sdSimulation.mod.equations["totalValue"](2),1000.0)
 
+        sdSimulation.change_equation(name="interestRate",value=0.5)
+        sdSimulation.change_equation(name="depositRate",value="1/4")
+        sdSimulation.change_equation(name="initialValue",value="1 +")
+
+        self.assertEqual(sdSimulation.mod.equations["interestRate"](3),0.5)
+        self.assertEqual(sdSimulation.mod.equations["depositRate"](3),0.25)
+        # invalid expressions are rejected when they are set, the equation is kept
+        self.assertEqual(sdSimulation.mod.equations["initialValue"](0),model.equation("initialValue",0))
+
     def test_change_points(self):
         model = simulation_model()
         model.points = {"a": "1+1"}
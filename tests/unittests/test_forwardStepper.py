@@ -0,0 +1,169 @@
+import unittest
+
+import numpy as np
+
+from BPTK_Py import Model
+from BPTK_Py import sd_functions as sd
+from BPTK_Py.sdsimulation import SdSimulation
+from BPTK_Py.modeling.forwardStepper import ForwardStepper
+from BPTK_Py.modeling.dependencyGraph import _same_step_dependencies
+
+
+def build_project_model(engine="memo", stoptime=120.0, dt=1.0):
+    model = Model(starttime=0.0, stoptime=stoptime, dt=dt, name="SimpleProjectManagement", engine=engine)
+
+    openTasks = model.stock("openTasks")
+    closedTasks = model.stock("closedTasks")
+    staff = model.stock("staff")
+    completionRate = model.flow("completionRate")
+    currentTime = model.converter("currentTime")
+    remainingTime = model.converter("remainingTime")
+    schedulePressure = model.converter("schedulePressure")
+    productivity = model.converter("productivity")
+    deadline = model.constant("deadline")
+    effortPerTask = model.constant("effortPerTask")
+    initialStaff = model.constant("initialStaff")
+    initialOpenTasks = model.constant("initialOpenTasks")
+
+    closedTasks.initial_value = 0.0
+    staff.initial_value = initialStaff
+    openTasks.initial_value = initialOpenTasks
+    deadline.equation = 100.0
+    effortPerTask.equation = 1.0
+    initialStaff.equation = 1.0
+    initialOpenTasks.equation = 100.0
+
+    currentTime.equation = sd.time()
+    remainingTime.equation = deadline - currentTime
+    openTasks.equation = -completionRate
+    closedTasks.equation = completionRate
+
+    schedulePressure.equation = sd.min((openTasks * effortPerTask) / (staff * sd.max(remainingTime, 1)), 2.5)
+
+    model.points["productivity"] = [[0, 0.4], [0.25, 0.444], [0.5, 0.506], [0.75, 0.594], [1, 1], [1.25, 1.119],
+                                    [1.5, 1.1625], [1.75, 1.2125], [2, 1.2375], [2.25, 1.245], [2.5, 1.25]]
+
+    productivity.equation = sd.lookup(schedulePressure, "productivity")
+    completionRate.equation = sd.max(0.0, sd.min(openTasks, staff * (productivity / effortPerTask)))
+
+    return model
+
+
+class TestForwardStepper(unittest.TestCase):
+    def test_same_step_dependencies(self):
+        function_string = "lambda model, t : ( (0.0) if (t <= model.starttime) else (model.memoize('stock',t-model.dt))+ model.dt*(model.memoize('flow',t-model.dt)) )"
+        self.assertEqual(_same_step_dependencies(function_string), [])
+
+        function_string = "lambda model, t: max( model.memoize('a',t), model.memoize('b',t-model.dt)) + model.memoize('c',t)"
+        self.assertEqual(sorted(_same_step_dependencies(function_string)), ["a", "c"])
+
+        self.assertEqual(_same_step_dependencies("lambda model, t: ("), [])
+
+    def test_sort_equations(self):
+        model = build_project_model()
+        order = ForwardStepper(model).order
+
+        self.assertEqual(sorted(order), sorted(model.equations.keys()))
+        self.assertLess(order.index("initialOpenTasks"), order.index("openTasks"))
+        self.assertLess(order.index("openTasks"), order.index("schedulePressure"))
+        self.assertLess(order.index("schedulePressure"), order.index("productivity"))
+        self.assertLess(order.index("productivity"), order.index("completionRate"))
+
+    def test_run_matches_memo_engine(self):
+        memo_model = build_project_model()
+        forward_model = build_project_model(engine="forward")
+
+        stepper = forward_model.run_forward()
+
+        self.assertEqual(stepper.values.shape, (len(forward_model.equations), 121))
+        self.assertEqual(stepper.values.dtype, np.float64)
+
+        for equation in memo_model.equations:
+            for t in range(0, 121):
+                self.assertEqual(stepper.value(equation, float(t)), memo_model.evaluate_equation(equation, t))
+                self.assertEqual(forward_model.evaluate_equation(equation, t), memo_model.evaluate_equation(equation, t))
+
+    def test_run_until(self):
+        model = build_project_model(engine="forward")
+
+        stepper = model.run_forward(until=10.0)
+        self.assertFalse(np.isnan(stepper.values[:, 10]).any())
+        self.assertTrue(np.isnan(stepper.values[:, 11]).all())
+        self.assertNotIn(11.0, model.memo["openTasks"])
+
+        self.assertIs(model.run_forward(), stepper)
+        self.assertFalse(np.isnan(stepper.values).any())
+
+    def test_no_recursion_limit(self):
+        model = Model(starttime=0.0, stoptime=20000.0, dt=1.0, name="deep", engine="forward")
+        stock = model.stock("stock")
+        flow = model.flow("flow")
+        stock.initial_value = 0.0
+        flow.equation = 1.0
+        stock.equation = flow
+
+        model.run_forward()
+
+        self.assertEqual(model.evaluate_equation("stock", 20000.0), 20000.0)
+
+    def test_array_elements(self):
+        from unittest import mock
+
+        def build(engine):
+            model = Model(starttime=0.0, stoptime=3.0, dt=1.0, name="arrays", engine=engine)
+            stock = model.stock("stock")
+            flow = model.flow("flow")
+            total = model.converter("total")
+            stock.setup_array(2, [1.0, 2.0])
+            flow.equation = stock * 0.5
+            stock.equation = flow
+            total.equation = stock[0] + stock[1]
+            return model
+
+        memo_model = build("memo")
+        forward_model = build("forward")
+
+        # the array rows are skipped and logged once, the scalar rows are filled
+        with mock.patch("BPTK_Py.modeling.forwardStepper.log") as log:
+            stepper = forward_model.run_forward(until=1.0)
+            self.assertIs(forward_model.run_forward(), stepper)
+
+        self.assertEqual(log.call_count, 1)
+        self.assertIn("Equations {} do not have scalar values".format(", ".join(stepper.non_scalar)), log.call_args[0][0])
+        self.assertEqual(sorted(stepper.non_scalar), ["flow", "stock"])
+        self.assertTrue(np.isnan(stepper.values[stepper.rows["stock"]]).all())
+        self.assertTrue(np.isnan(stepper.values[stepper.rows["flow"]]).all())
+
+        for t in range(0, 4):
+            self.assertEqual(stepper.value("total", float(t)), memo_model.evaluate_equation("total", t))
+            self.assertTrue(np.array_equal(forward_model.evaluate_equation("stock", t), memo_model.evaluate_equation("stock", t)))
+
+    def test_reset_cache_discards_stepper(self):
+        model = build_project_model(engine="forward")
+        stepper = model.run_forward()
+
+        model.constants["deadline"].equation = 50.0
+        self.assertIsNot(model.run_forward(), stepper)
+
+    def test_frame(self):
+        model = build_project_model(engine="forward")
+        df = model.run_forward().frame(["openTasks", "closedTasks"], start=1.0, until=5.0)
+
+        self.assertEqual(list(df.columns), ["openTasks", "closedTasks"])
+        self.assertEqual(list(df.index), [1.0, 2.0, 3.0, 4.0, 5.0])
+        self.assertEqual(df.index.name, "t")
+
+    def test_sd_simulation(self):
+        equations = ["openTasks", "closedTasks", "completionRate", "productivity"]
+
+        memo_df = SdSimulation(model=build_project_model()).start(output=["frame"], equations=equations)
+        forward_df = SdSimulation(model=build_project_model(engine="forward")).start(output=["frame"], equations=equations)
+
+        self.assertTrue(memo_df.equals(forward_df))
+
+    def test_invalid_engine(self):
+        self.assertRaises(ValueError, Model, engine="unknown")
+
+
+if __name__ == '__main__':
+    unittest.main()
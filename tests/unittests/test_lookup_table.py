@@ -0,0 +1,66 @@
+import unittest
+
+import numpy as np
+from scipy.interpolate import interp1d
+
+from BPTK_Py.util import LookupTable, PointsStore
+
+from .test_forwardStepper import build_project_model
+
+
+POINTS = [[0, 0.4], [0.25, 0.444], [0.5, 0.506], [0.75, 0.594], [1, 1], [1.25, 1.119], [1.5, 1.1625]]
+
+
+class TestLookupTable(unittest.TestCase):
+    def test_matches_interp1d(self):
+        table = LookupTable(POINTS)
+        x, y = zip(*POINTS)
+        reference = interp1d(x, y, kind="linear", fill_value=(y[0], y[-1]), bounds_error=False)
+
+        for value in [-1.0, 0.0, 0.1, 0.25, 0.6, 1.0, 1.4, 1.5, 3.0]:
+            self.assertAlmostEqual(table(value), float(reference(value)), places=12)
+
+    def test_unsorted_points(self):
+        table = LookupTable([[1.0, 10.0], [0.0, 0.0], [2.0, 0.0]])
+
+        self.assertEqual(list(table.x), [0.0, 1.0, 2.0])
+        self.assertEqual(table(0.5), 5.0)
+        self.assertEqual(table(1.5), 5.0)
+        self.assertEqual(len(table), 3)
+
+    def test_array_lookup(self):
+        table = LookupTable(POINTS)
+        values = np.array([-1.0, 0.1, 0.6, 1.2, 3.0])
+
+        self.assertEqual(list(table(values)), [table(value) for value in values])
+
+
+class TestPointsStore(unittest.TestCase):
+    def test_tables_are_cached(self):
+        points = PointsStore({"gf": POINTS})
+        table = points.table("gf")
+
+        self.assertIs(points.table("gf"), table)
+
+        points["gf"] = [[0.0, 1.0], [1.0, 2.0]]
+        self.assertIsNot(points.table("gf"), table)
+        self.assertEqual(points.table("gf")(0.5), 1.5)
+
+        points.pop("gf")
+        self.assertEqual(points.tables, {})
+
+    def test_model_lookup(self):
+        model = build_project_model()
+
+        self.assertIsInstance(model.points, PointsStore)
+        self.assertIs(model.lookup_table("productivity"), model.points.table("productivity"))
+        self.assertEqual(model._lookup(0.5, "productivity"), 0.506)
+        self.assertEqual(model._lookup(0.5, [[0.0, 0.0], [1.0, 1.0]]), 0.5)
+
+        model.points = {"productivity": [[0.0, 1.0], [1.0, 1.0]]}
+        self.assertIsInstance(model.points, PointsStore)
+        self.assertEqual(model._lookup(0.5, "productivity"), 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,7 @@
 import unittest
 
 from BPTK_Py import Model, Agent, Event, DataCollector
+from BPTK_Py import sd_functions as sd
 import BPTK_Py.logger.logger as logmod
 
 class Test_Model(unittest.TestCase):
@@ -84,6 +85,217 @@ class Test_Model(unittest.TestCase):
         for agent in model.agents:
             self.assertEqual(agent.reset_cache_called,1)             
 
+    def test_invalidate_cache(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0)
+        stock = model.stock("stock")
+        flow = model.flow("flow")
+        rate = model.constant("rate")
+        other = model.converter("other")
+        stock.initial_value = 0.0
+        rate.equation = 1.0
+        flow.equation = rate
+        stock.equation = flow
+        other.equation = 5.0
+
+        self.assertEqual(model.evaluate_equation("stock", 10.0), 10.0)
+        self.assertEqual(model.evaluate_equation("other", 10.0), 5.0)
+
+        model.equations["rate"] = lambda t: 2.0
+        self.assertEqual(model.invalidate_cache(["rate"]), {"rate", "flow", "stock"})
+
+        self.assertEqual(model.memo["other"], {10.0: 5.0})
+        self.assertEqual(model.memo["stock"], {})
+        self.assertEqual(model.evaluate_equation("stock", 10.0), 20.0)
+
+        # changing the equation of an element invalidates its dependents only
+        other.equation = 6.0
+        self.assertEqual(model.memo["stock"][10.0], 20.0)
+        self.assertEqual(model.evaluate_equation("other", 10.0), 6.0)
+
+    def test_invalidate_cache_after_prepare_run(self):
+        def build(engine):
+            model = Model(starttime=0.0, stoptime=4.0, dt=1.0, engine=engine)
+            stock = model.stock("stock")
+            flow = model.flow("flow")
+            converter = model.converter("converter")
+            rate = model.constant("rate")
+            rate.equation = 1.0
+            stock.initial_value = 0.0
+            flow.equation = rate
+            stock.equation = flow
+            converter.equation = rate * 2.0
+            return model
+
+        def values(model):
+            return [model.evaluate_equation(name, 4.0) for name in ["stock", "flow", "converter"]]
+
+        # the value of the constant is kept in the single slot of its memo only
+        model = build("memo")
+        model.prepare_run()
+        self.assertEqual(values(model), [4.0, 1.0, 2.0])
+        self.assertTrue(model.memo["rate"].invariant)
+
+        model.constants["rate"].equation = 5.0
+        model.prepare_run()
+        self.assertEqual(values(model), [20.0, 5.0, 10.0])
+
+        # scenarios invalidate the cache before they change their constants
+        self.assertEqual(model.invalidate_cache(["rate"]), {"rate", "flow", "stock", "converter"})
+        model.equations["rate"] = lambda t: 3.0
+        model.prepare_run()
+        self.assertEqual(values(model), [12.0, 3.0, 6.0])
+
+        for engine in ["forward", "compiled"]:
+            model = build(engine)
+            model.run_forward()
+            self.assertEqual(values(model), [4.0, 1.0, 2.0])
+
+            model.constants["rate"].equation = 5.0
+            model.run_forward()
+            self.assertEqual(values(model), [20.0, 5.0, 10.0])
+
+    def test_build(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0)
+
+        with model.build():
+            stock = model.stock("stock")
+            flow = model.flow("flow")
+            rate = model.constant("rate")
+            stock.initial_value = rate
+            rate.equation = 1.0
+            flow.equation = rate * 2.0
+            stock.equation = flow
+
+            # the functions are only generated when the model is frozen
+            self.assertTrue(model._is_deferred(stock))
+            self.assertIn("stock", model.equations)
+
+        self.assertIsNone(model._deferred)
+        self.assertEqual(stock.function_string, "lambda model, t : ( (model.memoize('rate',t)) if (t <= model.starttime) else (model.memoize('stock',t-model.dt))+ model.dt*(model.memoize('flow',t-model.dt)) )")
+        self.assertIs(model.equations["stock"], stock._function)
+        self.assertEqual(model.evaluate_equation("stock", 10.0), 21.0)
+
+        # after the build phase, changes take effect immediately
+        rate.equation = 2.0
+        self.assertEqual(model.evaluate_equation("stock", 10.0), 42.0)
+
+    def test_build_evaluate_freezes(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0)
+
+        with model.build():
+            converter = model.converter("converter")
+            converter.equation = 2.0
+            self.assertEqual(model.evaluate_equation("converter", 1.0), 2.0)
+            self.assertIsNone(model._deferred)
+
+            converter.equation = 3.0
+            self.assertEqual(model.evaluate_equation("converter", 2.0), 3.0)
+
+    def test_freeze_error(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0)
+        model.freeze()
+
+        with self.assertRaises(ZeroDivisionError):
+            with model.build():
+                converter = model.converter("converter")
+                converter.equation = 2.0
+                other = model.converter("other")
+                other.equation = 1.0
+                other.build_function_string = lambda: 1 / 0
+
+        # the failed elements stay deferred
+        self.assertTrue(model._is_deferred(other))
+        self.assertFalse(model._is_deferred(converter))
+        del other.build_function_string
+        model.freeze()
+        self.assertEqual(model.evaluate_equation("other", 1.0), 1.0)
+
+    def test_build_deep_equation(self):
+        model = Model(starttime=0.0, stoptime=2.0, dt=1.0)
+
+        with model.build():
+            converters = [model.converter("converter{}".format(index)) for index in range(2000)]
+            for converter in converters:
+                converter.equation = 1.0
+            total = model.converter("total")
+            total.equation = sum(converters[1:], converters[0] * 1.0)
+
+        self.assertEqual(model.evaluate_equation("total", 1.0), 2000.0)
+
+    def test_build_large_scalar_model(self):
+        from unittest import mock
+        from BPTK_Py.sddsl.element import Element, _compile_function
+        from BPTK_Py.sddsl.flow import Flow
+        from BPTK_Py.sddsl.stock import Stock
+        from BPTK_Py.sddsl.operators import Operator
+        import contextlib
+
+        def construct(model, size, in_build_phase=True):
+            previous = None
+            with (model.build() if in_build_phase else contextlib.nullcontext()):
+                for i in range(size):
+                    stock = model.stock("stock{}".format(i))
+                    flow = model.flow("flow{}".format(i))
+                    converter = model.converter("converter{}".format(i))
+                    stock.initial_value = 1.0
+                    converter.equation = (previous if previous is not None else stock) * 0.1
+                    flow.equation = converter + stock * 0.01
+                    stock.equation = flow
+                    previous = stock
+            return model
+
+        built = []
+        operands = Operator.operands
+        walked = []
+
+        def counting(cls):
+            build_function_string = cls.build_function_string
+            return mock.patch.object(cls, "build_function_string", lambda element: built.append(element.name) or build_function_string(element))
+
+        # function strings built, function strings compiled and operator nodes walked while constructing the model
+        def count(size, in_build_phase=True):
+            built.clear()
+            walked.clear()
+            _compile_function.cache_clear()
+            with counting(Element), counting(Stock), counting(Flow), mock.patch.object(Operator, "operands", lambda operator: walked.append(operator) or operands(operator)):
+                model = construct(Model(starttime=0.0, stoptime=2.0, dt=1.0), size, in_build_phase)
+            return model, (len(built), _compile_function.cache_info().misses, len(walked))
+
+        # each element is built once when the model is frozen, without resolving the shapes of its values
+        model, _ = count(100)
+        self.assertEqual(sorted(built), sorted(model.equations.keys()))
+        self.assertEqual(model._shapes, {})
+        self.assertAlmostEqual(model.evaluate_equation("stock0", 2.0), 1.11 ** 2)
+
+        # building is linear in the size of the model, every 200 chains add the same work, and it does no more work than setting the equations outside of a build phase
+        counts = [count(size)[1] for size in [200, 400, 600]]
+        _, outside = count(600, in_build_phase=False)
+        for small, medium, large, outside_count in zip(*counts, outside):
+            self.assertEqual(large - medium, medium - small)
+            self.assertLessEqual(large, outside_count)
+
+    def test_prepare_run(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0)
+        stock = model.stock("stock")
+        flow = model.flow("flow")
+        rate = model.constant("rate")
+        ramp = model.converter("ramp")
+        stock.initial_value = 0.0
+        rate.equation = 2.0
+        ramp.equation = sd.time() * rate
+        flow.equation = ramp + stock * 0.1
+        stock.equation = flow
+
+        self.assertEqual(model.prepare_run(until=5.0), {"rate": "time_invariant", "ramp": "time_only", "flow": "state", "stock": "state"})
+
+        # the constant keeps a single slot, the time-only converter is evaluated up to the given time at once
+        self.assertTrue(model.memo["rate"].invariant)
+        self.assertEqual(model.memo["ramp"], {t: 2.0 * t for t in range(6)})
+        self.assertEqual(model.memo["stock"], {})
+
+        self.assertEqual(model.evaluate_equation("ramp", 8.0), 16.0)
+        self.assertAlmostEqual(model.evaluate_equation("stock", 3.0), 6.2)
+
     def test_agent_ids(self):
         model = Model()
 
@@ -345,6 +557,35 @@ class Test_Model(unittest.TestCase):
 
         self.assertEqual(model.events,[event])
 
+    def test_multicast_events(self):
+        model = Model()
+        from BPTK_Py import MulticastEvent
+
+        model.register_agent_factory("testAgent", lambda agent_id, model, properties: Agent(agent_id, model, properties, "testAgent"))
+        agents = model.create_agents_bulk("testAgent", 4)
+        agents[1].state = "inactive"
+
+        price = Event("price", 0, None, data={"price": 10})
+        model.broadcast_event("testAgent", price)
+        model.broadcast_event("testAgent", price, state="inactive")
+        model.random_events("testAgent", 3, price)
+
+        self.assertEqual(len(model.events), 3)
+        self.assertTrue(all(isinstance(event, MulticastEvent) and event.data is price.data for event in model.events))
+
+        everyone, inactive, random = model.events
+        self.assertEqual(model.multicast_receivers(everyone), agents)
+        self.assertEqual(model.multicast_receivers(inactive), [agents[1]])
+        self.assertEqual(len(random.receiver_ids), 3)
+
+        # receivers are determined when the event is delivered
+        model.delete_agents([0])
+        self.assertEqual(model.multicast_receivers(everyone), agents[1:])
+        self.assertEqual(model.multicast_receivers(MulticastEvent("price", 0, receiver_ids=[0, 2, 2])), [agents[2], agents[2]])
+
+        model.broadcast_event("testAgent", lambda agent_id: Event("price", 0, agent_id, data=agent_id), state="active")
+        self.assertEqual([event.receiver_id for event in model.events if not isinstance(event, MulticastEvent)], [2, 3])
+
     def test_configure_properties_dict(self):
         model = Model()
 
@@ -370,6 +611,43 @@ class Test_Model(unittest.TestCase):
         self.assertEqual(model.agent_count(agent_type="testType1"),1)    
         self.assertEqual(model.agent_count(agent_type="testType2"),2)      
 
+    def test_create_agents_bulk(self):
+        model = Model()
+        calls = []
+
+        def factory(agent_id, model, properties):
+            calls.append(agent_id)
+            return Agent(agent_id=agent_id, model=model, properties=properties, agent_type="testType1")
+
+        model.register_agent_factory(agent_factory=factory, agent_type="testType1")
+        model.create_agent(agent_type="testType1", agent_properties=None)
+
+        agents = model.create_agents_bulk("testType1", 4, {"size": {"type": "Integer", "value": 3}})
+
+        self.assertEqual(calls, [0, 1])
+        self.assertEqual([agent.id for agent in agents], [1, 2, 3, 4])
+        self.assertEqual(model.agent_ids("testType1"), [0, 1, 2, 3, 4])
+        self.assertEqual(model.next_agent_id, 5)
+        self.assertEqual(model.agent_count_per_state("testType1", "active"), 5)
+        self.assertEqual([agent.size for agent in agents], [3, 3, 3, 3])
+        self.assertEqual(len({id(agent.properties) for agent in agents}), 4)
+        self.assertEqual(model.create_agents_bulk("testType1", 0), [])
+
+    def test_delete_agents_in_state(self):
+        model = Model()
+
+        func = lambda agent_id, model, properties: Agent(agent_id=agent_id, model=model, properties=properties, agent_type="testType1")
+        model.register_agent_factory(agent_factory=func, agent_type="testType1")
+
+        for agent in model.create_agents_bulk("testType1", 6):
+            if agent.id % 2:
+                agent.state = "dead"
+
+        self.assertEqual(sorted(model.delete_agents_in_state("testType1", "dead")), [1, 3, 5])
+        self.assertEqual([agent.id for agent in model.agents], [0, 2, 4])
+        self.assertEqual(model.agent_ids("testType1"), [0, 2, 4])
+        self.assertEqual(model.delete_agents_in_state("testType1", "dead"), [])
+
     def test_agent_count_per_state(self):
         model = Model()
 
@@ -57,5 +57,29 @@ class TestModelMonitor(unittest.TestCase):
 
         self.assertEqual(modelMonitor._cached_stamp,100)
 
+    @patch("os.path.isfile", return_value=True)
+    @patch("os.getcwd", return_value="testDir")
+    @patch("os.stat")
+    @patch("BPTK_Py.modelmonitor.model_monitor.compile", return_value=False)  # the generated model did not change
+    def test_monitor_keeps_unchanged_model(self, mock_compile, mock_stat, mock_cwd, mock_isfile):
+        mock_stat.return_value.st_mtime = 100
+
+        mock_update_func = MagicMock()
+        modelMonitor = ModelMonitor(source_file="test.itmx", dest="test.py", update_func= mock_update_func)
+        modelMonitor._cached_stamp = 50
+
+        monitor_thread = threading.Thread(target=modelMonitor._ModelMonitor__monitor)
+        modelMonitor.running = True
+        monitor_thread.start()
+
+        time.sleep(2)
+
+        modelMonitor.running = False
+        monitor_thread.join()
+
+        mock_compile.assert_called_once()
+        mock_update_func.assert_not_called()
+        self.assertEqual(modelMonitor._cached_stamp,100)
+
 if __name__ == "__main__":
     unittest.main()
@@ -2,7 +2,7 @@ import unittest
 
 from BPTK_Py import Model
 from BPTK_Py.sddsl.element import Element
-from BPTK_Py.sddsl.operators import ArrayedEquation, OperatorError, Operator, DotOperator
+from BPTK_Py.sddsl.operators import ArrayedEquation, OperatorError, Operator, DotOperator, render_term
 from BPTK_Py.sddsl.operators import DivisionOperator, ModOperator, PowerOperator, NumericalMultiplicationOperator, UnaryOperator, ComparisonOperator, BinaryOperator, AdditionOperator
 from BPTK_Py.sddsl.operators import ArrayProductOperator, ArraySumOperator, ArraySizeOperator, ArrayRankOperator, ArrayMeanOperator, ArrayMedianOperator, ArrayStandardDeviationOperator
 
@@ -61,6 +61,17 @@ class TestOperator(unittest.TestCase):
         return_value = operator.term()
         self.assertIsNone(return_value)
 
+    def testOperator_term_parts(self):
+        model = Model()
+        converter = model.converter("converter")
+
+        self.assertIsNone(Operator().term_parts())
+
+        operator = (converter + 1.0) * 2.0
+        self.assertEqual(operator.term_parts("t-model.dt"), ["(", (operator.element_1, "t-model.dt"), ") * (", (operator.element_2, "t-model.dt"), ")"])
+        self.assertEqual(operator.term("t-model.dt"), "(model.memoize('converter',t-model.dt)+1.0) * (2.0)")
+        self.assertEqual(render_term(["max( ", (operator, "t"), ", ", (converter, "t"), ")"]), "max( (model.memoize('converter',t)+1.0) * (2.0), model.memoize('converter',t))")
+
     def testOperator_arrayed_term(self):
         operator = Operator()
 
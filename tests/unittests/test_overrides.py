@@ -0,0 +1,56 @@
+import pickle
+import unittest
+
+from BPTK_Py.util import ConstantOverride, compile_constant, compile_points
+
+
+class TestOverrides(unittest.TestCase):
+    def test_compile_constant_numbers(self):
+        for value in [5, 0.5, -1.25]:
+            function = compile_constant(value)
+
+            self.assertIsInstance(function, ConstantOverride)
+            self.assertEqual(function(0), value)
+            self.assertEqual(function(10.5), value)
+            self.assertIs(type(function(0)), type(value))
+
+    def test_compile_constant_expressions(self):
+        # expressions without names are evaluated once
+        function = compile_constant(" 1/4 + 0.5 ")
+        self.assertEqual(function, ConstantOverride(0.75))
+        self.assertEqual(function(3), 0.75)
+
+        # expressions that refer to names are compiled into a function of t
+        function = compile_constant("t*2")
+        self.assertNotIsInstance(function, ConstantOverride)
+        self.assertEqual(function(3), 6)
+
+        self.assertAlmostEqual(compile_constant("math.sqrt(4)")(0), 2.0)
+
+    def test_compile_constant_invalid(self):
+        with self.assertRaises(ValueError):
+            compile_constant("1 +")
+        with self.assertRaises(ValueError):
+            compile_constant("1/0")
+        with self.assertRaises(ValueError):
+            compile_constant([1, 2])
+
+    def test_constant_override_pickle(self):
+        function = pickle.loads(pickle.dumps(ConstantOverride(2.5)))
+
+        self.assertEqual(function(1), 2.5)
+        self.assertEqual(repr(function), "ConstantOverride(2.5)")
+
+    def test_compile_points(self):
+        points = [[0, 1], [1, 2]]
+
+        self.assertIs(compile_points(points), points)
+        self.assertEqual(compile_points("[[0, 1], [1, 2]]"), points)
+        self.assertEqual(compile_points("2+2"), 4)
+
+        with self.assertRaises(ValueError):
+            compile_points("[[0, 1], [1, 2]")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -299,5 +299,35 @@ class TestScenario(unittest.TestCase):
         self.assertEqual(scenario.get_property_value(name="constant1"),1201.0)
         self.assertEqual(scenario.get_property_value(name="constant2"),1202.0)                
 
+    def testScenario_invalidate_cache(self):
+        class XmileModel:
+            def __init__(self):
+                self.starttime = 0.0
+                self.stoptime = 5.0
+                self.dt = 1.0
+                self.equations = {"rate": lambda t: 1.0, "flow": lambda t: self.memo["rate"][t], "other": lambda t: 5.0}
+                self.dependencies = {"rate": [], "flow": ["rate"], "other": []}
+                self.memo = {"rate": {0.0: 1.0}, "flow": {0.0: 1.0}, "other": {0.0: 5.0}}
+
+        scenario = SimulationScenario(dictionary={"constants": {"rate": 2.0}}, name="scenario", model=XmileModel(), scenario_manager_name="scenarioManagerName")
+        scenario.sd_simulation = "simulation"
+
+        self.assertEqual(scenario.invalidate_cache(constants=["rate"]), {"rate", "flow"})
+        self.assertEqual(scenario.model.memo, {"rate": {}, "flow": {}, "other": {0.0: 5.0}})
+        self.assertIsNone(scenario.sd_simulation)
+
+        model = Model(starttime=0.0, stoptime=5.0, dt=1.0)
+        rate = model.constant("rate")
+        other = model.converter("other")
+        rate.equation = 1.0
+        other.equation = rate * 2.0
+        model.evaluate_equation("other", 5.0)
+
+        scenario = SimulationScenario(dictionary={}, name="scenario", model=model, scenario_manager_name="scenarioManagerName")
+
+        self.assertEqual(scenario.invalidate_cache(points=["unknown"]), set())
+        self.assertEqual(scenario.invalidate_cache(constants=["rate"]), {"rate", "other"})
+        self.assertEqual(model.memo["other"], {})
+
 if __name__ == '__main__':
     unittest.main()        
\ No newline at end of file
@@ -1,3 +1,7 @@
+import os
+import shutil
+import sys
+import tempfile
 import unittest
 
 from BPTK_Py import Model
@@ -164,5 +168,51 @@ class TestScenarioManagerSD(unittest.TestCase):
 
         self.assertIsNone(scenarioManager.get_cloned_model(model=None))      
 
+    def testScenarioManagerSD_hot_swap_model(self):
+        from BPTK_Py.sdcompiler.compile import compile_xmile
+
+        directory = tempfile.mkdtemp()
+        sys.path.insert(0, directory)
+        os.mkdir(os.path.join(directory, "hotswapmodels"))
+        open(os.path.join(directory, "hotswapmodels", "__init__.py"), "w").close()
+        model_file = os.path.join(directory, "hotswapmodels", "step")
+        source = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_models", "test_step.stmx")
+
+        def edit(old, new):
+            with open(model_file + ".py", "r") as infile:
+                code = infile.read()
+            self.assertIn(old, code)
+            with open(model_file + ".py", "w") as outfile:
+                outfile.write(code.replace(old, new))
+
+        try:
+            compile_xmile(source, model_file + ".py", "py")
+
+            scenarioManager = ScenarioManagerSd(scenarios={}, name="scenarioManager")
+            scenarioManager.load_scenarios(scen_dict={"base": {}, "doubled": {"constants": {"input": 2.0}}}, model_file=model_file)
+            base = scenarioManager.scenarios["base"]
+            doubled = scenarioManager.scenarios["doubled"]
+
+            self.assertEqual(base.model.memoize("function", 5.0), 150.0)
+            self.assertEqual(doubled.model.memoize("function", 5.0), 200.0)
+
+            # only the changed equation is swapped, the memoized values of the input are kept
+            edit("'function'      : lambda t: 100.0", "'function'      : lambda t: 1000.0")
+            self.assertEqual(scenarioManager.hot_swap_model(), {"function"})
+
+            self.assertEqual(dict(base.model.memo["input"]), {5.0: 1.0})
+            self.assertEqual(dict(base.model.memo["function"]), {})
+            self.assertEqual(base.model.memoize("function", 5.0), 1050.0)
+            self.assertEqual(doubled.model.memoize("function", 5.0), 1100.0)
+
+            # models on a different time grid cannot be swapped
+            edit("self.stoptime = ", "self.stoptime = 1 + ")
+            self.assertIsNone(scenarioManager.hot_swap_model())
+        finally:
+            sys.path.remove(directory)
+            for module in [name for name in sys.modules if name.startswith("hotswapmodels")]:
+                sys.modules.pop(module)
+            shutil.rmtree(directory)
+
 if __name__ == '__main__':
     unittest.main()   
@@ -33,5 +33,68 @@ class Test_SimultaneousScheduler(unittest.TestCase):
         self.assertEqual(delayed_event, scheduler.delayed_events[0])
         self.assertEqual(delayed_event.delay, 0)
 
+    def test_delivery_order(self):
+        from BPTK_Py import Agent, Model, Event, DelayedEvent, DataCollector
+
+        received = []
+        model = Model(starttime=0, stoptime=5, dt=1, data_collector=DataCollector())
+        model.register_agent_factory("a", lambda agent_id, model, properties: Agent(agent_id, model, properties, "a"))
+        agents = model.create_agents_bulk("a", 2)
+        for agent in agents:
+            agent.register_event_handler(["active"], "ping", lambda event: received.append((model.scheduler.current_time, event.receiver_id, event.data)))
+
+        model.scheduler = SimultaneousScheduler()
+        model.enqueue_event(DelayedEvent("ping", 0, 0, delay=2, data="delayed"))
+        model.enqueue_event(Event("ping", 0, 0, "first"))
+        model.enqueue_event(Event("ping", 0, 1, "other"))
+        model.enqueue_event(Event("ping", 0, 0, "second"))
+        model.enqueue_event(DelayedEvent("ping", 0, 1, delay=0, data="not delayed"))
+        for sim_round in range(5):
+            model.scheduler.run_step(model, sim_round, 0)
+
+        self.assertEqual(received, [(0, 0, "first"), (0, 0, "second"), (0, 1, "other"), (0, 1, "not delayed"), (2, 0, "delayed")])
+        self.assertEqual(model.data_collector.event_statistics, {0: {"ping": 4}, 2: {"ping": 1}})
+        self.assertEqual(len(model.events), 0)
+
+    def test_multicast_delivery(self):
+        from BPTK_Py import Agent, Model, Event, DataCollector
+
+        received = []
+        model = Model(starttime=0, stoptime=5, dt=1, data_collector=DataCollector())
+        model.register_agent_factory("a", lambda agent_id, model, properties: Agent(agent_id, model, properties, "a"))
+        for agent in model.create_agents_bulk("a", 3):
+            agent.register_event_handler(["active"], "ping", lambda event: received.append((event.receiver_id, event.data)))
+            agent.register_event_handler(["active"], "price", lambda event: received.append(event))
+
+        model.scheduler = SimultaneousScheduler()
+        model.broadcast_event("a", Event("price", 0, None, data=10))
+        model.enqueue_event(Event("ping", 0, 1, "ping"))
+        model.scheduler.run_step(model, 0, 0)
+
+        self.assertEqual(model.data_collector.event_statistics, {0: {"price": 3, "ping": 1}})
+        self.assertEqual(len(model.events), 0)
+
+        # all agents receive the same event, after the other events
+        shared = received[0]
+        self.assertEqual(shared.data, 10)
+        self.assertEqual(received, [shared, (1, "ping"), shared, shared])
+
+    def test_multicast_order(self):
+        from BPTK_Py import Agent, Model, Event
+
+        received = []
+        model = Model(starttime=0, stoptime=5, dt=1)
+        model.register_agent_factory("a", lambda agent_id, model, properties: Agent(agent_id, model, properties, "a"))
+        agent = model.create_agent("a", None)
+        agent.register_event_handler(["active"], "ping", lambda event: received.append(event.data))
+
+        model.scheduler = SimultaneousScheduler()
+        model.broadcast_event("a", Event("ping", 0, None, data="first"))
+        model.random_events("a", 1, Event("ping", 0, None, data="second"))
+        model.enqueue_event(Event("ping", 0, 0, "unicast"))
+        model.scheduler.run_step(model, 0, 0)
+
+        self.assertEqual(received, ["unicast", "first", "second"])
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
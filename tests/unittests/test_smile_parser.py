@@ -0,0 +1,54 @@
+import os
+import unittest
+
+from parsimonious.exceptions import ParseError, VisitationError
+
+from BPTK_Py.sdcompiler.benchmark import equations, model_files
+from BPTK_Py.sdcompiler.parsers.smile import SMILEParser, SMILEParseError, SMILEVisitor, grammar, parse_smile
+
+
+class TestSMILEParser(unittest.TestCase):
+    def setUp(self):
+        self.models = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "test_models")
+
+    def assertSameIR(self, equation):
+        self.assertEqual(SMILEParser().parse(equation), SMILEVisitor().visit(grammar.parse(equation)), equation)
+
+    def test_corpus(self):
+        for filename in model_files([self.models]):
+            for equation in equations(filename):
+                self.assertSameIR(equation)
+
+    def test_equations(self):
+        for equation in [
+            "1", "-5", "- 5", ".5", "1+2-3", "a*b/c", "a MOD b", "a^b", "(a)", "  a  ", "", "{comment}",
+            "f(1)", "f(a,2)", "f(1, 2+3)", "f()", "f(x[1]*2, 3)", "f(x[1]+2)", "SUM(a[*])/2",
+            "x[1,2]", "x[a:b]", "x[*,1]", "x[f(1)]", "x[m.n]",
+            "IF a>1 THEN 2 ELSE 3", "IF a THEN b", "IF(a=1) THEN b ELSE IF b THEN c ELSE d",
+            "a>1 AND b<2", "a>=1 or b<>2 AND c=3", "NOT(a=1)", "a + b > 1",
+            "TIME", "time2", "DT", "PI", "INF", "\"a-b\"", "a.b", ".b", "-a", "2*-3",
+        ]:
+            self.assertSameIR(equation)
+
+    def test_errors(self):
+        for equation in ["1e-3", "-.5e3", "\"a b\"", "f (x)", "2nd"]:
+            with self.assertRaises(SMILEParseError):
+                SMILEParser().parse(equation)
+
+        # equations the parser rejects are parsed by the grammar, which reports the error
+        with self.assertRaises(VisitationError):
+            parse_smile("1e-3")
+        with self.assertRaises(ParseError):
+            parse_smile("\"a b\"")
+
+    def test_parse_smile(self):
+        first = parse_smile("stock[1] + flow * 2")
+        self.assertEqual(first, SMILEVisitor().visit(grammar.parse("stock[1] + flow * 2")))
+
+        # duplicate equations are parsed once, but each caller gets its own copy
+        first["args"][0]["name"] = "changed"
+        self.assertEqual(parse_smile("stock[1] + flow * 2")["args"][0]["name"], "stock")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import unittest
+
+import numpy as np
+
+from BPTK_Py import Model
+from BPTK_Py import sd_functions as sd
+from BPTK_Py.sdsimulation import SdSimulation
+from BPTK_Py.modeling.stepCompiler import compile_step, evaluate_time_functions, _parse_function_string
+
+from .test_forwardStepper import build_project_model
+
+
+class TestStepCompiler(unittest.TestCase):
+    def test_parse_function_string(self):
+        self.assertIsNotNone(_parse_function_string("lambda model, t : max( 0,model.memoize('a',t))"))
+        self.assertIsNone(_parse_function_string("lambda t: 1.0"))
+        self.assertIsNone(_parse_function_string("lambda model, t: ("))
+
+    def test_source(self):
+        model = build_project_model(engine="compiled")
+        stepper = model.run_forward()
+
+        self.assertIn("def make_step(model, equations, memos):", stepper.source)
+        self.assertIn("def step(t, column, generation):", stepper.source)
+        # same-step and previous-step references are no longer calls to memoize
+        self.assertNotIn("model.memoize('initialOpenTasks', t)", stepper.source)
+        self.assertIn("v{}[previous]".format(stepper.rows["completionRate"]), stepper.source)
+
+    def test_compiled_matches_memo_engine(self):
+        memo_model = build_project_model()
+        compiled_model = build_project_model(engine="compiled")
+
+        stepper = compiled_model.run_forward()
+
+        for equation in memo_model.equations:
+            for t in range(0, 121):
+                self.assertEqual(stepper.value(equation, float(t)), memo_model.evaluate_equation(equation, t))
+
+    def test_lambda_equations(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0, name="lambdas", engine="compiled")
+        stock = model.stock("stock")
+        stock.initial_value = 0.0
+        stock.equation = model.flow("flow")
+        model.flows["flow"].equation = model.converter("converter")
+        model.add_equation("converter", lambda t: 2.0 * t)
+
+        model.run_forward()
+
+        self.assertEqual(model.evaluate_equation("stock", 10.0), 90.0)
+
+    def test_time_functions(self):
+        def build(engine="memo"):
+            model = Model(starttime=1.0, stoptime=30.0, dt=0.25, name="time", engine=engine)
+            amplitude = model.constant("amplitude")
+            amplitude.equation = 2.0
+            wave = model.converter("wave")
+            wave.equation = sd.sinwave(amplitude * 3.0, 8.0)
+            step = model.converter("step")
+            step.equation = sd.step(amplitude, 10.0)
+            signal = model.converter("signal")
+            signal.equation = sd.max(wave, step) + sd.pulse(model, 5.0, 3.0, 4.0) + sd.If(sd.time() > 20.0, amplitude, 0.0)
+            stock = model.stock("stock")
+            stock.equation = signal
+            return model
+
+        reference = build()
+        expected = {equation: [reference.evaluate_equation(equation, t) for t in reference.memo.grid.times] for equation in reference.equations}
+
+        model = build()
+        kinds = model.equation_kinds()
+        model.memo.set_invariant([name for name, kind in kinds.items() if kind == "time_invariant"])
+        evaluated = evaluate_time_functions(model, ["wave", "step", "signal"], model._function_strings(), kinds)
+
+        self.assertEqual(evaluated, ["wave", "step", "signal"])
+        self.assertEqual(model.memo["signal"].values, expected["signal"])
+
+        for engine in ["memo", "forward", "compiled"]:
+            model = build(engine)
+            model.prepare_run()
+            model.run_forward() if engine != "memo" else None
+
+            self.assertTrue(model.memo["amplitude"].invariant)
+            self.assertEqual(model.memo["amplitude"].stamps, [])
+            for equation in model.equations:
+                self.assertEqual([model.evaluate_equation(equation, t) for t in model.memo.grid.times], expected[equation])
+
+    def test_time_functions_fallback(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=1.0, name="fallback")
+        zero = model.constant("zero")
+        zero.equation = 0.0
+        ratio = model.converter("ratio")
+        ratio.equation = sd.If(sd.time() > 5.0, 1.0 / zero, 0.0)
+        later = model.converter("later")
+        later.equation = ratio + sd.time()
+
+        kinds = model.equation_kinds()
+        # division by zero is left to the step by step evaluation, so is everything that reads it
+        self.assertEqual(evaluate_time_functions(model, ["ratio", "later"], model._function_strings(), kinds), [])
+        self.assertEqual(model.evaluate_equation("later", 2.0), 2.0)
+        self.assertRaises(ZeroDivisionError, model.evaluate_equation, "later", 6.0)
+
+    def test_recompile_when_memo_is_replaced(self):
+        model = build_project_model(engine="compiled")
+        stepper = model.run_forward(until=5.0)
+        step = stepper.step
+
+        model.memo["openTasks"] = {}
+        model.run_forward()
+
+        self.assertIsNot(stepper.step, step)
+        self.assertEqual(model.evaluate_equation("openTasks", 120.0), build_project_model().evaluate_equation("openTasks", 120.0))
+
+    def test_compile_step(self):
+        model = build_project_model()
+        order = ["deadline", "currentTime", "remainingTime"]
+        function_strings = {name: model.constants[name].function_string for name in ["deadline"]}
+        function_strings.update({name: model.converters[name].function_string for name in ["currentTime", "remainingTime"]})
+
+        memos = [model.memo.setdefault(name, {}) for name in order]
+        for memo in memos:
+            memo.allocate()
+
+        source, make_step = compile_step(model, order, function_strings)
+        make_step(model, model.equations, memos)(3.0, 3, model.memo.generation)
+
+        self.assertEqual(model.memo["remainingTime"][3.0], 97.0)
+
+    def test_sd_simulation(self):
+        equations = ["openTasks", "closedTasks", "completionRate", "productivity"]
+
+        memo_df = SdSimulation(model=build_project_model()).start(output=["frame"], equations=equations)
+        compiled_df = SdSimulation(model=build_project_model(engine="compiled")).start(output=["frame"], equations=equations)
+
+        self.assertTrue(memo_df.equals(compiled_df))
+
+
+if __name__ == '__main__':
+    unittest.main()
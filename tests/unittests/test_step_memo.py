@@ -0,0 +1,184 @@
+import copy
+import unittest
+
+from BPTK_Py import Model
+from BPTK_Py.util import MemoStore, StepMemo, TimeGrid, timerange
+
+
+class TestTimeGrid(unittest.TestCase):
+    def test_times_match_timerange(self):
+        grid = TimeGrid(0.0, 10.0, 0.1)
+
+        self.assertEqual(grid.size, 101)
+        self.assertEqual(grid.times, timerange(0.0, 10.0 + 0.1, 0.1))
+
+    def test_index(self):
+        grid = TimeGrid(1.0, 5.0, 0.25)
+
+        self.assertEqual(grid.index(1.0), 0)
+        self.assertEqual(grid.index(1.75), 3)
+        self.assertEqual(grid.index(1.0 + 0.25 * 3), 3)
+        self.assertEqual(grid.index(0.5), -2)
+        self.assertEqual(grid.time(3), 1.75)
+
+    def test_no_steps(self):
+        self.assertEqual(TimeGrid(0.0, 10.0, 0.0).size, 0)
+        self.assertEqual(TimeGrid(10.0, 0.0, 1.0).size, 0)
+
+
+class TestMemoStore(unittest.TestCase):
+    def test_behaves_like_dict(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {1.0: 5.0, 20.0: 7.0}
+
+        memo = store["a"]
+        self.assertIsInstance(memo, StepMemo)
+        self.assertEqual(memo, {1.0: 5.0, 20.0: 7.0})
+        self.assertIn(1.0, memo)
+        self.assertIn(1.0, memo.keys())
+        self.assertNotIn(2.0, memo)
+        self.assertEqual(memo[20.0], 7.0)
+        self.assertRaises(KeyError, memo.__getitem__, 2.0)
+
+        del memo[1.0]
+        self.assertEqual(memo, {20.0: 7.0})
+        self.assertEqual(len(memo), 1)
+
+    def test_values_are_preallocated_on_first_write(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {}
+        self.assertEqual(store["a"].stamps, [])
+
+        store["a"][3.0] = 1.0
+        self.assertEqual(len(store["a"].stamps), 11)
+
+    def test_invariant(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {}
+        store["b"] = {2.0: 5.0}
+
+        # memos that already hold values keep one slot per timestep
+        self.assertEqual(store.set_invariant(["a", "b"]), {"a"})
+        memo = store["a"]
+        self.assertFalse(store["b"].invariant)
+
+        # the single slot holds the value for all timesteps and remembers the last step it was used for
+        memo[3.0] = 6.0
+        self.assertEqual(memo.stamps, [])
+        self.assertEqual(memo[0.0], 6.0)
+        self.assertEqual(memo, {0.0: 6.0, 1.0: 6.0, 2.0: 6.0, 3.0: 6.0})
+        self.assertEqual(memo[7.0], 6.0)
+        self.assertEqual(len(memo), 8)
+
+        store.reset()
+        self.assertNotIn(3.0, memo)
+        memo[3.0] = 7.0
+        store.invalidate(["a"])
+        self.assertNotIn(3.0, memo)
+
+        # switching back keeps the value for the steps it was used for
+        memo[1.0] = 8.0
+        memo.get_value(4)
+        store.set_invariant([])
+        self.assertFalse(memo.invariant)
+        self.assertEqual(memo, {0.0: 8.0, 1.0: 8.0, 2.0: 8.0, 3.0: 8.0, 4.0: 8.0})
+        self.assertNotIn(5.0, memo)
+
+        # an invalidated single slot is dropped when switching back
+        store.reset()
+        self.assertEqual(store.set_invariant(["a"]), {"a"})
+        memo[1.0] = 9.0
+        self.assertTrue(memo.written())
+        store.invalidate(["a"])
+        self.assertFalse(memo.written())
+        store.set_invariant([])
+        self.assertEqual(memo, {})
+
+    def test_reset(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {1.0: 5.0, -1.0: 3.0}
+
+        store.reset()
+
+        self.assertEqual(store["a"], {})
+        store["a"][1.0] = 6.0
+        self.assertEqual(store["a"], {1.0: 6.0})
+
+    def test_invalidate(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {1.0: 5.0, -1.0: 3.0}
+        store["b"] = {1.0: 6.0}
+        stamps = store["a"].stamps
+
+        store.invalidate(["a", "unknown"])
+
+        self.assertEqual(store["a"], {})
+        self.assertEqual(store["b"], {1.0: 6.0})
+        self.assertIs(store["a"].stamps, stamps)
+
+    def test_set_grid(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {1.0: 5.0, 2.0: 6.0}
+
+        store.set_grid(0.0, 10.0, 2.0)
+
+        self.assertEqual(store["a"], {2.0: 6.0})
+        self.assertEqual(store.grid.dt, 2.0)
+
+    def test_copy(self):
+        store = MemoStore(0.0, 10.0, 1.0)
+        store["a"] = {1.0: 5.0}
+
+        copied = copy.deepcopy(store)
+        copied["a"][2.0] = 6.0
+
+        self.assertIsInstance(copied, MemoStore)
+        self.assertEqual(store["a"], {1.0: 5.0})
+        self.assertEqual(copied["a"], {1.0: 5.0, 2.0: 6.0})
+
+
+class TestModelMemo(unittest.TestCase):
+    def build_model(self):
+        model = Model(starttime=0.0, stoptime=10.0, dt=0.5, name="memo")
+        stock = model.stock("stock")
+        flow = model.flow("flow")
+        stock.initial_value = 0.0
+        flow.equation = 1.0
+        stock.equation = flow
+        return model
+
+    def test_memoize_normalizes_time(self):
+        model = self.build_model()
+
+        self.assertEqual(model.memoize("stock", 0.1 + 0.2 + 0.2), 0.5)
+        self.assertEqual(list(model.memo["stock"].keys()), [0.0, 0.5])
+
+    def test_reset_cache(self):
+        model = self.build_model()
+        model.evaluate_equation("stock", 10.0)
+        generation = model.memo.generation
+
+        model.reset_cache()
+
+        self.assertEqual(model.memo.generation, generation + 1)
+        self.assertEqual(model.memo["stock"], {})
+
+    def test_runspecs_change_grid(self):
+        model = self.build_model()
+        model.evaluate_equation("stock", 2.0)
+
+        model.run_specs(0.0, 20.0, 0.5)
+
+        self.assertEqual(model.memo.grid.stoptime, 20.0)
+        self.assertEqual(model.evaluate_equation("stock", 20.0), 20.0)
+
+    def test_assign_plain_dict(self):
+        model = self.build_model()
+        model.memo = {"stock": {1.0: 42.0}}
+
+        self.assertIsInstance(model.memo, MemoStore)
+        self.assertEqual(model.evaluate_equation("stock", 1.0), 42.0)
+
+
+if __name__ == '__main__':
+    unittest.main()